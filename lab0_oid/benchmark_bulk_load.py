@@ -0,0 +1,91 @@
+import argparse
+import time
+
+import psycopg2
+
+from bulk_loader import DEFAULT_CHUNK_SIZE, copy_load_users
+from db_pool import ConnectionPool, user_statements
+from main import DB_CONFIG, iter_fake_users
+
+# Окрема таблиця, щоб бенчмарк не чіпав дані демонстрації
+BENCH_TABLE = "users_bulk_bench"
+
+
+def _reset_table(conn) -> None:
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            DROP TABLE IF EXISTS {BENCH_TABLE};
+            CREATE TABLE {BENCH_TABLE} (
+                id SERIAL PRIMARY KEY,
+                username VARCHAR(100) UNIQUE NOT NULL,
+                email VARCHAR(150) NOT NULL,
+                age INT
+            );
+        """)
+    conn.commit()
+
+
+def _load_executemany(conn, rows) -> int:
+    """Початковий шлях insert_batch_data: executemany, один запит на рядок."""
+    with conn.cursor() as cur:
+        cur.executemany(f"""
+            INSERT INTO {BENCH_TABLE} (username, email, age)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (username) DO NOTHING;
+        """, list(rows))
+        conn.commit()
+        return cur.rowcount
+
+
+def run_benchmark(num_rows: int, executemany_rows: int, chunk_size: int, seed: int) -> None:
+    pool = ConnectionPool(DB_CONFIG, minconn=1, maxconn=1, statements=user_statements(BENCH_TABLE))
+    try:
+        start = time.perf_counter()
+        generated = sum(1 for _ in iter_fake_users(num_rows, seed=seed))
+        gen_elapsed = time.perf_counter() - start
+
+        print(f"\n--- Масове завантаження users (генерація: {generated / gen_elapsed:,.0f} рядків/с) ---")
+        print(f"{'МЕТОД':<24} {'РЯДКІВ':>12} {'ВСТАВЛЕНО':>12} {'ЧАС, С':>9} {'РЯДКІВ/С':>12}")
+        print("-" * 73)
+
+        def _prepared(conn, rows) -> int:
+            with conn.cursor() as cur:
+                inserted = pool.execute_many(cur, "insert_user_ignore", list(rows))
+            conn.commit()
+            return inserted
+
+        variants = [
+            ("executemany", executemany_rows, _load_executemany),
+            ("prepared execute_many", executemany_rows, _prepared),
+            (f"COPY (пакет {chunk_size:,})", num_rows,
+             lambda conn, rows: copy_load_users(conn, rows, BENCH_TABLE, chunk_size=chunk_size)),
+        ]
+
+        for name, n, load in variants:
+            with pool.connection() as conn:
+                _reset_table(conn)
+                start = time.perf_counter()
+                inserted = load(conn, iter_fake_users(n, seed=seed))
+                elapsed = time.perf_counter() - start
+            print(f"{name:<24} {n:>12,} {inserted:>12,} {elapsed:>9.2f} {n / elapsed:>12,.0f}")
+
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+            conn.commit()
+    except psycopg2.Error as e:
+        print(f"ПОМИЛКА: {e}")
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="COPY vs executemany для завантаження users (потрібен Postgres).")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Рядків для COPY.")
+    parser.add_argument("--executemany-rows", type=int, default=20_000,
+                        help="Рядків для executemany (повільний шлях, тому менше).")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.executemany_rows, args.chunk_size, args.seed)
@@ -0,0 +1,98 @@
+import argparse
+import os
+import time
+import tracemalloc
+
+import psycopg2
+from psycopg2 import sql
+
+from bulk_loader import copy_load_users
+from db_pool import ConnectionPool
+from main import DB_CONFIG, iter_fake_users
+from table_export import DEFAULT_PAGE_SIZE, export_users, write_rows
+
+# Окрема таблиця, щоб бенчмарк не чіпав дані демонстрації
+BENCH_TABLE = "users_export_bench"
+
+
+def _create_table(conn, num_rows: int) -> None:
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            DROP TABLE IF EXISTS {BENCH_TABLE};
+            CREATE TABLE {BENCH_TABLE} (
+                id SERIAL PRIMARY KEY,
+                username VARCHAR(100) UNIQUE NOT NULL,
+                email VARCHAR(150) NOT NULL,
+                age INT
+            );
+        """)
+    conn.commit()
+    copy_load_users(conn, iter_fake_users(num_rows, seed=7), BENCH_TABLE)
+    with conn.cursor() as cur:
+        cur.execute(f"ANALYZE {BENCH_TABLE};")
+    conn.commit()
+
+
+def _iter_offset_pages(conn, page_size: int):
+    """Для порівняння: пагінація через OFFSET — кожна сторінка перечитує всі попередні рядки."""
+    query = sql.SQL("SELECT id, username, email, age FROM {} ORDER BY id LIMIT %s OFFSET %s") \
+        .format(sql.Identifier(BENCH_TABLE))
+    offset = 0
+    with conn.cursor() as cur:
+        while True:
+            cur.execute(query, (page_size, offset))
+            page = cur.fetchall()
+            if not page:
+                break
+            yield from page
+            offset += len(page)
+
+
+def _measure(export) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open(os.devnull, "w", newline="") as out:
+        count = export(out)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def run_benchmark(num_rows: int, page_size: int, fmt: str) -> None:
+    pool = ConnectionPool(DB_CONFIG, minconn=1, maxconn=1)
+    try:
+        with pool.connection() as conn:
+            _create_table(conn, num_rows)
+
+            variants = [
+                ("OFFSET", lambda out: write_rows(_iter_offset_pages(conn, page_size), out, fmt)),
+                ("keyset", lambda out: export_users(conn, BENCH_TABLE, out, fmt, "keyset", page_size)),
+                ("серверний курсор", lambda out: export_users(conn, BENCH_TABLE, out, fmt, "cursor", page_size)),
+            ]
+
+            print(f"\n--- Експорт {num_rows:,} рядків у {fmt} (сторінка/itersize {page_size:,}) ---")
+            print(f"{'МЕТОД':<18} {'РЯДКІВ':>12} {'ЧАС, С':>9} {'РЯДКІВ/С':>12} {'ПІК ПАМ., МБ':>13}")
+            print("-" * 68)
+            for name, export in variants:
+                count, elapsed, peak = _measure(export)
+                conn.rollback()
+                print(f"{name:<18} {count:>12,} {elapsed:>9.2f} {count / elapsed:>12,.0f} {peak / 2 ** 20:>13.1f}")
+
+            with conn.cursor() as cur:
+                cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+            conn.commit()
+    except psycopg2.Error as e:
+        print(f"ПОМИЛКА: {e}")
+    finally:
+        pool.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Keyset/серверний курсор vs OFFSET для експорту (потрібен Postgres).")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--format", choices=["table", "csv", "jsonl"], default="csv")
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.page_size, args.format)
@@ -0,0 +1,139 @@
+import argparse
+import threading
+import time
+import uuid
+from typing import Callable, List
+
+import psycopg2
+
+from db_pool import ConnectionPool, user_statements
+from main import DB_CONFIG
+
+# Окрема таблиця, щоб бенчмарк не чіпав дані демонстрації
+BENCH_TABLE = "users_pool_bench"
+
+
+def _setup() -> None:
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"""
+                CREATE TABLE IF NOT EXISTS {BENCH_TABLE} (
+                    id SERIAL PRIMARY KEY,
+                    username VARCHAR(100) UNIQUE NOT NULL,
+                    email VARCHAR(150) NOT NULL,
+                    age INT
+                );
+            """)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _teardown() -> None:
+    conn = psycopg2.connect(**DB_CONFIG)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _cycle_per_call(username: str, latencies: List[float]) -> None:
+    """INSERT -> SELECT -> UPDATE -> DELETE, кожна операція з новим підключенням (як get_connection())."""
+    statements = user_statements(BENCH_TABLE)
+
+    def op(name: str, params: tuple, fetch: bool = False):
+        start = time.perf_counter()
+        conn = psycopg2.connect(**DB_CONFIG)
+        try:
+            with conn.cursor() as cur:
+                # Той самий SQL, що й у підготовлених операторах, але з %s і без PREPARE
+                sql = statements[name][1]
+                for k in range(len(params), 0, -1):
+                    sql = sql.replace(f"${k}", "%s")
+                cur.execute(sql, params)
+                result = cur.fetchone() if fetch else None
+            conn.commit()
+        finally:
+            conn.close()
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    user_id = op("insert_user", (username, f"{username}@testcompany.org", 30), fetch=True)[0]
+    op("select_user", (user_id,), fetch=True)
+    op("update_email", (f"UPDATED_{username}@newdomain.com", user_id))
+    op("delete_user", (user_id,))
+
+
+def _make_pooled_cycle(pool: ConnectionPool) -> Callable[[str, List[float]], None]:
+    def op(name: str, params: tuple, latencies: List[float], fetch: bool = False):
+        start = time.perf_counter()
+        with pool.connection() as conn:
+            with conn.cursor() as cur:
+                pool.execute(cur, name, params)
+                result = cur.fetchone() if fetch else None
+            conn.commit()
+        latencies.append(time.perf_counter() - start)
+        return result
+
+    def cycle(username: str, latencies: List[float]) -> None:
+        user_id = op("insert_user", (username, f"{username}@testcompany.org", 30), latencies, fetch=True)[0]
+        op("select_user", (user_id,), latencies, fetch=True)
+        op("update_email", (f"UPDATED_{username}@newdomain.com", user_id), latencies)
+        op("delete_user", (user_id,), latencies)
+
+    return cycle
+
+
+def _run(cycle: Callable[[str, List[float]], None], concurrency: int, cycles: int):
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    run_id = uuid.uuid4().hex[:8]
+
+    def worker(k: int) -> None:
+        for i in range(cycles):
+            cycle(f"bench_{run_id}_{k}_{i}", latencies[k])
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    merged = sorted(x for per_thread in latencies for x in per_thread)
+    p50 = merged[len(merged) // 2]
+    p99 = merged[min(len(merged) - 1, int(len(merged) * 0.99))]
+    return len(merged) / elapsed, p50, p99
+
+
+def run_benchmark(levels: List[int], cycles: int) -> None:
+    _setup()
+    try:
+        print(f"\n--- Пул з'єднань vs підключення на кожен виклик ({cycles} циклів CRUD на потік) ---")
+        print(f"{'ПОТОКІВ':>8} {'РЕЖИМ':<10} {'ОПЕРАЦІЙ/С':>12} {'P50, МС':>9} {'P99, МС':>9}")
+        print("-" * 52)
+        for concurrency in levels:
+            ops, p50, p99 = _run(_cycle_per_call, concurrency, cycles)
+            print(f"{concurrency:>8} {'per-call':<10} {ops:>12,.0f} {p50 * 1000:>9.2f} {p99 * 1000:>9.2f}")
+
+            pool = ConnectionPool(DB_CONFIG, minconn=concurrency, maxconn=concurrency,
+                                  statements=user_statements(BENCH_TABLE))
+            try:
+                ops, p50, p99 = _run(_make_pooled_cycle(pool), concurrency, cycles)
+            finally:
+                pool.close()
+            print(f"{concurrency:>8} {'pooled':<10} {ops:>12,.0f} {p50 * 1000:>9.2f} {p99 * 1000:>9.2f}")
+    finally:
+        _teardown()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Бенчмарк пулу з'єднань для CRUD (потрібен локальний Postgres).")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--cycles", type=int, default=200)
+    args = parser.parse_args()
+
+    run_benchmark(args.levels, args.cycles)
@@ -0,0 +1,62 @@
+import io
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple
+
+# Скільки рядків іде в одну команду COPY + INSERT ... SELECT
+DEFAULT_CHUNK_SIZE = 100_000
+
+STAGING_TABLE = "users_staging"
+
+# Спецсимволи текстового формату COPY
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return "\\N"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+def iter_chunks(rows: Iterable[Tuple], chunk_size: int) -> Iterator[List[Tuple]]:
+    """Розбиває потік рядків на списки по chunk_size, не матеріалізуючи весь потік."""
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _to_copy_buffer(chunk: List[Tuple]) -> io.StringIO:
+    """Пакет рядків у текстовому форматі COPY (значення через табуляцію)."""
+    return io.StringIO("".join(
+        f"{_copy_value(username)}\t{_copy_value(email)}\t{_copy_value(age)}\n" for username, email, age in chunk))
+
+
+def copy_load_users(conn, rows: Iterable[Tuple[str, str, int]], table_name: str,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Завантажує (username, email, age) пакетами: COPY FROM STDIN у тимчасову таблицю,
+    потім один INSERT ... SELECT ... ON CONFLICT (username) DO NOTHING на пакет.
+    Кожен пакет — окрема транзакція (ON COMMIT DELETE ROWS очищує staging).
+    Повертає кількість справді вставлених рядків.
+    """
+    inserted = 0
+    with conn.cursor() as cur:
+        cur.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+                username TEXT, email TEXT, age INT
+            ) ON COMMIT DELETE ROWS;
+        """)
+        conn.commit()
+
+        for chunk in iter_chunks(rows, chunk_size):
+            cur.copy_expert(f"COPY {STAGING_TABLE} (username, email, age) FROM STDIN", _to_copy_buffer(chunk))
+            cur.execute(f"""
+                INSERT INTO {table_name} (username, email, age)
+                SELECT username, email, age FROM {STAGING_TABLE}
+                ON CONFLICT (username) DO NOTHING;
+            """)
+            inserted += cur.rowcount
+            conn.commit()
+    return inserted
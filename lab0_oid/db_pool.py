@@ -0,0 +1,171 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Sequence, Tuple
+
+import psycopg2
+import psycopg2.extensions
+
+# Через скільки секунд простою з'єднання перевіряється запитом SELECT 1 перед видачею
+HEALTH_CHECK_AFTER = 30.0
+
+
+class PoolTimeout(Exception):
+    """Не вдалося отримати з'єднання з пулу за відведений час."""
+
+
+def user_statements(table_name: str) -> Dict[str, Tuple[str, str]]:
+    """Фіксовані форми запитів CRUD: назва -> (типи параметрів, SQL з $1, $2, ...)."""
+    return {
+        "insert_user": ("text, text, int",
+                        f"INSERT INTO {table_name} (username, email, age) VALUES ($1, $2, $3) RETURNING id"),
+        "insert_user_ignore": ("text, text, int",
+                               f"INSERT INTO {table_name} (username, email, age) VALUES ($1, $2, $3) "
+                               f"ON CONFLICT (username) DO NOTHING"),
+        "update_email": ("text, int", f"UPDATE {table_name} SET email = $1 WHERE id = $2"),
+        "delete_user": ("int", f"DELETE FROM {table_name} WHERE id = $1"),
+        "select_user": ("int", f"SELECT id, username, email, age FROM {table_name} WHERE id = $1"),
+        "select_latest": ("int", f"SELECT id, username, email, age FROM {table_name} ORDER BY id DESC LIMIT $1"),
+        "select_first": ("int", f"SELECT id, username, email, age FROM {table_name} ORDER BY id ASC LIMIT $1"),
+    }
+
+
+class ConnectionPool:
+    """
+    Обмежений пул з'єднань psycopg2.
+
+    Не більше maxconn з'єднань одночасно: connection() чекає на вільне (або PoolTimeout).
+    Перед видачею з'єднання, що простоювало довше за health_check_after секунд, перевіряється
+    запитом SELECT 1; розірване з'єднання замінюється новим. Після повернення незавершена
+    транзакція відкочується. Підготовлені оператори (PREPARE) створюються на кожному
+    з'єднанні при першому використанні та живуть разом із ним.
+    """
+
+    def __init__(self, db_config: Dict[str, str], minconn: int = 1, maxconn: int = 10,
+                 statements: Optional[Dict[str, Tuple[str, str]]] = None,
+                 health_check_after: float = HEALTH_CHECK_AFTER):
+        if not 0 <= minconn <= maxconn:
+            raise ValueError("Потрібно 0 <= minconn <= maxconn.")
+        self.db_config = db_config
+        self.maxconn = maxconn
+        self.statements = statements or {}
+        self.health_check_after = health_check_after
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._lock = threading.Lock()
+        self._idle: deque = deque()  # (з'єднання, час повернення)
+        self._prepared: Dict[int, set] = {}
+        self._closed = False
+        for _ in range(minconn):
+            self._idle.append((self._connect(), time.monotonic()))
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.db_config)
+        self._prepared[id(conn)] = set()
+        return conn
+
+    def _discard(self, conn) -> None:
+        self._prepared.pop(id(conn), None)
+        try:
+            conn.close()
+        except psycopg2.Error:
+            pass
+
+    def _healthy(self, conn, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if time.monotonic() - idle_since < self.health_check_after:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self, timeout: Optional[float] = None):
+        """Бере з'єднання з пулу (чекає не довше timeout секунд). Повертати — через putconn()."""
+        if self._closed:
+            raise psycopg2.InterfaceError("Пул закрито.")
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeout(f"Немає вільного з'єднання за {timeout} сек (максимум {self.maxconn}).")
+        try:
+            while True:
+                with self._lock:
+                    conn, idle_since = self._idle.pop() if self._idle else (None, 0.0)
+                if conn is None:
+                    return self._connect()
+                if self._healthy(conn, idle_since):
+                    return conn
+                self._discard(conn)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn, discard: bool = False) -> None:
+        """Повертає з'єднання в пул; discard=True — закрити його замість повернення."""
+        try:
+            if not discard and not conn.closed and not self._closed:
+                status = conn.get_transaction_status()
+                if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                    discard = True
+                elif status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    try:
+                        conn.rollback()
+                    except psycopg2.Error:  # з'єднання, що не відкотилось, у пул не повертаємо
+                        discard = True
+            if discard or conn.closed or self._closed:
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator:
+        """
+        with pool.connection() as conn: ... — з'єднання повертається в пул після блоку.
+        Якщо блок завершився помилкою з'єднання (OperationalError/InterfaceError),
+        воно закривається, а не повертається.
+        """
+        conn = self.getconn(timeout)
+        broken = False
+        try:
+            yield conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            broken = True
+            raise
+        finally:
+            self.putconn(conn, discard=broken)
+
+    def execute(self, cur, name: str, params: Sequence = ()) -> None:
+        """Виконує підготовлений оператор name курсором cur (PREPARE — при першому виклику)."""
+        prepared = self._prepared.setdefault(id(cur.connection), set())
+        if name not in prepared:
+            types, sql = self.statements[name]
+            cur.execute(f"PREPARE {name} ({types}) AS {sql}")
+            prepared.add(name)
+        if params:
+            cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
+
+    def execute_many(self, cur, name: str, params_list: Sequence[Sequence]) -> int:
+        """
+        Виконує підготовлений оператор для кожного набору параметрів (як cursor.executemany,
+        але без повторного планування). Повертає сумарну кількість змінених рядків.
+        """
+        rowcount = 0
+        for params in params_list:
+            self.execute(cur, name, params)
+            rowcount += max(cur.rowcount, 0)
+        return rowcount
+
+    def close(self) -> None:
+        """Закриває всі вільні з'єднання; видані закриються при поверненні."""
+        self._closed = True
+        with self._lock:
+            while self._idle:
+                self._discard(self._idle.pop()[0])
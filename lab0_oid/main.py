@@ -1,7 +1,13 @@
+import math
+import sys
 import psycopg2
 from faker import Faker
 import random
-from typing import List, Tuple, Optional
+from typing import Iterable, Iterator, List, Tuple, Optional
+
+from bulk_loader import DEFAULT_CHUNK_SIZE, copy_load_users
+from db_pool import ConnectionPool, user_statements
+from table_export import iter_users, write_rows
 
 # ====================================================================
 # КОНФІГУРАЦІЯ БАЗИ ДАНИХ (ОБОВ'ЯЗКОВО ЗАМІНИТИ!)
@@ -15,6 +21,10 @@ DB_CONFIG = {
 }
 NUM_RECORDS_TO_INSERT = 10
 TABLE_NAME = "users"
+POOL_MAX_CONNECTIONS = 10
+NAME_POOL_SIZE = 1000
+
+_pool: Optional[ConnectionPool] = None
 
 
 # ====================================================================
@@ -31,27 +41,32 @@ def get_connection():
         return None
 
 
-def print_table(conn: psycopg2.connect, limit: int, title: str):
-    """Виводить зразок таблиці (останні 'limit' записів або перші 3) у консоль."""
-    if limit > 0:
-        # Вивід останніх N записів
-        sql = f"SELECT id, username, email, age FROM {TABLE_NAME} ORDER BY id DESC LIMIT {limit};"
-    else:
-        # Вивід перших 3 записів (частинка таблиці)
-        sql = f"SELECT id, username, email, age FROM {TABLE_NAME} ORDER BY id ASC LIMIT 3;"
+def get_pool() -> Optional[ConnectionPool]:
+    """Повертає спільний пул з'єднань (створюється при першому виклику)."""
+    global _pool
+    if _pool is None:
+        try:
+            _pool = ConnectionPool(DB_CONFIG, minconn=1, maxconn=POOL_MAX_CONNECTIONS,
+                                   statements=user_statements(TABLE_NAME))
+        except psycopg2.Error as e:
+            print(f"ПОМИЛКА: Помилка підключення до бази даних: {e}")
+            return None
+    return _pool
+
 
+def print_table(conn: psycopg2.connect, limit: int, title: str):
+    """
+    Виводить зразок таблиці (останні 'limit' записів або перші 3) у консоль.
+    Рядки читаються keyset-пагінацією по id (table_export.iter_users) з параметризованим LIMIT.
+    """
     try:
-        with conn.cursor() as cur:
-            cur.execute(sql)
-            results = cur.fetchall()
-
-            print("\n" + "=" * 80)
-            print(f"### {title} (Виведено {len(results)} записів)")
-            print(f"{'ID':<5} {'USERNAME':<25} {'EMAIL':<40} {'AGE':<5}")
-            print("-" * 80)
-            for user in results:
-                print(f"{user[0]:<5} {user[1]:<25} {user[2]:<40} {user[3]:<5}")
-            print("=" * 80 + "\n")
+        # Вивід останніх N записів або перших 3 (частинка таблиці)
+        results = list(iter_users(conn, TABLE_NAME, descending=limit > 0, limit=limit if limit > 0 else 3))
+
+        print("\n" + "=" * 80)
+        print(f"### {title} (Виведено {len(results)} записів)")
+        write_rows(results, sys.stdout, fmt="table")
+        print("=" * 80 + "\n")
     except psycopg2.Error as e:
         print(f"ПОМИЛКА: Помилка вибірки для виводу таблиці: {e}")
 
@@ -60,75 +75,102 @@ def print_table(conn: psycopg2.connect, limit: int, title: str):
 # ГЕНЕРАЦІЯ ТА ВСТАВКА ДАНИХ (10 ЗАПИСІВ АНГЛІЙСЬКОЮ)
 # ====================================================================
 
-def generate_fake_data(num_records: int) -> List[Tuple]:
-    """Генерує список кортежів із фейковими даними на EN, де username відповідає email."""
-    fake = Faker('en_US')
-    fake_users = []
-    used_usernames = set()
-
-    while len(fake_users) < num_records:
-        name_part = fake.first_name().lower()
-        random_suffix = random.randint(10, 999)
-        base_username = f"{name_part}{random_suffix}"
-
-        if base_username in used_usernames:
-            continue
-
-        used_usernames.add(base_username)
+def iter_fake_users(num_records: int, seed: Optional[int] = None) -> Iterator[Tuple[str, str, int]]:
+    """
+    Лінивий генератор кортежів (username, email, age) з гарантовано унікальними username.
 
+    Суфікс username — образ номера запису при афінній перестановці (a * i + b) mod M
+    з НСД(a, M) = 1, тож суфікси не повторюються без жодних повторних спроб і без множини
+    вже виданих імен. Імена беруться з наперед згенерованого пулу Faker.
+    """
+    rng = random.Random(seed)
+    fake = Faker('en_US')
+    if seed is not None:
+        fake.seed_instance(seed)
+    names = [fake.first_name().lower() for _ in range(NAME_POOL_SIZE)]
+
+    # Простір суфіксів: 10..999, як раніше, а для великих обсягів — ширший
+    space = 990 if num_records <= 990 else 10 ** len(str(num_records))
+    a = rng.randrange(1, space)
+    while math.gcd(a, space) != 1:
+        a = rng.randrange(1, space)
+    b = rng.randrange(space)
+
+    for i in range(num_records):
+        base_username = f"{rng.choice(names)}{10 + (a * i + b) % space}"
         # Створення email на основі username
-        email = f"{base_username}@testcompany.org"
-        age = random.randint(18, 65)
+        yield base_username, f"{base_username}@testcompany.org", rng.randint(18, 65)
 
-        fake_users.append((base_username, email, age))
 
-    return fake_users
+def generate_fake_data(num_records: int) -> List[Tuple]:
+    """Генерує список кортежів із фейковими даними на EN, де username відповідає email."""
+    return list(iter_fake_users(num_records))
 
 
 def insert_batch_data(data: List[Tuple]):
-    """Вставляє дані пакетно (для первинного наповнення)."""
-    conn = get_connection()
-    if conn is None: return
-
-    insert_query = f"""
-        INSERT INTO {TABLE_NAME} (username, email, age) 
-        VALUES (%s, %s, %s)
-        ON CONFLICT (username) DO NOTHING;
+    """Вставляє дані пакетно (для первинного наповнення) підготовленим оператором."""
+    pool = get_pool()
+    if pool is None: return
+
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                inserted = pool.execute_many(cur, "insert_user_ignore", data)
+                conn.commit()
+                print(f"УСПІХ: [INIT] Успішно додано {inserted} нових записів.")
+        except psycopg2.Error as e:
+            print(f"ПОМИЛКА: Помилка пакетної вставки даних: {e}")
+            conn.rollback()
+
+
+def insert_bulk_data(rows: Iterable[Tuple], chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
     """
-    try:
-        with conn.cursor() as cur:
-            cur.executemany(insert_query, data)
-            conn.commit()
-            print(f"УСПІХ: [INIT] Успішно додано {cur.rowcount} нових записів.")
-    except psycopg2.Error as e:
-        print(f"ПОМИЛКА: Помилка пакетної вставки даних: {e}")
-        conn.rollback()
-    finally:
-        if conn: conn.close()
+    Масове завантаження: рядки потоково йдуть через COPY у тимчасову таблицю
+    і зливаються в users по одному INSERT ... SELECT ... ON CONFLICT на пакет.
+    """
+    pool = get_pool()
+    if pool is None: return 0
+
+    with pool.connection() as conn:
+        try:
+            inserted = copy_load_users(conn, rows, TABLE_NAME, chunk_size=chunk_size)
+            print(f"УСПІХ: [BULK] Успішно додано {inserted} нових записів.")
+            return inserted
+        except psycopg2.Error as e:
+            print(f"ПОМИЛКА: Помилка масового завантаження даних: {e}")
+            conn.rollback()
+            return 0
 
 
 # ====================================================================
 # CRUD ОПЕРАЦІЇ
 # ====================================================================
 
-def execute_crud_operation(sql: str, params: tuple = None, operation_name: str = "Query") -> Optional[int]:
-    """Виконує CRUD операції (окрім SELECT) та повертає ID (для INSERT)."""
-    conn = get_connection()
-    if conn is None: return None
+def execute_crud_operation(sql: Optional[str] = None, params: tuple = None, operation_name: str = "Query",
+                           statement: Optional[str] = None) -> Optional[int]:
+    """
+    Виконує CRUD операції (окрім SELECT) та повертає ID (для INSERT).
+    statement — назва підготовленого оператора з user_statements() замість довільного sql.
+    З'єднання береться з пулу.
+    """
+    pool = get_pool()
+    if pool is None: return None
 
     returning_id = None
-    try:
-        with conn.cursor() as cur:
-            cur.execute(sql, params)
-            if operation_name == "INSERT":
-                returning_id = cur.fetchone()[0]
-            conn.commit()
-            print(f"УСПІХ: [{operation_name}] Операція успішна.")
-    except psycopg2.Error as e:
-        print(f"ПОМИЛКА: [{operation_name}] Помилка виконання: {e}")
-        conn.rollback()
-    finally:
-        if conn: conn.close()
+    with pool.connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                if statement is not None:
+                    pool.execute(cur, statement, params or ())
+                else:
+                    cur.execute(sql, params)
+                if operation_name == "INSERT":
+                    returning_id = cur.fetchone()[0]
+                conn.commit()
+                print(f"УСПІХ: [{operation_name}] Операція успішна.")
+        except psycopg2.Error as e:
+            print(f"ПОМИЛКА: [{operation_name}] Помилка виконання: {e}")
+            conn.rollback()
     return returning_id
 
 
@@ -138,30 +180,28 @@ def execute_crud_operation(sql: str, params: tuple = None, operation_name: str =
 
 if __name__ == '__main__':
 
+    pool = get_pool()
+
     # 0. Початкове наповнення: Створюємо 10 записів
     print("\n" + "=" * 80)
     print(f"--- 0. ГЕНЕРАЦІЯ: Вставляємо {NUM_RECORDS_TO_INSERT} записів (username/email збігаються) ---")
     insert_batch_data(generate_fake_data(NUM_RECORDS_TO_INSERT))
 
-    # 1. ПЕРШИЙ SELECT: Виведення всієї таблиці (останні 10)
-    conn_select = get_connection()
-    if conn_select:
-        print_table(conn_select, limit=10, title="1. SELECT: Стан таблиці після початкового наповнення")
-        conn_select.close()
+    if pool:
+        # 1. ПЕРШИЙ SELECT: Виведення всієї таблиці (останні 10)
+        with pool.connection() as conn_select:
+            print_table(conn_select, limit=10, title="1. SELECT: Стан таблиці після початкового наповнення")
 
-    # 1.1. ОКРЕМИЙ SELECT: Виведення частинки таблиці (перших 3 записи)
-    conn_select_part = get_connection()
-    if conn_select_part:
-        print_table(conn_select_part, limit=0, title="1.1. SELECT: Вивід частини таблиці (перші 3 записи)")
-        conn_select_part.close()
+        # 1.1. ОКРЕМИЙ SELECT: Виведення частинки таблиці (перших 3 записи)
+        with pool.connection() as conn_select_part:
+            print_table(conn_select_part, limit=0, title="1.1. SELECT: Вивід частини таблиці (перші 3 записи)")
 
     # 2. INSERT: Додаємо новий тестовий запис
     print("\n" + "=" * 80)
     print("--- 2. INSERT: Додавання одного тестового запису ---")
     TEST_USERNAME = "FINAL_TESTER_100"
-    sql_insert = f"INSERT INTO {TABLE_NAME} (username, email, age) VALUES (%s, %s, %s) RETURNING id;"
     new_user_id = execute_crud_operation(
-        sql=sql_insert,
+        statement="insert_user",
         params=(TEST_USERNAME, f"{TEST_USERNAME}@testcompany.org", 100),
         operation_name="INSERT"
     )
@@ -169,43 +209,38 @@ if __name__ == '__main__':
     # 2.1. SELECT: Вивід таблиці після INSERT
     if new_user_id:
         test_id = new_user_id
-        conn_post_insert = get_connection()
-        if conn_post_insert:
+        with pool.connection() as conn_post_insert:
             print_table(conn_post_insert, limit=11,
                         title=f"2.1. SELECT: Стан таблиці після INSERT (додано ID: {test_id})")
-            conn_post_insert.close()
 
         # 3. UPDATE: Зміна email
         print("\n" + "=" * 80)
         print(f"--- 3. UPDATE: Зміна email для ID {test_id} ---")
         new_email_value = f"UPDATED_FINAL_{test_id}@newdomain.com"
-        sql_update = f"UPDATE {TABLE_NAME} SET email = %s WHERE id = %s;"
         execute_crud_operation(
-            sql=sql_update,
+            statement="update_email",
             params=(new_email_value, test_id),
             operation_name="UPDATE"
         )
 
         # 3.1. SELECT: Вивід таблиці після UPDATE
-        conn_post_update = get_connection()
-        if conn_post_update:
+        with pool.connection() as conn_post_update:
             print_table(conn_post_update, limit=11,
                         title=f"3.1. SELECT: Стан таблиці після UPDATE (змінено ID: {test_id})")
-            conn_post_update.close()
 
         # 4. DELETE: Видалення тестового запису
         print("\n" + "=" * 80)
         print(f"--- 4. DELETE: Видалення тестового користувача ID {test_id} ---")
-        sql_delete = f"DELETE FROM {TABLE_NAME} WHERE id = %s;"
         execute_crud_operation(
-            sql=sql_delete,
+            statement="delete_user",
             params=(test_id,),
             operation_name="DELETE"
         )
 
         # 4.1. SELECT: Вивід таблиці після DELETE
-        conn_post_delete = get_connection()
-        if conn_post_delete:
+        with pool.connection() as conn_post_delete:
             print_table(conn_post_delete, limit=10,
                         title=f"4.1. SELECT: Стан таблиці після DELETE (видалено ID: {test_id})")
-            conn_post_delete.close()
\ No newline at end of file
+
+    if pool:
+        pool.close()
@@ -0,0 +1,145 @@
+import csv
+import json
+import sys
+import uuid
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+
+from psycopg2 import extensions, sql
+
+# Розмір сторінки для keyset-пагінації та itersize для серверного курсора
+DEFAULT_PAGE_SIZE = 5000
+
+COLUMNS = ("id", "username", "email", "age")
+
+
+def iter_keyset_pages(conn, table_name: str, page_size: int = DEFAULT_PAGE_SIZE, descending: bool = False,
+                      after_id: Optional[int] = None, limit: Optional[int] = None) -> Iterator[List[Tuple]]:
+    """
+    Сторінки таблиці з keyset-пагінацією по id: кожен запит продовжує з останнього id
+    (WHERE id > :last ORDER BY id LIMIT :n), тож вартість сторінки не залежить від її номера,
+    на відміну від OFFSET. descending — від найбільших id; limit — загальна кількість рядків.
+    """
+    comparison, order = ("<", "DESC") if descending else (">", "ASC")
+    first_query = sql.SQL("SELECT id, username, email, age FROM {} ORDER BY id " + order + " LIMIT %s") \
+        .format(sql.Identifier(table_name))
+    next_query = sql.SQL("SELECT id, username, email, age FROM {} WHERE id " + comparison + " %s "
+                         "ORDER BY id " + order + " LIMIT %s").format(sql.Identifier(table_name))
+
+    last_id = after_id
+    remaining = limit
+    with conn.cursor() as cur:
+        while remaining is None or remaining > 0:
+            n = page_size if remaining is None else min(page_size, remaining)
+            if last_id is None:
+                cur.execute(first_query, (n,))
+            else:
+                cur.execute(next_query, (last_id, n))
+            page = cur.fetchall()
+            if not page:
+                break
+            yield page
+            last_id = page[-1][0]
+            if remaining is not None:
+                remaining -= len(page)
+            if len(page) < n:
+                break
+
+
+def iter_server_cursor(conn, table_name: str, itersize: int = DEFAULT_PAGE_SIZE, descending: bool = False,
+                       limit: Optional[int] = None) -> Iterator[Tuple]:
+    """
+    Рядки таблиці через іменований (серверний) курсор: клієнт отримує по itersize рядків за раз,
+    результат не матеріалізується ні в Python, ні в libpq. Курсор живе в транзакції: якщо її
+    відкрив сам генератор, він її й відкочує; уже відкриту транзакцію викликача не чіпає
+    (закривається лише курсор).
+    """
+    query = sql.SQL("SELECT id, username, email, age FROM {} ORDER BY id " + ("DESC" if descending else "ASC")) \
+        .format(sql.Identifier(table_name))
+    params: Tuple = ()
+    if limit is not None:
+        query = query + sql.SQL(" LIMIT %s")
+        params = (limit,)
+    owns_transaction = conn.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+    try:
+        with conn.cursor(name=f"export_{uuid.uuid4().hex}") as cur:
+            cur.itersize = itersize
+            cur.execute(query, params)
+            yield from cur
+    finally:
+        if owns_transaction:
+            conn.rollback()
+
+
+def iter_users(conn, table_name: str, method: str = "keyset", page_size: int = DEFAULT_PAGE_SIZE,
+               descending: bool = False, limit: Optional[int] = None) -> Iterator[Tuple]:
+    """Потік рядків (id, username, email, age): method — 'keyset' або 'cursor'."""
+    if method == "keyset":
+        for page in iter_keyset_pages(conn, table_name, page_size, descending=descending, limit=limit):
+            yield from page
+    elif method == "cursor":
+        yield from iter_server_cursor(conn, table_name, page_size, descending=descending, limit=limit)
+    else:
+        raise ValueError(f"Невідомий метод читання: {method}")
+
+
+def format_row(row: Tuple) -> str:
+    """Рядок таблиці у форматі виводу print_table."""
+    return f"{row[0]:<5} {row[1]:<25} {row[2]:<40} {row[3]:<5}"
+
+
+def write_rows(rows: Iterable[Tuple], out: IO[str], fmt: str = "table") -> int:
+    """Потоково пише рядки у out як 'table', 'csv' або 'jsonl'. Повертає кількість рядків."""
+    count = 0
+    if fmt == "table":
+        out.write(f"{'ID':<5} {'USERNAME':<25} {'EMAIL':<40} {'AGE':<5}\n")
+        out.write("-" * 80 + "\n")
+        for row in rows:
+            out.write(format_row(row) + "\n")
+            count += 1
+    elif fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(COLUMNS)
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    elif fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(dict(zip(COLUMNS, row))) + "\n")
+            count += 1
+    else:
+        raise ValueError(f"Невідомий формат: {fmt}")
+    return count
+
+
+def export_users(conn, table_name: str, out: IO[str] = sys.stdout, fmt: str = "table", method: str = "keyset",
+                 page_size: int = DEFAULT_PAGE_SIZE, descending: bool = False, limit: Optional[int] = None) -> int:
+    """Експорт таблиці з постійним споживанням пам'яті (не більше сторінки рядків одночасно)."""
+    return write_rows(iter_users(conn, table_name, method, page_size, descending, limit), out, fmt)
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from main import TABLE_NAME, get_pool
+
+    parser = argparse.ArgumentParser(description="Потоковий експорт таблиці users.")
+    parser.add_argument("--format", choices=["table", "csv", "jsonl"], default="table")
+    parser.add_argument("--method", choices=["keyset", "cursor"], default="keyset")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--desc", action="store_true", help="Від найбільших id.")
+    parser.add_argument("--output", help="Файл для запису (за замовчуванням — stdout).")
+    args = parser.parse_args()
+
+    pool = get_pool()
+    if pool:
+        out = open(args.output, "w", newline="") if args.output else sys.stdout
+        try:
+            with pool.connection() as conn:
+                count = export_users(conn, TABLE_NAME, out, args.format, args.method, args.page_size,
+                                     args.desc, args.limit)
+        finally:
+            if args.output:
+                out.close()
+        print(f"УСПІХ: [EXPORT] Експортовано {count} записів.", file=sys.stderr)
+        pool.close()
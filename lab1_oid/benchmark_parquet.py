@@ -0,0 +1,135 @@
+import argparse
+import itertools
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import pyarrow.parquet as pq
+
+from csv_to_parquet import DEFAULT_ROW_GROUP_SIZE, convert_csv_to_parquet, open_csv_stream
+from ecommerce_data import write_ecommerce_csv
+
+PROJECTED_COLUMNS = ["event_type", "price"]
+
+# Предикат по event_time (події впорядковані за часом) — статистики груп рядків відсікають зайві групи
+TIME_FROM = datetime(2019, 10, 10, tzinfo=timezone.utc)
+TIME_TO = datetime(2019, 10, 12, tzinfo=timezone.utc)
+
+
+def _min_time(fn, repeats: int):
+    """Мінімальний час із repeats запусків (шум на спільній машині лише збільшує час)."""
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _read_csv_full(csv_path: str) -> int:
+    return sum(batch.num_rows for batch in open_csv_stream(csv_path))
+
+
+def _read_full(path: str) -> int:
+    return pq.read_table(path).num_rows
+
+
+def _read_projection(path: str) -> int:
+    return pq.read_table(path, columns=PROJECTED_COLUMNS).num_rows
+
+
+def _read_purchases(path: str) -> int:
+    return pq.read_table(path, columns=PROJECTED_COLUMNS, filters=[("event_type", "=", "purchase")]).num_rows
+
+
+def _read_time_range(path: str) -> int:
+    return pq.read_table(path, columns=PROJECTED_COLUMNS,
+                         filters=[("event_time", ">=", TIME_FROM), ("event_time", "<", TIME_TO)]).num_rows
+
+
+def _groups_after_pruning(path: str) -> int:
+    """Скільки груп рядків не відсікаються статистиками min/max event_time."""
+    metadata = pq.ParquetFile(path).metadata
+    column = metadata.schema.names.index("event_time")
+    kept = 0
+    for i in range(metadata.num_row_groups):
+        stats = metadata.row_group(i).column(column).statistics
+        if stats is None or not stats.has_min_max or (stats.max >= TIME_FROM and stats.min < TIME_TO):
+            kept += 1
+    return kept
+
+
+READ_QUERIES = [
+    ("full", _read_full),
+    ("projection", _read_projection),
+    ("purchase", _read_purchases),
+    ("time_range", _read_time_range),
+]
+
+
+def run_benchmark(csv_path: str, codecs, row_group_sizes, dictionary_options, repeats: int, work_dir: str) -> list:
+    results = []
+    csv_size = os.path.getsize(csv_path)
+    csv_read, rows = _min_time(lambda: _read_csv_full(csv_path), repeats)
+    results.append({"format": "csv", "size_mb": csv_size / 2 ** 20, "write_s": None, "full_s": csv_read})
+
+    print(f"\n--- CSV → Parquet: {rows:,} рядків, CSV {csv_size / 2 ** 20:.1f} МБ, повне читання {csv_read:.2f} с ---")
+    header = f"{'КОДЕК':<7} {'ГРУПА':>9} {'СЛОВН.':>6} {'МБ':>7} {'СТИСН.':>6} {'ЗАПИС,С':>8} " + \
+             " ".join(f"{name.upper() + ',С':>12}" for name, _ in READ_QUERIES) + f" {'ГРУП':>9}"
+    print(header)
+    print("-" * len(header))
+
+    for codec, row_group_size, use_dictionary in itertools.product(codecs, row_group_sizes, dictionary_options):
+        path = os.path.join(work_dir, f"bench_{codec}_{row_group_size}_{int(use_dictionary)}.parquet")
+        write_s, _ = _min_time(lambda: convert_csv_to_parquet(csv_path, path, codec, row_group_size, use_dictionary),
+                               repeats)
+        size = os.path.getsize(path)
+        result = {"format": "parquet", "codec": codec, "row_group_size": row_group_size,
+                  "dictionary": use_dictionary, "size_mb": size / 2 ** 20, "write_s": write_s,
+                  "row_groups": pq.ParquetFile(path).metadata.num_row_groups,
+                  "row_groups_time_range": _groups_after_pruning(path)}
+
+        # Запити перемежовуються між повторами, щоб кешування і фоновий шум впливали на всі однаково
+        best = {name: float("inf") for name, _ in READ_QUERIES}
+        for _ in range(repeats):
+            for name, query in READ_QUERIES:
+                elapsed, result[f"{name}_rows"] = _min_time(lambda: query(path), 1)
+                best[name] = min(best[name], elapsed)
+        result.update({f"{name}_s": elapsed for name, elapsed in best.items()})
+        results.append(result)
+        os.remove(path)
+
+        print(f"{codec:<7} {row_group_size:>9,} {'так' if use_dictionary else 'ні':>6} {size / 2 ** 20:>7.1f} "
+              f"{csv_size / size:>6.1f} {write_s:>8.2f} " +
+              " ".join(f"{best[name]:>12.3f}" for name, _ in READ_QUERIES) +
+              f" {result['row_groups_time_range']:>4}/{result['row_groups']:<4}")
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Бенчмарк Parquet: кодек × розмір групи рядків × словник.")
+    parser.add_argument("--csv", help="Готовий CSV у форматі 2019-Oct.csv (інакше генерується синтетичний).")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="Рядків у синтетичному CSV.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--codecs", nargs="+", default=["snappy", "gzip", "zstd", "lz4"])
+    parser.add_argument("--row-group-sizes", nargs="+", type=int, default=[100_000, DEFAULT_ROW_GROUP_SIZE])
+    parser.add_argument("--dictionary", choices=["on", "off", "both"], default="both")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", help="Записати результати у JSON-файл.")
+    args = parser.parse_args()
+
+    dictionary_options = {"on": [True], "off": [False], "both": [True, False]}[args.dictionary]
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = args.csv
+        if csv_path is None:
+            csv_path = os.path.join(work_dir, "ecommerce.csv")
+            write_ecommerce_csv(csv_path, args.rows, seed=args.seed)
+        results = run_benchmark(csv_path, args.codecs, args.row_group_sizes, dictionary_options, args.repeats,
+                                work_dir)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
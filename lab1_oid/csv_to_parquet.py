@@ -0,0 +1,88 @@
+import argparse
+import time
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from ecommerce_data import SCHEMA, TIMESTAMP_FORMAT
+
+CODECS = ("snappy", "gzip", "zstd", "lz4", "none")
+
+DEFAULT_BLOCK_SIZE = 16 * 2 ** 20  # байтів CSV, що читаються за раз
+DEFAULT_ROW_GROUP_SIZE = 1_000_000
+
+# Типи колонок для читання CSV: event_time без часової зони, бо pyarrow не розбирає
+# суфікс " UTC" як зону; зона додається приведенням до SCHEMA
+_CSV_TYPES = {field.name: field.type for field in SCHEMA}
+_CSV_TYPES["event_time"] = pa.timestamp("s")
+
+
+def open_csv_stream(csv_path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> pa_csv.CSVStreamingReader:
+    """
+    Потоковий читач CSV з явною схемою: без inferSchema, тобто без додаткового проходу по файлу.
+    У пам'яті одночасно лише один блок block_size байтів.
+    """
+    return pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=_CSV_TYPES,
+            timestamp_parsers=[TIMESTAMP_FORMAT],
+            strings_can_be_null=True,
+            include_columns=SCHEMA.names,
+        ),
+    )
+
+
+def iter_csv_batches(csv_path: str, block_size: int = DEFAULT_BLOCK_SIZE):
+    """RecordBatch'і CSV, приведені до SCHEMA."""
+    for batch in open_csv_stream(csv_path, block_size):
+        yield batch.cast(SCHEMA)
+
+
+def convert_csv_to_parquet(csv_path: str, parquet_path: str, codec: str = "snappy",
+                           row_group_size: int = DEFAULT_ROW_GROUP_SIZE, use_dictionary: bool = True,
+                           block_size: int = DEFAULT_BLOCK_SIZE) -> int:
+    """
+    Конвертує CSV у Parquet частинами: блоки CSV накопичуються до row_group_size рядків
+    і записуються однією групою рядків, тож пам'ять обмежена розміром групи.
+    Повертає кількість записаних рядків.
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Невідомий кодек: {codec}")
+
+    written = 0
+    pending = []
+    pending_rows = 0
+    with pq.ParquetWriter(parquet_path, SCHEMA, compression=codec, use_dictionary=use_dictionary) as writer:
+        for batch in iter_csv_batches(csv_path, block_size):
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            while pending_rows >= row_group_size:
+                table = pa.Table.from_batches(pending, SCHEMA)
+                writer.write_table(table.slice(0, row_group_size), row_group_size=row_group_size)
+                rest = table.slice(row_group_size)
+                pending = rest.to_batches()
+                pending_rows = rest.num_rows
+                written += row_group_size
+        if pending_rows:
+            writer.write_table(pa.Table.from_batches(pending, SCHEMA), row_group_size=row_group_size)
+            written += pending_rows
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Потокова конвертація 2019-Oct.csv у Parquet.")
+    parser.add_argument("csv_path")
+    parser.add_argument("parquet_path")
+    parser.add_argument("--codec", choices=CODECS, default="snappy")
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    parser.add_argument("--no-dictionary", action="store_true")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="Розмір блоку читання CSV, байтів.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = convert_csv_to_parquet(args.csv_path, args.parquet_path, args.codec, args.row_group_size,
+                                   not args.no_dictionary, args.block_size)
+    print(f"Записано {count:,} рядків у {args.parquet_path} ({args.codec}) за {time.perf_counter() - start:.1f} сек.")
@@ -0,0 +1,126 @@
+import argparse
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# Схема датасету eCommerce behavior data (2019-Oct.csv) — цільова схема Parquet
+SCHEMA = pa.schema([
+    ("event_time", pa.timestamp("s", tz="UTC")),
+    ("event_type", pa.string()),
+    ("product_id", pa.int64()),
+    ("category_id", pa.int64()),
+    ("category_code", pa.string()),
+    ("brand", pa.string()),
+    ("price", pa.float64()),
+    ("user_id", pa.int64()),
+    ("user_session", pa.string()),
+])
+
+# Формат event_time у CSV: "2019-10-01 00:00:00 UTC"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S UTC"
+
+EVENT_TYPES = np.array(["view", "cart", "remove_from_cart", "purchase"])
+EVENT_WEIGHTS = np.array([0.90, 0.05, 0.03, 0.02])
+
+_CATEGORY_WORDS = ["electronics", "appliances", "computers", "apparel", "furniture", "kids", "sport",
+                   "construction", "auto", "accessories"]
+_SUB_WORDS = ["smartphone", "audio.headphone", "kitchen.washer", "notebook", "shoes", "bed", "toys",
+              "bicycle", "tools.drill", "bag", "video.tv", "clocks", "environment.vacuum"]
+_BRANDS = ["samsung", "apple", "xiaomi", "huawei", "lucente", "bosch", "lg", "sony", "acer", "lenovo",
+           "respect", "oasis", "casio", "philips", "elenberg", "redmond", "haier", "asus", "hp", "indesit"]
+
+MONTH_START = int(datetime(2019, 10, 1, tzinfo=timezone.utc).timestamp())
+MONTH_SECONDS = 31 * 24 * 3600
+
+DEFAULT_CHUNK_ROWS = 500_000
+
+
+class _Catalog:
+    """Довідники товарів, категорій і сесій, з яких вибираються події."""
+
+    def __init__(self, rng: np.random.Generator, num_products: int, num_categories: int, num_sessions: int):
+        # Вибираються індекси, а не елементи матеріалізованого діапазону (мільйон id категорій,
+        # 99 млн id товарів — сотні МБ навіть для тисячі рядків)
+        category_ids = np.sort(2_053_013_552_000_000_000 + 7919 * rng.choice(1_010_229, num_categories, replace=False))
+        codes = np.array([f"{rng.choice(_CATEGORY_WORDS)}.{rng.choice(_SUB_WORDS)}" for _ in range(num_categories)],
+                         dtype=object)
+        codes[rng.random(num_categories) < 0.3] = None  # у реальних даних category_code часто порожній
+
+        self.product_ids = np.sort(rng.choice(99_000_000, num_products, replace=False) + 1_000_000)
+        product_category = rng.integers(0, num_categories, num_products)
+        self.product_category_ids = category_ids[product_category]
+        self.product_category_codes = codes[product_category]
+        brands = np.array(_BRANDS, dtype=object)[rng.integers(0, len(_BRANDS), num_products)]
+        brands[rng.random(num_products) < 0.15] = None
+        self.product_brands = brands
+        self.product_prices = np.round(rng.lognormal(4.0, 1.2, num_products), 2)
+
+        self.sessions = np.array([
+            f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+            for h in (rng.bytes(16).hex() for _ in range(num_sessions))], dtype=object)
+        self.session_users = rng.integers(510_000_000, 566_000_000, num_sessions)
+
+
+def iter_ecommerce_batches(num_rows: int, seed: int = 0, chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                           num_products: int = 50_000, num_categories: int = 600):
+    """
+    Синтетичні події у формі 2019-Oct.csv блоками pyarrow.Table (event_time — рядок у форматі CSV).
+    Події впорядковані за часом, як у вихідному файлі; популярність товарів — за законом Ципфа.
+    """
+    rng = np.random.default_rng(seed)
+    catalog = _Catalog(rng, num_products, num_categories, num_sessions=max(1, min(num_rows // 8, 200_000)))
+
+    for start in range(0, num_rows, chunk_rows):
+        n = min(chunk_rows, num_rows - start)
+        rows = np.arange(start, start + n)
+        seconds = MONTH_START + rows * MONTH_SECONDS // max(num_rows, 1)
+        event_time = np.datetime_as_string(seconds.astype("datetime64[s]"), unit="s")
+        event_time = np.char.add(np.char.replace(event_time, "T", " "), " UTC")
+
+        product = np.minimum(rng.zipf(1.3, n) - 1, num_products - 1)
+        session = rng.integers(0, len(catalog.sessions), n)
+        price_jitter = np.where(rng.random(n) < 0.1, rng.uniform(0.9, 1.1, n), 1.0)
+
+        yield pa.table({
+            "event_time": pa.array(event_time.astype(object), pa.string()),
+            "event_type": pa.array(EVENT_TYPES[rng.choice(len(EVENT_TYPES), n, p=EVENT_WEIGHTS)]),
+            "product_id": pa.array(catalog.product_ids[product]),
+            "category_id": pa.array(catalog.product_category_ids[product]),
+            "category_code": pa.array(catalog.product_category_codes[product], pa.string()),
+            "brand": pa.array(catalog.product_brands[product], pa.string()),
+            "price": pa.array(np.round(catalog.product_prices[product] * price_jitter, 2)),
+            "user_id": pa.array(catalog.session_users[session]),
+            "user_session": pa.array(catalog.sessions[session], pa.string()),
+        })
+
+
+def write_ecommerce_csv(path: str, num_rows: int, seed: int = 0, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """Пише синтетичний CSV з тим самим заголовком і форматом полів, що й 2019-Oct.csv."""
+    written = 0
+    writer = None
+    try:
+        for table in iter_ecommerce_batches(num_rows, seed=seed, chunk_rows=chunk_rows):
+            if writer is None:
+                # Значення не містять ком і лапок, тож, як в оригіналі, пишемо їх без лапок
+                writer = pa_csv.CSVWriter(path, table.schema, write_options=pa_csv.WriteOptions(quoting_style="none"))
+            writer.write_table(table)
+            written += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Генератор синтетичного e-commerce CSV (формат 2019-Oct.csv).")
+    parser.add_argument("--output", default="2019-Oct-synthetic.csv")
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = write_ecommerce_csv(args.output, args.rows, seed=args.seed)
+    print(f"Згенеровано {count:,} рядків у {args.output} за {time.perf_counter() - start:.1f} сек.")
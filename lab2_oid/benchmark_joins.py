@@ -0,0 +1,67 @@
+import argparse
+import os
+import tempfile
+import time
+
+from benchmark_rollup import make_source
+from joins import DEFAULT_SHUFFLE_PARTITIONS, plan_category_join
+from warehouse import (DEFAULT_PART_ROWS, SNOWFLAKE_CATEGORY_DIM, SNOWFLAKE_PRODUCT_DIM, STAR_PRODUCT_DIM,
+                       build_warehouse, category_purchases_snowflake, category_purchases_star, purchases_from_fact,
+                       read_dimension, read_fact)
+
+STRATEGIES = ("shuffle", "hash_join", "broadcast")
+
+
+def run_benchmark(base_dir: str, repeats: int) -> None:
+    star_product = read_dimension(base_dir, STAR_PRODUCT_DIM)
+    snowflake_product = read_dimension(base_dir, SNOWFLAKE_PRODUCT_DIM)
+    category = read_dimension(base_dir, SNOWFLAKE_CATEGORY_DIM)
+    queries = {
+        "star": lambda fact, strategy: category_purchases_star(fact, star_product, strategy=strategy),
+        "snowflake": lambda fact, strategy: category_purchases_snowflake(fact, snowflake_product, category,
+                                                                         strategy=strategy),
+    }
+    # Запит лабораторної (лише покупки) і JOIN усього факту, де різниця стратегій помітніша
+    scopes = {
+        "purchase": purchases_from_fact(base_dir),
+        "усі події": read_fact(base_dir, columns=["product_id"]),
+    }
+
+    print(f"\nВиміри: product_dim_star {star_product.nbytes / 2 ** 20:.1f} МБ, "
+          f"product_dim_snowflake {snowflake_product.nbytes / 2 ** 20:.1f} МБ, "
+          f"category_dim {category.nbytes / 2 ** 10:.1f} КБ")
+    print(f"План 'auto': зірка — {plan_category_join(star_product)}, "
+          f"сніжинка — {plan_category_join(snowflake_product, category)}")
+
+    for scope, fact in scopes.items():
+        print(f"\n--- {scope}: {fact.num_rows:,} рядків факту (shuffle: {DEFAULT_SHUFFLE_PARTITIONS} партицій) ---")
+        print(f"{'СХЕМА':<10} " + " ".join(f"{s.upper() + ', С':>14}" for s in STRATEGIES) + f" {'ЗБІГ':>6}")
+        print("-" * (11 + 15 * len(STRATEGIES) + 7))
+        for schema, query in queries.items():
+            best = {strategy: float("inf") for strategy in STRATEGIES}
+            results = {}
+            # Стратегії перемежовуються між повторами, щоб шум машини впливав на всі однаково
+            for _ in range(repeats):
+                for strategy in STRATEGIES:
+                    start = time.perf_counter()
+                    results[strategy] = query(fact, strategy)
+                    best[strategy] = min(best[strategy], time.perf_counter() - start)
+            reference = results[STRATEGIES[0]].sort_by("category_code")
+            same = all(result.sort_by("category_code").equals(reference) for result in results.values())
+            print(f"{schema:<10} " + " ".join(f"{best[s]:>14.3f}" for s in STRATEGIES) +
+                  f" {'так' if same else 'НІ':>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Стратегії JOIN для «Зірки» і «Сніжинки»: shuffle / hash / broadcast.")
+    parser.add_argument("--source", help="Parquet 2019-Oct (інакше генерується синтетичний).")
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        source_path = args.source or make_source(work_dir, args.rows, args.seed)
+        base_dir = os.path.join(work_dir, "warehouse")
+        build_warehouse(source_path, base_dir, DEFAULT_PART_ROWS)
+        run_benchmark(base_dir, args.repeats)
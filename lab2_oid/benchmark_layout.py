@@ -0,0 +1,81 @@
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+from benchmark_rollup import make_source
+from fact_layout import DEFAULT_ROW_GROUP_SIZE, layout_sizes, scan_fact, write_partitioned_fact
+from warehouse import DEFAULT_PART_ROWS, STAR_PRODUCT_DIM, build_warehouse, category_purchases_star, read_dimension
+
+LAYOUTS = (("звичайний", False), ("партиційований", True))
+
+
+def _queries(base_dir: str) -> list:
+    """(назва, функція(partitioned) → (таблиця, статистика)) — запити з різною вибірковістю."""
+    product_dim = read_dimension(base_dir, STAR_PRODUCT_DIM)
+    top_product = scan_fact(base_dir, ["product_id"], partitioned=False)[0]["product_id"][0].as_py()
+
+    def category_query(partitioned: bool):
+        purchases, stats = scan_fact(base_dir, ["product_id"], event_type="purchase", partitioned=partitioned)
+        return category_purchases_star(purchases, product_dim), stats
+
+    return [
+        ("покупки за категоріями", category_query),
+        ("покупки, 2 дні", lambda p: scan_fact(base_dir, ["product_id", "price"], event_type="purchase",
+                                               date_from=date(2019, 10, 10), date_to=date(2019, 10, 12),
+                                               partitioned=p)),
+        (f"товар {top_product}, 1 день", lambda p: scan_fact(base_dir, ["event_time", "user_id"],
+                                                             date_from=date(2019, 10, 15), date_to=date(2019, 10, 16),
+                                                             product_id_from=top_product,
+                                                             product_id_to=top_product + 1, partitioned=p)),
+        ("повне сканування", lambda p: scan_fact(base_dir, ["product_id", "price"], partitioned=p)),
+    ]
+
+
+def _same(a, b) -> bool:
+    order = [(name, "ascending") for name in a.column_names]
+    return a.sort_by(order).equals(b.sort_by(order))
+
+
+def run_benchmark(base_dir: str, row_group_size: int, repeats: int) -> None:
+    start = time.perf_counter()
+    summary = write_partitioned_fact(base_dir, row_group_size)
+    sizes = layout_sizes(base_dir)
+    print(f"\nПартиційований шар: {summary['files']} файлів за {time.perf_counter() - start:.1f} сек.; "
+          f"на диску {sizes['plain'] / 2 ** 20:.1f} МБ (звичайний) vs {sizes['partitioned'] / 2 ** 20:.1f} МБ")
+
+    print(f"\n{'ЗАПИТ':<28} {'ШАР':<15} {'РЯДКІВ':>10} {'ФАЙЛІВ':>11} {'ГРУП':>6} {'ПРОЧИТАНО, МБ':>14} "
+          f"{'ЧАС, С':>8} {'ЗБІГ':>5}")
+    print("-" * 104)
+    for name, query in _queries(base_dir):
+        best = {partitioned: float("inf") for _, partitioned in LAYOUTS}
+        results = {}
+        # Шари перемежовуються між повторами, щоб шум машини впливав на обидва однаково
+        for _ in range(repeats):
+            for _, partitioned in LAYOUTS:
+                start = time.perf_counter()
+                results[partitioned] = query(partitioned)
+                best[partitioned] = min(best[partitioned], time.perf_counter() - start)
+        same = _same(results[False][0], results[True][0])
+        for label, partitioned in LAYOUTS:
+            table, stats = results[partitioned]
+            print(f"{name:<28} {label:<15} {table.num_rows:>10,} "
+                  f"{stats['files_read']:>5}/{stats['files_total']:<5} {stats['row_groups_read']:>6} "
+                  f"{stats['bytes_read'] / 2 ** 20:>14.2f} {best[partitioned]:>8.3f} {'так' if same else 'НІ':>5}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Партиційований і відсортований sales_fact vs звичайний шар.")
+    parser.add_argument("--source", help="Parquet 2019-Oct (інакше генерується синтетичний).")
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        source_path = args.source or make_source(work_dir, args.rows, args.seed)
+        base_dir = os.path.join(work_dir, "warehouse")
+        build_warehouse(source_path, base_dir, DEFAULT_PART_ROWS)
+        run_benchmark(base_dir, args.row_group_size, args.repeats)
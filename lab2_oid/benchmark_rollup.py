@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from rollup import SCHEMAS, category_purchases, refresh_rollup
+from warehouse import DEFAULT_PART_ROWS, append_fact_part, build_warehouse
+
+# Синтетичний датасет і конвертер — з lab1
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lab1_oid"))
+from csv_to_parquet import convert_csv_to_parquet  # noqa: E402
+from ecommerce_data import write_ecommerce_csv  # noqa: E402
+
+
+def make_source(work_dir: str, num_rows: int, seed: int) -> str:
+    """Parquet у форматі 2019-Oct, згенерований локально (без Google Drive)."""
+    csv_path = os.path.join(work_dir, "ecommerce.csv")
+    parquet_path = os.path.join(work_dir, "ecommerce.parquet")
+    write_ecommerce_csv(csv_path, num_rows, seed=seed)
+    convert_csv_to_parquet(csv_path, parquet_path)
+    os.remove(csv_path)
+    return parquet_path
+
+
+def _min_time(fn, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _same(a: pa.Table, b: pa.Table) -> bool:
+    return a.sort_by("category_code").equals(b.sort_by("category_code"))
+
+
+def run_benchmark(source_path: str, base_dir: str, part_rows: int, repeats: int) -> None:
+    # Остання частина джерела імітує нові дані, що надходять після побудови rollup
+    source = pq.ParquetFile(source_path)
+    start = time.perf_counter()
+    counts = build_warehouse(source_path, base_dir, part_rows)
+    print(f"\nТаблиці побудовано за {time.perf_counter() - start:.1f} сек.: {counts}")
+
+    build_s, stats = _min_time(lambda: refresh_rollup(base_dir), 1)
+    print(f"Повна побудова rollup: {build_s:.2f} сек., {stats['rollup_rows']:,} рядків rollup "
+          f"замість {counts['sales_fact']:,} рядків факту")
+    noop_s, _ = _min_time(lambda: refresh_rollup(base_dir), 1)
+    print(f"Refresh без нових частин: {noop_s * 1000:.1f} мс")
+
+    new_part = source.read_row_group(0).slice(0, min(part_rows, source.metadata.num_rows))
+    append_fact_part(base_dir, new_part)
+    incremental_s, stats = _min_time(lambda: refresh_rollup(base_dir), 1)
+    print(f"Інкрементальний refresh (1 нова частина, {new_part.num_rows:,} рядків): {incremental_s:.2f} сек., "
+          f"агреговано частин: {stats['aggregated_parts']} з {stats['total_parts']}")
+
+    print(f"\n{'СХЕМА':<10} {'БЕЗ ROLLUP, С':>14} {'З ROLLUP, С':>12} {'ПРИСКОРЕННЯ':>12} {'ЗБІГ':>6}")
+    print("-" * 58)
+    for schema in SCHEMAS:
+        best = {"fact": float("inf"), "rollup": float("inf")}
+        results = {}
+        # Варіанти перемежовуються, щоб шум машини впливав на обидва однаково
+        for _ in range(repeats):
+            for use_rollup in (False, True):
+                elapsed, (result, source_name) = _min_time(
+                    lambda: category_purchases(base_dir, schema, use_rollup=use_rollup), 1)
+                best[source_name] = min(best[source_name], elapsed)
+                results[source_name] = result
+        print(f"{schema:<10} {best['fact']:>14.3f} {best['rollup']:>12.3f} "
+              f"{best['fact'] / best['rollup']:>11.1f}x {'так' if _same(results['fact'], results['rollup']) else 'НІ':>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Запит за category_code: повне сканування vs rollup.")
+    parser.add_argument("--source", help="Parquet 2019-Oct (інакше генерується синтетичний).")
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--part-rows", type=int, default=DEFAULT_PART_ROWS)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        source_path = args.source or make_source(work_dir, args.rows, args.seed)
+        run_benchmark(source_path, os.path.join(work_dir, "warehouse"), args.part_rows, args.repeats)
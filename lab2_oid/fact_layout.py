@@ -0,0 +1,244 @@
+import argparse
+import glob
+import json
+import os
+import shutil
+import time
+from datetime import date, datetime, time as dt_time, timezone
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from warehouse import fact_part_files, table_path
+
+# Факт, розбитий на партиції event_type=<тип>/event_date=<день>, відсортований за product_id у кожному файлі
+PARTITIONED_FACT_DIR = "sales_fact_partitioned"
+# Статистики файлів (рядки, байти, min/max product_id та event_time) — для відсікання без відкриття файлів
+FILE_STATS_NAME = "_file_stats.json"
+
+# Невеликі групи рядків: у файлі, відсортованому за product_id, min/max групи відсікають більшість груп
+DEFAULT_ROW_GROUP_SIZE = 64 * 1024
+
+PARTITION_COLUMNS = ["event_type", "event_date"]
+FILE_COLUMNS = ["event_time", "price", "product_id", "user_id"]
+
+# Каталог для рядків без значення ключа партиції — так його називають Hive і pyarrow.dataset
+HIVE_DEFAULT_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, dt_time.min, tzinfo=timezone.utc)
+
+
+def _partition_value(value) -> str:
+    if value is None:
+        return HIVE_DEFAULT_PARTITION
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def _partition_runs(table: pa.Table):
+    """(event_type, event_date, зріз) — послідовні ділянки таблиці, відсортованої за ключем партиції."""
+    order = [(column, "ascending") for column in PARTITION_COLUMNS]
+    runs = table.group_by(PARTITION_COLUMNS, use_threads=False).aggregate([([], "count_all")]).sort_by(order)
+    start = 0
+    for event_type, event_date, count in zip(*(runs[c].to_pylist() for c in runs.column_names)):
+        yield event_type, event_date, table.slice(start, count)
+        start += count
+
+
+def _to_ms(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    """Мілісекунди від епохи незалежно від одиниці timestamp-колонки (частки мс відкидаються)."""
+    return pc.cast(column, pa.timestamp("ms", tz=column.type.tz), safe=False).cast(pa.int64())
+
+
+def _min_max(column: pa.ChunkedArray) -> list:
+    result = pc.min_max(column)
+    return [result["min"].as_py(), result["max"].as_py()]
+
+
+def write_partitioned_fact(base_dir: str, row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> dict:
+    """
+    Переписує sales_fact у партиційований вигляд: каталоги event_type=…/event_date=…, файли
+    відсортовані за product_id. Частини факту обробляються по одній (пам'ять — одна частина),
+    кожна дає по файлу в кожну свою партицію. Поруч пишеться _file_stats.json.
+    Рядки без event_time (чи event_type) потрапляють у каталог HIVE_DEFAULT_PARTITION.
+    """
+    out_dir = table_path(base_dir, PARTITIONED_FACT_DIR)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir)
+
+    file_stats = {}
+    for part_path in fact_part_files(base_dir):
+        part_name = os.path.splitext(os.path.basename(part_path))[0]
+        fact = pq.read_table(part_path)
+        fact = fact.append_column("event_date", pc.cast(fact["event_time"], pa.date32()))
+        fact = fact.sort_by([("event_type", "ascending"), ("event_date", "ascending"), ("product_id", "ascending")])
+
+        for event_type, event_date, rows in _partition_runs(fact):
+            relative = os.path.join(f"event_type={_partition_value(event_type)}",
+                                    f"event_date={_partition_value(event_date)}", f"{part_name}.parquet")
+            path = os.path.join(out_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            pq.write_table(rows.select(FILE_COLUMNS), path, row_group_size=row_group_size)
+            file_stats[relative] = {
+                "rows": rows.num_rows,
+                "bytes": os.path.getsize(path),
+                "product_id": _min_max(rows["product_id"]),
+                "event_time": _min_max(_to_ms(rows["event_time"])),
+            }
+
+    with open(os.path.join(out_dir, FILE_STATS_NAME), "w", encoding="utf-8") as f:
+        json.dump(file_stats, f, indent=1, sort_keys=True)
+    return {"files": len(file_stats), "rows": sum(s["rows"] for s in file_stats.values()),
+            "bytes": sum(s["bytes"] for s in file_stats.values())}
+
+
+def _overlaps(bounds, low, high) -> bool:
+    """Чи перетинається [min, max] з [low, high) (None — без обмеження)."""
+    if bounds is None:
+        return True
+    lo, hi = bounds
+    return (high is None or lo < high) and (low is None or hi >= low)
+
+
+def _row_group_bounds(metadata, row_group: int, column: str):
+    index = metadata.schema.names.index(column)
+    stats = metadata.row_group(row_group).column(index).statistics
+    if stats is None or not stats.has_min_max:
+        return None
+    lo, hi = stats.min, stats.max
+    # Для timestamp без часового поясу статистики — «наївні» datetime у UTC
+    if isinstance(lo, datetime) and lo.tzinfo is None:
+        lo, hi = lo.replace(tzinfo=timezone.utc), hi.replace(tzinfo=timezone.utc)
+    return lo, hi
+
+
+def _scan_file(path: str, columns: list, stats: dict, conditions: dict, event_type: str = None):
+    """
+    Читає лише групи рядків, чиї min/max можуть задовольнити conditions ({колонка: (low, high)})
+    та event_type, і фільтрує рядки. Оновлює stats; повертає None, якщо жодна група не підходить.
+    """
+    parquet_file = pq.ParquetFile(path)
+    metadata = parquet_file.metadata
+    needed = sorted(set(columns) | set(conditions) | ({"event_type"} if event_type else set()))
+    row_groups = []
+    for i in range(metadata.num_row_groups):
+        if not all(_overlaps(_row_group_bounds(metadata, i, column), low, high)
+                   for column, (low, high) in conditions.items()):
+            continue
+        if event_type is not None:
+            bounds = _row_group_bounds(metadata, i, "event_type")
+            if bounds is not None and not bounds[0] <= event_type <= bounds[1]:
+                continue
+        row_groups.append(i)
+    if not row_groups:
+        return None
+
+    indices = [metadata.schema.names.index(column) for column in needed]
+    stats["bytes_read"] += sum(metadata.row_group(i).column(c).total_compressed_size
+                               for i in row_groups for c in indices)
+    stats["row_groups_read"] += len(row_groups)
+    table = parquet_file.read_row_groups(row_groups, columns=needed)
+
+    mask = None
+    for column, (low, high) in conditions.items():
+        values = table[column]
+        # Межі — скаляри типу самої колонки, тож timestamp[s/ms/us/ns] порівнюються в одній одиниці
+        for condition in ([pc.greater_equal(values, pa.scalar(low, values.type))] if low is not None else []) + \
+                         ([pc.less(values, pa.scalar(high, values.type))] if high is not None else []):
+            mask = condition if mask is None else pc.and_(mask, condition)
+    if event_type is not None:
+        condition = pc.equal(table["event_type"], event_type)
+        mask = condition if mask is None else pc.and_(mask, condition)
+    if mask is not None:
+        table = table.filter(mask)
+    return table
+
+
+def scan_fact(base_dir: str, columns, event_type: str = None, date_from: date = None, date_to: date = None,
+              product_id_from: int = None, product_id_to: int = None, partitioned: bool = True) -> tuple:
+    """
+    Рядки sales_fact з фільтрами event_type, днями UTC [date_from, date_to) і product_id
+    [product_id_from, product_id_to). Повертає (таблиця з колонками columns, статистика читання).
+
+    Партиційований шар відсікає (1) каталоги за event_type і датою, (2) файли за _file_stats.json,
+    (3) групи рядків за min/max у метаданих Parquet. Звичайний шар — лише групи рядків.
+    """
+    columns = list(columns)
+    conditions = {}
+    if date_from is not None or date_to is not None:
+        conditions["event_time"] = (_day_start(date_from) if date_from else None,
+                                    _day_start(date_to) if date_to else None)
+    if product_id_from is not None or product_id_to is not None:
+        conditions["product_id"] = (product_id_from, product_id_to)
+
+    stats = {"files_total": 0, "files_read": 0, "row_groups_read": 0, "bytes_read": 0}
+    tables = []
+    if partitioned:
+        layout_dir = table_path(base_dir, PARTITIONED_FACT_DIR)
+        with open(os.path.join(layout_dir, FILE_STATS_NAME), "r", encoding="utf-8") as f:
+            file_stats = json.load(f)
+        stats["files_total"] = len(file_stats)
+        file_columns = [c for c in columns if c in FILE_COLUMNS]
+        for relative in sorted(file_stats):
+            type_dir, date_dir, _ = relative.split(os.sep)
+            file_type = type_dir.split("=", 1)[1]
+            file_date = date_dir.split("=", 1)[1]
+            file_type = None if file_type == HIVE_DEFAULT_PARTITION else file_type
+            file_date = None if file_date == HIVE_DEFAULT_PARTITION else date.fromisoformat(file_date)
+            if event_type is not None and file_type != event_type:
+                continue
+            # Рядки без дати не потрапляють у жоден діапазон днів
+            if (date_from is not None or date_to is not None) and file_date is None:
+                continue
+            if (date_from is not None and file_date < date_from) or (date_to is not None and file_date >= date_to):
+                continue
+            # Межі днів уже враховані каталогом, тож у файлі фільтрується лише product_id
+            file_conditions = {k: v for k, v in conditions.items() if k != "event_time"}
+            if not all(_overlaps(file_stats[relative].get(column), low, high)
+                       for column, (low, high) in file_conditions.items()):
+                continue
+            table = _scan_file(os.path.join(layout_dir, relative), file_columns, stats, file_conditions)
+            if table is None:
+                continue
+            stats["files_read"] += 1
+            if "event_type" in columns:
+                table = table.append_column("event_type", pa.array([file_type] * table.num_rows, pa.string()))
+            if "event_date" in columns:
+                table = table.append_column("event_date", pa.array([file_date] * table.num_rows, pa.date32()))
+            tables.append(table.select(columns))
+    else:
+        parts = fact_part_files(base_dir)
+        stats["files_total"] = len(parts)
+        for path in parts:
+            table = _scan_file(path, columns, stats, conditions, event_type)
+            if table is None:
+                continue
+            stats["files_read"] += 1
+            tables.append(table.select(columns))
+
+    if not tables:
+        schema = pq.read_schema(fact_part_files(base_dir)[0])
+        return schema.empty_table().select(columns), stats
+    return pa.concat_tables(tables), stats
+
+
+def layout_sizes(base_dir: str) -> dict:
+    """Розмір обох шарів факту на диску, байтів."""
+    plain = sum(os.path.getsize(path) for path in fact_part_files(base_dir))
+    partitioned = sum(os.path.getsize(path) for path in glob.glob(
+        os.path.join(table_path(base_dir, PARTITIONED_FACT_DIR), "**", "*.parquet"), recursive=True))
+    return {"plain": plain, "partitioned": partitioned}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Партиційований (event_type/день) і відсортований шар sales_fact.")
+    parser.add_argument("--base-dir", default="warehouse")
+    parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    summary = write_partitioned_fact(args.base_dir, args.row_group_size)
+    print(f"Записано {summary['rows']:,} рядків у {summary['files']} файлів "
+          f"({summary['bytes'] / 2 ** 20:.1f} МБ) за {time.perf_counter() - start:.1f} сек.")
@@ -0,0 +1,134 @@
+import pyarrow as pa
+import pyarrow.compute as pc
+
+STRATEGIES = ("auto", "broadcast", "hash_join", "shuffle")
+
+# Вимір не більший за поріг і з унікальним ключем транслюється як хеш-індекс
+# (аналог spark.sql.autoBroadcastJoinThreshold, але з більшим запасом: індекс будується в пам'яті процесу)
+BROADCAST_THRESHOLD_BYTES = 64 * 2 ** 20
+
+# Кількість хеш-партицій для емуляції shuffle join
+DEFAULT_SHUFFLE_PARTITIONS = 8
+
+
+def _has_unique_keys(column: pa.ChunkedArray) -> bool:
+    return column.null_count == 0 and pc.count_distinct(column).as_py() == len(column)
+
+
+def can_broadcast(dim: pa.Table, key: str, threshold_bytes: int = BROADCAST_THRESHOLD_BYTES) -> bool:
+    """
+    Чи можна замінити JOIN пошуком у хеш-індексі: вимір малий і ключ унікальний.
+    З дублікатами ключа (наприклад, товар з двома брендами в product_dim) JOIN множить рядки
+    факту, а індекс дав би одне значення, тож такий вимір іде звичайним hash join.
+    """
+    return dim.nbytes <= threshold_bytes and _has_unique_keys(dim[key])
+
+
+def plan_category_join(product_dim: pa.Table, category_dim: pa.Table = None,
+                       threshold_bytes: int = BROADCAST_THRESHOLD_BYTES) -> str:
+    """Стратегія для 'auto': broadcast, якщо кожен вимір ланцюжка можна транслювати, інакше hash_join."""
+    if not can_broadcast(product_dim, "product_id", threshold_bytes):
+        return "hash_join"
+    if category_dim is not None and not can_broadcast(category_dim, "category_id", threshold_bytes):
+        return "hash_join"
+    return "broadcast"
+
+
+class BroadcastIndex:
+    """
+    Хеш-індекс виміру: унікальні ключі → значення. pc.index_in будує хеш-таблицю по ключах
+    і повертає позицію знайденого ключа для кожного рядка факту за один прохід.
+    """
+
+    def __init__(self, keys: pa.Array, values: pa.Array):
+        self.keys = keys.combine_chunks() if isinstance(keys, pa.ChunkedArray) else keys
+        self.values = values.combine_chunks() if isinstance(values, pa.ChunkedArray) else values
+
+    @classmethod
+    def from_dimension(cls, dim: pa.Table, key: str, value: str) -> "BroadcastIndex":
+        return cls(dim[key], dim[value])
+
+    def positions(self, keys) -> pa.Array:
+        """Позиція кожного ключа в індексі; null — ключа немає (рядок відпадає при INNER JOIN)."""
+        return pc.index_in(keys, value_set=self.keys)
+
+    def chain(self, other: "BroadcastIndex") -> "BroadcastIndex":
+        """
+        Композиція двох індексів на боці вимірів: (product_id → category_id) ∘ (category_id → category_code)
+        дає product_id → category_code, тож обидва JOIN «Сніжинки» виконуються одним проходом по факту.
+        """
+        positions = other.positions(self.values)
+        found = pc.is_valid(positions)
+        return BroadcastIndex(self.keys.filter(found), other.values.take(positions.filter(found)))
+
+    def attach(self, fact: pa.Table, key: str, name: str) -> pa.Table:
+        """INNER JOIN факту з індексом: рядки без відповідності відкидаються, значення додається колонкою."""
+        positions = self.positions(fact[key])
+        if positions.null_count:
+            found = pc.is_valid(positions)
+            fact = fact.filter(found)
+            positions = positions.filter(found)
+        return fact.append_column(name, self.values.take(positions))
+
+
+def _inner_join(left: pa.Table, right: pa.Table, key: str) -> pa.Table:
+    # Table.join за замовчуванням — left outer, а запит лабораторної (Spark .join) — inner
+    return left.join(right, key, join_type="inner", use_threads=False)
+
+
+def _hash_join(fact: pa.Table, product_dim: pa.Table, category_dim: pa.Table = None) -> pa.Table:
+    if category_dim is None:
+        return _inner_join(fact, product_dim.select(["product_id", "category_code"]), "product_id")
+    joined = _inner_join(fact, product_dim.select(["product_id", "category_id"]), "product_id")
+    return _inner_join(joined, category_dim.select(["category_id", "category_code"]), "category_id")
+
+
+def _hash_partitions(table: pa.Table, key: str, num_partitions: int) -> list:
+    buckets = table[key].to_numpy() % num_partitions
+    return [table.filter(pa.array(buckets == p)) for p in range(num_partitions)]
+
+
+def _shuffle_join(fact: pa.Table, product_dim: pa.Table, category_dim: pa.Table = None,
+                  num_partitions: int = DEFAULT_SHUFFLE_PARTITIONS) -> pa.Table:
+    """
+    Емуляція shuffle join Spark: обидві сторони кожного JOIN перерозподіляються за хешем ключа,
+    JOIN виконується по партиціях. Для «Сніжинки» — два перерозподіли, як два shuffle у плані Spark.
+    """
+    def join_partitioned(left: pa.Table, right: pa.Table, key: str) -> pa.Table:
+        pairs = zip(_hash_partitions(left, key, num_partitions), _hash_partitions(right, key, num_partitions))
+        return pa.concat_tables([_inner_join(part, dim_part, key) for part, dim_part in pairs])
+
+    if category_dim is None:
+        return join_partitioned(fact, product_dim.select(["product_id", "category_code"]), "product_id")
+    joined = join_partitioned(fact, product_dim.select(["product_id", "category_id"]), "product_id")
+    return join_partitioned(joined, category_dim.select(["category_id", "category_code"]), "category_id")
+
+
+def _broadcast_join(fact: pa.Table, product_dim: pa.Table, category_dim: pa.Table = None) -> pa.Table:
+    if category_dim is None:
+        index = BroadcastIndex.from_dimension(product_dim, "product_id", "category_code")
+    else:
+        index = BroadcastIndex.from_dimension(product_dim, "product_id", "category_id") \
+            .chain(BroadcastIndex.from_dimension(category_dim, "category_id", "category_code"))
+    return index.attach(fact, "product_id", "category_code")
+
+
+def join_category(fact: pa.Table, product_dim: pa.Table, category_dim: pa.Table = None, strategy: str = "auto",
+                  threshold_bytes: int = BROADCAST_THRESHOLD_BYTES,
+                  num_partitions: int = DEFAULT_SHUFFLE_PARTITIONS) -> pa.Table:
+    """
+    Додає до факту category_code: для «Зірки» — з product_dim (category_dim=None),
+    для «Сніжинки» — через product_dim → category_dim. strategy: 'auto' (за розміром вимірів),
+    'broadcast', 'hash_join' або 'shuffle'. Результат — той самий INNER JOIN для всіх стратегій.
+    """
+    if strategy == "auto":
+        strategy = plan_category_join(product_dim, category_dim, threshold_bytes)
+    elif strategy == "broadcast" and plan_category_join(product_dim, category_dim, float("inf")) != "broadcast":
+        raise ValueError("Broadcast-індекс потребує унікальних ключів у вимірах")
+    if strategy == "broadcast":
+        return _broadcast_join(fact, product_dim, category_dim)
+    if strategy == "hash_join":
+        return _hash_join(fact, product_dim, category_dim)
+    if strategy == "shuffle":
+        return _shuffle_join(fact, product_dim, category_dim, num_partitions)
+    raise ValueError(f"Невідома стратегія JOIN: {strategy}")
@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+import time
+from datetime import date, datetime, timezone
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from warehouse import (SNOWFLAKE_CATEGORY_DIM, SNOWFLAKE_PRODUCT_DIM, STAR_PRODUCT_DIM,
+                       category_purchases_snowflake, category_purchases_star, fact_part_files, read_dimension,
+                       read_fact, table_path)
+
+# Rollup зберігається поруч із sales_fact: одна частина rollup на кожну частину факту
+ROLLUP_DIR = "sales_rollup"
+# Ім'я з "_" — pyarrow.dataset не вважає маніфест файлом даних
+MANIFEST_NAME = "_manifest.json"
+
+ROLLUP_SCHEMA = pa.schema([
+    ("event_date", pa.date32()),
+    ("product_id", pa.int64()),
+    ("purchases", pa.int64()),
+    ("revenue", pa.float64()),
+])
+
+SCHEMAS = ("star", "snowflake")
+
+
+def _manifest_path(base_dir: str) -> str:
+    return os.path.join(table_path(base_dir, ROLLUP_DIR), MANIFEST_NAME)
+
+
+def load_manifest(base_dir: str) -> dict:
+    """{ім'я частини факту: {"size", "mtime_ns"}} — які частини вже агреговано."""
+    try:
+        with open(_manifest_path(base_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_manifest(base_dir: str, manifest: dict) -> None:
+    path = _manifest_path(base_dir)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def _part_signature(path: str) -> dict:
+    stat = os.stat(path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def aggregate_purchases(fact: pa.Table) -> pa.Table:
+    """Покупки за (день, товар): кількість і сума price. fact — рядки sales_fact будь-якого типу події."""
+    purchases = fact.filter(pc.equal(fact["event_type"], "purchase"))
+    daily = pa.table({
+        "event_date": pc.cast(purchases["event_time"], pa.date32()),
+        "product_id": purchases["product_id"],
+        "price": purchases["price"],
+    })
+    result = daily.group_by(["event_date", "product_id"], use_threads=False) \
+        .aggregate([([], "count_all"), ("price", "sum")])
+    return result.rename_columns(["event_date", "product_id", "purchases", "revenue"]).select(ROLLUP_SCHEMA.names) \
+        .cast(ROLLUP_SCHEMA)
+
+
+def stale_parts(base_dir: str) -> tuple:
+    """(нові або змінені частини факту, частини, яких більше немає) відносно маніфесту rollup."""
+    manifest = load_manifest(base_dir)
+    current = {os.path.basename(path): path for path in fact_part_files(base_dir)}
+    changed = [path for name, path in current.items() if manifest.get(name) != _part_signature(path)]
+    removed = [name for name in manifest if name not in current]
+    return changed, removed
+
+
+def is_rollup_fresh(base_dir: str) -> bool:
+    changed, removed = stale_parts(base_dir)
+    return not changed and not removed
+
+
+def refresh_rollup(base_dir: str) -> dict:
+    """
+    Інкрементальне оновлення: агрегуються лише нові або змінені частини sales_fact,
+    rollup видалених частин прибирається. Кожна частина rollup пишеться атомарно, маніфест —
+    після неї, тож перерваний refresh просто повториться для тієї ж частини.
+    """
+    rollup_dir = table_path(base_dir, ROLLUP_DIR)
+    os.makedirs(rollup_dir, exist_ok=True)
+    manifest = load_manifest(base_dir)
+    changed, removed = stale_parts(base_dir)
+
+    for name in removed:
+        try:
+            os.remove(os.path.join(rollup_dir, name))
+        except FileNotFoundError:
+            pass
+        del manifest[name]
+
+    rollup_rows = 0
+    for path in changed:
+        name = os.path.basename(path)
+        signature = _part_signature(path)
+        rollup = aggregate_purchases(pq.read_table(path, columns=["event_time", "event_type", "price", "product_id"]))
+        tmp_path = os.path.join(rollup_dir, f".{name}.tmp")
+        pq.write_table(rollup, tmp_path)
+        os.replace(tmp_path, os.path.join(rollup_dir, name))
+        rollup_rows += rollup.num_rows
+        manifest[name] = signature
+        _save_manifest(base_dir, manifest)
+
+    if removed and not changed:
+        _save_manifest(base_dir, manifest)
+    return {"aggregated_parts": len(changed), "removed_parts": len(removed), "rollup_rows": rollup_rows,
+            "total_parts": len(manifest)}
+
+
+def _to_date(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+def read_rollup(base_dir: str, date_from=None, date_to=None) -> pa.Table:
+    """Рядки rollup за днями [date_from, date_to)."""
+    condition = None
+    if date_from is not None:
+        condition = pc.field("event_date") >= _to_date(date_from)
+    if date_to is not None:
+        upper = pc.field("event_date") < _to_date(date_to)
+        condition = upper if condition is None else condition & upper
+    return pq.read_table(table_path(base_dir, ROLLUP_DIR), schema=ROLLUP_SCHEMA, filters=condition)
+
+
+def _fact_purchases(base_dir: str, date_from=None, date_to=None) -> pa.Table:
+    condition = pc.field("event_type") == "purchase"
+    if date_from is not None:
+        start = datetime.combine(_to_date(date_from), datetime.min.time(), tzinfo=timezone.utc)
+        condition = condition & (pc.field("event_time") >= pa.scalar(start, pa.timestamp("ms", tz="UTC")))
+    if date_to is not None:
+        end = datetime.combine(_to_date(date_to), datetime.min.time(), tzinfo=timezone.utc)
+        condition = condition & (pc.field("event_time") < pa.scalar(end, pa.timestamp("ms", tz="UTC")))
+    return read_fact(base_dir, columns=["product_id"], filters=condition)
+
+
+def category_purchases(base_dir: str, schema: str = "star", use_rollup: bool = True, refresh: bool = False,
+                       date_from=None, date_to=None, strategy: str = "auto") -> tuple:
+    """
+    Кількість покупок за category_code для схеми 'star' або 'snowflake'. Повертає (таблиця, джерело).
+
+    Rollup має зерно (день, товар), а category_code функціонально визначається product_id через
+    виміри, тож JOIN з вимірами на етапі запиту дає той самий результат, що й JOIN по фактах,
+    і зміни вимірів не потребують перерахунку rollup. Rollup використовується, лише якщо він покриває
+    всі частини sales_fact (або refresh=True оновлює його перед запитом); інакше — повне сканування.
+    Межі дат — цілі дні UTC, бо менших проміжків rollup не розрізняє. strategy — стратегія JOIN (joins.py).
+    """
+    if schema not in SCHEMAS:
+        raise ValueError(f"Невідома схема: {schema}")
+
+    if use_rollup and refresh:
+        refresh_rollup(base_dir)
+    if use_rollup and is_rollup_fresh(base_dir) and fact_part_files(base_dir):
+        facts, count_column, source = read_rollup(base_dir, date_from, date_to), "purchases", "rollup"
+    else:
+        facts, count_column, source = _fact_purchases(base_dir, date_from, date_to), None, "fact"
+
+    if schema == "star":
+        result = category_purchases_star(facts, read_dimension(base_dir, STAR_PRODUCT_DIM), count_column, strategy)
+    else:
+        result = category_purchases_snowflake(facts, read_dimension(base_dir, SNOWFLAKE_PRODUCT_DIM),
+                                              read_dimension(base_dir, SNOWFLAKE_CATEGORY_DIM), count_column,
+                                              strategy)
+    return result.sort_by([("total_purchases", "descending"), ("category_code", "ascending")]), source
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Rollup покупок за день/товар і запит за category_code.")
+    parser.add_argument("--base-dir", default="warehouse")
+    parser.add_argument("--refresh", action="store_true", help="Оновити rollup перед запитом.")
+    parser.add_argument("--schema", choices=SCHEMAS, default="star")
+    parser.add_argument("--no-rollup", action="store_true", help="Рахувати по повному sales_fact.")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.refresh:
+        start = time.perf_counter()
+        stats = refresh_rollup(args.base_dir)
+        print(f"Rollup оновлено за {time.perf_counter() - start:.2f} сек.: {stats}")
+
+    start = time.perf_counter()
+    result, source = category_purchases(args.base_dir, args.schema, use_rollup=not args.no_rollup)
+    elapsed = time.perf_counter() - start
+    print(f"\nСхема «{args.schema}», джерело: {source}, {elapsed:.3f} сек.")
+    for row in result.slice(0, args.top).to_pylist():
+        print(f"{str(row['category_code']):<40} {row['total_purchases']:>10,}")
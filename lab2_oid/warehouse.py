@@ -0,0 +1,139 @@
+import argparse
+import glob
+import os
+import time
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from joins import join_category
+
+# Каталоги таблиць — ті самі імена, що й у lab_2_oid.ipynb
+FACT_DIR = "sales_fact"
+STAR_PRODUCT_DIM = "star_product_dim"
+USER_DIM = "star_user_dim"
+SNOWFLAKE_PRODUCT_DIM = "snowflake_product_dim"
+SNOWFLAKE_CATEGORY_DIM = "snowflake_category_dim"
+
+FACT_COLUMNS = ["event_time", "event_type", "price", "product_id", "user_id"]
+
+DEFAULT_PART_ROWS = 1_000_000
+
+
+def table_path(base_dir: str, name: str) -> str:
+    return os.path.join(base_dir, name)
+
+
+def fact_part_files(base_dir: str) -> list:
+    """Файли-частини sales_fact у порядку запису."""
+    return sorted(glob.glob(os.path.join(table_path(base_dir, FACT_DIR), "part-*.parquet")))
+
+
+def _distinct(tables, columns) -> pa.Table:
+    combined = pa.concat_tables([t.select(columns) for t in tables])
+    return combined.group_by(columns, use_threads=False).aggregate([])
+
+
+def append_fact_part(base_dir: str, fact: pa.Table) -> str:
+    """Додає нову частину sales_fact (наприклад, дані за новий день). Повертає шлях до файлу."""
+    fact_dir = table_path(base_dir, FACT_DIR)
+    os.makedirs(fact_dir, exist_ok=True)
+    existing = fact_part_files(base_dir)
+    index = int(os.path.basename(existing[-1])[5:10]) + 1 if existing else 0
+    name = f"part-{index:05d}.parquet"
+    path = os.path.join(fact_dir, name)
+    # Файли з крапкою на початку pyarrow.dataset пропускає, тож читачі не бачать недописану частину
+    tmp_path = os.path.join(fact_dir, f".{name}.tmp")
+    pq.write_table(fact.select(FACT_COLUMNS), tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def build_warehouse(source_path: str, base_dir: str, part_rows: int = DEFAULT_PART_ROWS) -> dict:
+    """
+    Будує таблиці «Зірки» і «Сніжинки» з Parquet-файлу датасету (результат lab1):
+    sales_fact пишеться частинами по part_rows рядків, виміри — через distinct.
+    Повертає кількість рядків у кожній таблиці.
+    """
+    os.makedirs(base_dir, exist_ok=True)
+    for part in fact_part_files(base_dir):
+        os.remove(part)
+
+    star_parts, snowflake_parts, category_parts, user_parts = [], [], [], []
+    fact_rows = 0
+    source = pq.ParquetFile(source_path)
+    for batch in source.iter_batches(batch_size=part_rows):
+        table = pa.Table.from_batches([batch])
+        append_fact_part(base_dir, table)
+        fact_rows += table.num_rows
+        # distinct по частині зменшує обсяг, що накопичується до фінального distinct
+        star_parts.append(_distinct([table], ["product_id", "category_id", "category_code", "brand"]))
+        snowflake_parts.append(_distinct([table], ["product_id", "category_id", "brand"]))
+        category_parts.append(_distinct([table], ["category_id", "category_code"]))
+        user_parts.append(_distinct([table], ["user_id"]))
+
+    dimensions = {
+        STAR_PRODUCT_DIM: _distinct(star_parts, ["product_id", "category_id", "category_code", "brand"]),
+        USER_DIM: _distinct(user_parts, ["user_id"]),
+        SNOWFLAKE_CATEGORY_DIM: _distinct(category_parts, ["category_id", "category_code"]),
+        SNOWFLAKE_PRODUCT_DIM: _distinct(snowflake_parts, ["product_id", "category_id", "brand"]),
+    }
+    counts = {FACT_DIR: fact_rows}
+    for name, table in dimensions.items():
+        pq.write_table(table, table_path(base_dir, name) + ".parquet")
+        counts[name] = table.num_rows
+    return counts
+
+
+def read_fact(base_dir: str, columns=None, filters=None) -> pa.Table:
+    return pq.read_table(table_path(base_dir, FACT_DIR), columns=columns, filters=filters)
+
+
+def read_dimension(base_dir: str, name: str) -> pa.Table:
+    return pq.read_table(table_path(base_dir, name) + ".parquet")
+
+
+def _count_by_category(joined: pa.Table, count_column: str = None) -> pa.Table:
+    """count(*) за category_code або, для попередньо агрегованих рядків, сума count_column."""
+    aggregation = ([], "count_all") if count_column is None else (count_column, "sum")
+    result = joined.group_by("category_code", use_threads=False).aggregate([aggregation])
+    return result.rename_columns(["category_code", "total_purchases"])
+
+
+def category_purchases_star(fact: pa.Table, product_dim: pa.Table, count_column: str = None,
+                            strategy: str = "auto") -> pa.Table:
+    """Запит «Зірки»: один JOIN sales_fact ⋈ product_dim_star, групування за category_code."""
+    return _count_by_category(join_category(fact, product_dim, strategy=strategy), count_column)
+
+
+def category_purchases_snowflake(fact: pa.Table, product_dim: pa.Table, category_dim: pa.Table,
+                                 count_column: str = None, strategy: str = "auto") -> pa.Table:
+    """Запит «Сніжинки»: два JOIN (Fact → Product → Category), групування за category_code."""
+    return _count_by_category(join_category(fact, product_dim, category_dim, strategy=strategy), count_column)
+
+
+def purchases_from_fact(base_dir: str, columns=("product_id",)) -> pa.Table:
+    """Покупки з повного sales_fact (без rollup): читання й фільтр event_type == 'purchase'."""
+    return read_fact(base_dir, columns=list(columns), filters=pc.field("event_type") == "purchase")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Побудова таблиць «Зірки» та «Сніжинки» з Parquet датасету.")
+    parser.add_argument("source", help="Parquet-файл 2019-Oct (див. lab1_oid/csv_to_parquet.py).")
+    parser.add_argument("--base-dir", default="warehouse")
+    parser.add_argument("--part-rows", type=int, default=DEFAULT_PART_ROWS)
+    parser.add_argument("--partitioned", action="store_true",
+                        help="Додатково записати sales_fact з партиціями event_type/день (fact_layout.py).")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    counts = build_warehouse(args.source, args.base_dir, args.part_rows)
+    for name, rows in counts.items():
+        print(f"{name:<24} {rows:>12,} рядків")
+    if args.partitioned:
+        from fact_layout import PARTITIONED_FACT_DIR, write_partitioned_fact
+
+        summary = write_partitioned_fact(args.base_dir)
+        print(f"{PARTITIONED_FACT_DIR:<24} {summary['rows']:>12,} рядків у {summary['files']} файлах")
+    print(f"Таблиці збережено в {args.base_dir} за {time.perf_counter() - start:.1f} сек.")
@@ -0,0 +1,298 @@
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from data_generator import iter_sensor_data, iter_sensor_data_batches
+from data_processor import DEFAULT_BATCH_SIZE, RecordRouter
+
+# Скільки блоків може чекати в черзі між генератором і обробником
+DEFAULT_QUEUE_SIZE = 16
+
+# Після скількох рядків буфер приймача скидається у файл
+DEFAULT_FLUSH_LINES = 8192
+
+# Як часто (сек) знімати глибину черги
+QUEUE_SAMPLE_INTERVAL = 0.01
+
+
+class StageMetrics:
+    """Лічильники етапу конвеєра: кількість рядків, час роботи та час очікування."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.lines = 0
+        self.busy = 0.0  # власна робота етапу
+        self.waiting = 0.0  # очікування на чергу (протитиск або порожня черга)
+        self.started = self.finished = None
+
+    def throughput(self) -> float:
+        """Рядків за секунду власної роботи (без очікування)."""
+        return self.lines / self.busy if self.busy else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"stage": self.name, "lines": self.lines, "busy_s": round(self.busy, 4),
+                "waiting_s": round(self.waiting, 4), "lines_per_s": round(self.throughput())}
+
+
+class AsyncBatchWriter:
+    """
+    Асинхронний приймач: write() лише додає рядок у буфер, а повні буфери записуються
+    у файл окремою задачею через asyncio.to_thread. Черга пакетів обмежена,
+    тож повільний диск гальмує обробник (протитиск), а не накопичує пам'ять.
+    Має метод write(), тому його можна передати в RecordRouter замість файлу.
+    """
+
+    def __init__(self, path: str, mode: str = "w", flush_lines: int = DEFAULT_FLUSH_LINES, max_pending: int = 4,
+                 name: Optional[str] = None):
+        self.path = path
+        self.mode = mode
+        self.flush_lines = flush_lines
+        self.metrics = StageMetrics(name or path)
+        self._buffer: List[str] = []
+        self._batches: "asyncio.Queue[Optional[List[str]]]" = asyncio.Queue(max_pending)
+        self._file = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> "AsyncBatchWriter":
+        self._file = await asyncio.to_thread(open, self.path, self.mode)
+        self._task = asyncio.create_task(self._drain())
+        return self
+
+    def write(self, text: str) -> None:
+        self._buffer.append(text)
+
+    async def commit(self) -> None:
+        """Передає буфер на запис, якщо він заповнений."""
+        if len(self._buffer) >= self.flush_lines:
+            await self._submit()
+
+    async def _put(self, batch: Optional[List[str]]) -> None:
+        """
+        Кладе пакет у чергу запису. Якщо задача запису впала (диск заповнено тощо), її помилка
+        піднімається тут: інакше повна черга, яку вже ніхто не читає, заблокувала б конвеєр.
+        """
+        if self._task.done():
+            self._task.result()
+            raise RuntimeError(f"Запис у {self.path} уже завершено.")
+        if not self._batches.full():
+            self._batches.put_nowait(batch)
+            return
+        put = asyncio.ensure_future(self._batches.put(batch))
+        await asyncio.wait({put, self._task}, return_when=asyncio.FIRST_COMPLETED)
+        if not put.done():
+            put.cancel()
+            self._task.result()
+            raise RuntimeError(f"Запис у {self.path} завершився раніше за конвеєр.")
+
+    async def _submit(self) -> None:
+        batch, self._buffer = self._buffer, []
+        wait_start = time.perf_counter()
+        await self._put(batch)
+        self.metrics.waiting += time.perf_counter() - wait_start
+
+    async def _drain(self) -> None:
+        while True:
+            batch = await self._batches.get()
+            if batch is None:
+                break
+            start = time.perf_counter()
+            if self.metrics.started is None:
+                self.metrics.started = start
+            data = "".join(batch)
+            await asyncio.to_thread(self._file.write, data)
+            self.metrics.busy += time.perf_counter() - start
+            self.metrics.lines += data.count("\n")
+
+    async def close(self) -> None:
+        """
+        Скидає залишок буфера, дочікується запису та закриває файл. Помилка задачі запису
+        піднімається після закриття файлу.
+        """
+        try:
+            if self._buffer:
+                await self._submit()
+            await self._put(None)
+            await self._task
+        finally:
+            if not self._task.done():
+                self._task.cancel()
+            await asyncio.to_thread(self._file.close)
+            self.metrics.finished = time.perf_counter()
+
+
+async def _produce(queue: asyncio.Queue, metrics: StageMetrics, blocks, raw_sink: Optional[AsyncBatchWriter]) -> None:
+    """Генератор: кладе блоки рядків у чергу; заповнена черга призупиняє генерацію."""
+    metrics.started = time.perf_counter()
+    try:
+        while True:
+            start = time.perf_counter()
+            block = next(blocks, None)
+            metrics.busy += time.perf_counter() - start
+            if block is None:
+                break
+            metrics.lines += len(block)
+
+            if raw_sink is not None:
+                raw_sink.write("\n".join(block) + "\n")
+                await raw_sink.commit()
+
+            wait_start = time.perf_counter()
+            await queue.put(block)
+            metrics.waiting += time.perf_counter() - wait_start
+    finally:
+        await queue.put(None)
+        metrics.finished = time.perf_counter()
+
+
+async def _consume(queue: asyncio.Queue, metrics: StageMetrics, router: RecordRouter,
+                   sinks: Tuple[AsyncBatchWriter, AsyncBatchWriter]) -> None:
+    """Обробник: дедуплікація та валідація блоків із черги, вихід — у буфери приймачів."""
+    metrics.started = time.perf_counter()
+    while True:
+        wait_start = time.perf_counter()
+        block = await queue.get()
+        metrics.waiting += time.perf_counter() - wait_start
+        if block is None:
+            break
+
+        start = time.perf_counter()
+        router.process_block(block)
+        metrics.busy += time.perf_counter() - start
+        metrics.lines += len(block)
+
+        for sink in sinks:
+            await sink.commit()
+    metrics.finished = time.perf_counter()
+
+
+async def _sample_queue(queue: asyncio.Queue, samples: List[int], interval: float) -> None:
+    while True:
+        samples.append(queue.qsize())
+        await asyncio.sleep(interval)
+
+
+async def _close_sinks(sinks: List[AsyncBatchWriter]) -> Optional[BaseException]:
+    """Закриває всі приймачі, навіть якщо якийсь із них впав; повертає першу помилку."""
+    error = None
+    for sink in sinks:
+        try:
+            await sink.close()
+        except Exception as e:
+            error = error or e
+    return error
+
+
+async def run_async_pipeline(clean_data_path: str, dlq_path: str, sensor_id: str, sequence_start: int,
+                             num_records: int, raw_stream_path: Optional[str] = None,
+                             queue_size: int = DEFAULT_QUEUE_SIZE, block_size: int = DEFAULT_BATCH_SIZE,
+                             flush_lines: int = DEFAULT_FLUSH_LINES, vectorized: bool = False,
+                             show_detailed_logs: bool = False, generator_options: Optional[Dict[str, Any]] = None,
+                             **router_options) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """
+    Потоковий конвеєр в одному процесі: генератор -> обмежена asyncio-черга -> обробник ->
+    асинхронні приймачі clean/DLQ. Проміжний файл не потрібен; якщо задано raw_stream_path,
+    сирий потік паралельно записується туди (як input_stream.txt у послідовному режимі).
+
+    Повертає (stats, report): stats — як у process_data_stream, report — пропускна здатність
+    кожного етапу та глибина черги.
+    """
+    generator_options = generator_options or {}
+    if vectorized:
+        blocks = iter_sensor_data_batches(sensor_id, sequence_start, num_records, batch_size=block_size,
+                                          **generator_options)
+    else:
+        stream = iter_sensor_data(sensor_id, sequence_start, num_records, **generator_options)
+        blocks = iter(lambda: [line for _, line in zip(range(block_size), stream)], [])
+
+    queue: asyncio.Queue = asyncio.Queue(queue_size)
+    producer, consumer = StageMetrics("generate"), StageMetrics("validate")
+
+    clean_sink = await AsyncBatchWriter(clean_data_path, flush_lines=flush_lines, name="write_clean").start()
+    dlq_sink = await AsyncBatchWriter(dlq_path, flush_lines=flush_lines, name="write_dlq").start()
+    raw_sink = None
+    if raw_stream_path is not None:
+        # Генератор пише в raw_sink цілими блоками, тож кожен write() — уже готовий пакет
+        raw_sink = await AsyncBatchWriter(raw_stream_path, flush_lines=1, name="write_raw").start()
+    sinks = [s for s in (raw_sink, clean_sink, dlq_sink) if s is not None]
+
+    router = RecordRouter(clean_sink, dlq_sink, show_detailed_logs=show_detailed_logs, **router_options)
+
+    depth_samples: List[int] = []
+    sampler = asyncio.create_task(_sample_queue(queue, depth_samples, QUEUE_SAMPLE_INTERVAL))
+    start = time.perf_counter()
+    stages = [asyncio.create_task(_produce(queue, producer, blocks, raw_sink)),
+              asyncio.create_task(_consume(queue, consumer, router, (clean_sink, dlq_sink)))]
+    try:
+        await asyncio.gather(*stages)
+    except BaseException:
+        # Етап упав (напр. через помилку запису в приймач) — зупиняємо інший і закриваємо файли
+        for task in stages:
+            task.cancel()
+        sampler.cancel()
+        await _close_sinks(sinks)
+        raise
+    sampler.cancel()
+    error = await _close_sinks(sinks)
+    if error is not None:
+        raise error
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "elapsed_s": round(elapsed, 4),
+        "lines_per_s": round(router.stats["processed"] / elapsed) if elapsed else 0,
+        "stages": [producer.as_dict(), consumer.as_dict()] + [s.metrics.as_dict() for s in sinks],
+        "queue": {
+            "capacity": queue_size,
+            "max_depth": max(depth_samples, default=0),
+            "avg_depth": round(sum(depth_samples) / len(depth_samples), 2) if depth_samples else 0.0,
+        },
+    }
+    return router.stats, report
+
+
+def process_generated_stream(*args, **kwargs) -> Tuple[Dict[str, int], Dict[str, Any]]:
+    """Синхронна обгортка над run_async_pipeline."""
+    return asyncio.run(run_async_pipeline(*args, **kwargs))
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    """Виводить пропускну здатність етапів і глибину черги."""
+    print(f"\n--- Потоковий конвеєр: {report['elapsed_s']:.2f} сек, {report['lines_per_s']:,} рядків/с ---")
+    print(f"{'ЕТАП':<14} {'РЯДКІВ':>10} {'РОБОТА, С':>10} {'ОЧІКУВАННЯ, С':>14} {'РЯДКІВ/С':>12}")
+    for stage in report["stages"]:
+        print(f"{stage['stage']:<14} {stage['lines']:>10,} {stage['busy_s']:>10.3f} {stage['waiting_s']:>14.3f} "
+              f"{stage['lines_per_s']:>12,}")
+    queue = report["queue"]
+    print(f"Черга: ємність {queue['capacity']}, макс. глибина {queue['max_depth']}, "
+          f"середня {queue['avg_depth']}")
+    # Генератор і обробник ділять один цикл подій, тож вузьке місце — той, що довше працює
+    # (постійно повна черга означає, що генератор чекає на обробник). Запис у файли йде
+    # у фонових потоках; очікування на приймач означає протитиск від диска.
+    generate, validate = report["stages"][:2]
+    bottleneck = max((generate, validate), key=lambda stage: stage["busy_s"])
+    print(f"Вузьке місце: {bottleneck['stage']}")
+    for sink in report["stages"][2:]:
+        if sink["waiting_s"] > 0.1 * bottleneck["busy_s"]:
+            print(f"Протитиск від приймача {sink['stage']}: {sink['waiting_s']:.3f} сек очікування")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Потоковий конвеєр генератор -> черга -> обробник (asyncio).")
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--sensors", type=int, default=1)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--flush-lines", type=int, default=DEFAULT_FLUSH_LINES)
+    parser.add_argument("--raw-stream", help="Також записати сирий потік у цей файл.")
+    parser.add_argument("--vectorized", action="store_true", help="Блокова генерація через numpy.")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    stats, report = process_generated_stream(
+        "clean_data.jsonl", "dead_letter_queue.jsonl", "LAB_PRES_02", 1, args.records,
+        raw_stream_path=args.raw_stream, queue_size=args.queue_size, block_size=args.block_size,
+        flush_lines=args.flush_lines, vectorized=args.vectorized,
+        generator_options={"num_sensors": args.sensors, "seed": args.seed})
+    print(stats)
+    print_report(report)
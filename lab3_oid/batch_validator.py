@@ -0,0 +1,205 @@
+from typing import List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy потрібен лише для стовпцевої валідації
+    np = None
+
+# Канонічний рядок — рівно те, що пише json.dumps для запису сенсора:
+# {"sensor_id": "<id>", "timestamp": <ціле>, "sequence_id": <ціле>, "value": <число>}
+_PREFIX = b'{"sensor_id": "'
+_AFTER_SENSOR = b'", "timestamp": '
+_AFTER_TIMESTAMP = b', "sequence_id": '
+_AFTER_SEQUENCE = b', "value": '
+
+# Лапок і ком у канонічному рядку (sensor_id без '"' і ',')
+_LINE_EVENTS = 13
+
+# Числові поля читаються вікнами фіксованої ширини (15 цифр і крапка). До 15 цифр ціле точне
+# у float64, а для 'value' float(текст) дорівнює mantissa / 10**k і repr() дає той самий текст
+_WIDTH = 16
+_VALUE_DIGITS = 15
+# Ширина вікон над буфером (і відступ нулями з обох боків); sensor_id до стількох байтів
+# групуються через np.unique
+_PAD = 32
+
+_DIGIT_0, _MINUS, _DOT, _CLOSE, _QUOTE, _COMMA, _BACKSLASH, _NEWLINE = b'0-.}",\\\n'
+
+if np is not None:
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    _POW10 = 10.0 ** np.arange(_WIDTH)
+    _POW10_DESC = _POW10[::-1].copy()
+    _POSITIONS = np.arange(_WIDTH)
+    _PAD_POSITIONS = np.arange(_PAD)
+    # Множники хешу sensor_id (по одному на 8 байтів вікна)
+    _SENSOR_HASH = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9, 0x27D4EB2F165667C5],
+                            np.uint64)
+
+
+class LineColumns:
+    """
+    Стовпці блоку рядків: canonical — маска рядків канонічної форми; для них заповнені
+    sensor_ids, timestamps, sequence_ids і values (float64, як float(record['value'])).
+    Решту рядків (інша форма, рядкове 'value', не-ASCII, зайві поля тощо) треба розібрати
+    й перевірити звичайним шляхом.
+    """
+    __slots__ = ("canonical", "sensor_ids", "timestamps", "sequence_ids", "values", "value_is_int")
+
+    def __init__(self, canonical, sensor_ids, timestamps, sequence_ids, values, value_is_int):
+        self.canonical = canonical
+        self.sensor_ids = sensor_ids
+        self.timestamps = timestamps
+        self.sequence_ids = sequence_ids
+        self.values = values
+        self.value_is_int = value_is_int
+
+    def records(self, indices: List[int]) -> List[dict]:
+        """Записи канонічних рядків indices — ті самі словники, що дав би json.loads."""
+        timestamps, sequence_ids = self.timestamps.tolist(), self.sequence_ids.tolist()
+        values, value_is_int = self.values.tolist(), self.value_is_int.tolist()
+        return [{"sensor_id": self.sensor_ids[i], "timestamp": timestamps[i], "sequence_id": sequence_ids[i],
+                 "value": int(values[i]) if value_is_int[i] else values[i]} for i in indices]
+
+
+def _matches(windows, starts, literal: bytes):
+    """Чи починаються байти з позицій starts літералом literal."""
+    return (windows[starts, :len(literal)] == np.frombuffer(literal, np.uint8)).all(axis=1)
+
+
+def _field(buf, windows, starts, ends):
+    """
+    Числове поле [starts, ends), вирівняне праворуч у матриці len(ends) × _WIDTH.
+    Повертає (від'ємне, довжина без знака, байти вікна, цифри (0 поза полем і на місці крапки),
+    маска крапок, чи в полі лише цифри й '.').
+    """
+    negative = buf[starts] == _MINUS
+    length = ends - starts - negative
+    window = windows[ends - _WIDTH, :_WIDTH]
+    digits = window - np.uint8(_DIGIT_0)
+    inside = _POSITIONS >= _WIDTH - length[:, None]
+    dots = window == _DOT
+    ok = ((digits <= 9) | dots | ~inside).all(axis=1) & (length >= 1) & (length <= _WIDTH)
+    return negative, length, window, digits * (inside & ~dots), dots & inside, ok
+
+
+def _first_digit_zero(window, length):
+    """Чи поле довжини length у вирівняному праворуч вікні починається з '0'."""
+    return window[np.arange(len(window)), np.clip(_WIDTH - length, 0, _WIDTH - 1)] == _DIGIT_0
+
+
+def _parse_int_field(buf, windows, starts, ends):
+    """Ціле JSON у [starts, ends) до 15 цифр: (значення int64, маска канонічних)."""
+    negative, length, window, digits, dots, ok = _field(buf, windows, starts, ends)
+    ok &= ~dots.any(axis=1) & (length <= _VALUE_DIGITS)
+    ok &= (length == 1) | ~_first_digit_zero(window, length)  # без зайвих нулів на початку
+    # До 15 цифр сума цифр на степені десятки точна й у float64
+    values = (digits.astype(np.float64) @ _POW10_DESC).astype(np.int64)
+    ok &= ~(negative & (values == 0))  # json.dumps пише -0 як 0
+    return np.where(negative, -values, values), ok
+
+
+def _parse_value_field(buf, windows, starts, ends):
+    """
+    'value' у [starts, ends): ціле або дріб без експоненти, текст якого збігається з
+    repr(float(текст)). Повертає (float64 як float(value), чи це ціле, маска канонічних).
+
+    Дріб канонічний, якщо має до 15 цифр (тоді текст — єдиний найкоротший десятковий запис
+    свого float), без нулів у кінці дробової частини (крім "x.0") і не менший за 0.0001
+    (менші repr пише з експонентою).
+    """
+    negative, length, window, digits, dots, ok = _field(buf, windows, starts, ends)
+    dot_count = dots.sum(axis=1)
+    is_int = dot_count == 0
+    dot_at = np.where(is_int, _WIDTH, dots.argmax(axis=1))
+    fraction_length = np.where(is_int, 0, _WIDTH - 1 - dot_at)
+    integer_length = length - np.where(is_int, 0, fraction_length + 1)
+
+    ok &= (dot_count <= 1) & (integer_length >= 1) & (is_int | (fraction_length >= 1))
+    ok &= integer_length + fraction_length <= _VALUE_DIGITS
+    ok &= (integer_length == 1) | ~_first_digit_zero(window, length)
+    # Цифри лівіше крапки стоять на розряд вище свого місця в мантисі; усі суми — цілі
+    # до 10**16 з множником 2**(k+1), тож точні у float64
+    left = _POSITIONS < dot_at[:, None]
+    integer = (digits * left).astype(np.float64) @ _POW10_DESC
+    fraction = (digits * ~left).astype(np.float64) @ _POW10_DESC
+    mantissa = np.where(is_int, integer, integer / 10 + fraction)
+    ok &= is_int | (window[:, -1] != _DIGIT_0) | (fraction_length == 1)  # "2.50" repr пише як "2.5"
+    # 0.0000x repr пише з експонентою
+    ok &= ~(~is_int & (integer == 0) & (fraction_length >= 4) & (fraction * 10000 < _POW10[fraction_length]))
+    ok &= ~(is_int & negative & (mantissa == 0))
+
+    # Мантиса (< 2**53) і 10**k точні, тож ділення округлюється так само, як float(текст)
+    values = mantissa / _POW10[fraction_length]
+    return np.where(negative, -values, values), is_int, ok
+
+
+def parse_lines(lines: List[str]) -> Optional[LineColumns]:
+    """
+    Стовпцевий розбір блоку рядків (без '\\n' на кінці) цілим масивом байтів, без json.loads.
+    Повертає None, якщо numpy недоступний або блок не вдається розбити на рядки.
+    """
+    if np is None or not lines:
+        return None
+    data = np.frombuffer(("\n".join(lines) + "\n").encode(), np.uint8)
+    # Далі працюємо лише з «подіями»: лапками, комами, кінцями рядків і символами, які json.dumps
+    # екранує (керівні, '\\' і не-ASCII) — у канонічному рядку їх немає
+    events = np.flatnonzero((data < 32) | (data > 126) | (data == _BACKSLASH) | (data == _QUOTE) | (data == _COMMA))
+    newline_events = np.flatnonzero(data[events] == _NEWLINE)
+    if len(newline_events) != len(lines):
+        return None  # '\n' усередині рядка
+    # Нулі з обох боків: вікна біля країв буфера (і зсуви неканонічних рядків) не виходять за його межі
+    buf = np.zeros(len(data) + 3 * _PAD, np.uint8)
+    buf[_PAD:_PAD + len(data)] = data
+    windows = sliding_window_view(buf, _PAD)
+    events += _PAD
+    ends = events[newline_events]
+    starts = np.concatenate(([_PAD], ends[:-1] + 1))
+    first_event = np.concatenate(([0], newline_events[:-1] + 1))
+
+    # Канонічний рядок має рівно _LINE_EVENTS лапок і ком і жодного символу, який json.dumps екранує;
+    # їхні місця фіксують літерали між полями, тож решта байтів полів — лише цифри, '-' і '.'
+    canonical = (newline_events - first_event == _LINE_EVENTS) & (buf[ends - 1] == _CLOSE)
+    last = len(events) - 1
+    sensor_end = events[np.minimum(first_event + 3, last)]
+    timestamp_end = events[np.minimum(first_event + 7, last)]
+    sequence_end = events[np.minimum(first_event + 10, last)]
+    canonical &= _matches(windows, starts, _PREFIX)
+    canonical &= _matches(windows, sensor_end, _AFTER_SENSOR)
+    canonical &= _matches(windows, timestamp_end, _AFTER_TIMESTAMP)
+    canonical &= _matches(windows, sequence_end, _AFTER_SEQUENCE)
+
+    timestamps, ok = _parse_int_field(buf, windows, sensor_end + len(_AFTER_SENSOR), timestamp_end)
+    canonical &= ok
+    sequence_ids, ok = _parse_int_field(buf, windows, timestamp_end + len(_AFTER_TIMESTAMP), sequence_end)
+    canonical &= ok
+    values, value_is_int, ok = _parse_value_field(buf, windows, sequence_end + len(_AFTER_SEQUENCE), ends - 1)
+    canonical &= ok
+    return LineColumns(canonical, _sensor_ids(lines, windows, starts, sensor_end, canonical),
+                       timestamps, sequence_ids, values, value_is_int)
+
+
+def _sensor_ids(lines, windows, line_starts, ends, canonical) -> list:
+    """
+    sensor_id канонічних рядків (для решти — довільні значення): сенсорів у блоці небагато,
+    тож рядки Python створюються лише для унікальних значень.
+    """
+    starts = line_starts + len(_PREFIX)
+    lengths = ends - starts
+    # Неканонічні й довгі id групуються з порожнім; у канонічному id немає нульових байтів,
+    # тож однакові вікна означають однакові id
+    short = np.where(canonical & (lengths <= _PAD), lengths, 0)
+    window = windows[starts]
+    window[_PAD_POSITIONS >= short[:, None]] = 0
+    # Групування за хешем вікна (сортування uint64 дешевше за рядки); колізію видно
+    # з порівняння кожного вікна з представником групи — тоді групуємо за самими байтами
+    hashes = (window.view(np.uint64) * _SENSOR_HASH).sum(axis=1)
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    if not (window == window[first[inverse]]).all():
+        _, first, inverse = np.unique(window.view(f"S{_PAD}").ravel(), return_index=True, return_inverse=True)
+    # Канонічні рядки — лише ASCII, тож зсуви в байтах збігаються з індексами символів
+    names = np.array([lines[i][len(_PREFIX):len(_PREFIX) + int(short[i])] for i in first.tolist()], dtype=object)
+    sensor_ids = names[inverse.ravel()].tolist()
+    for i in np.flatnonzero(canonical & (lengths > _PAD)).tolist():
+        sensor_ids[i] = lines[i][len(_PREFIX):len(_PREFIX) + int(lengths[i])]
+    return sensor_ids
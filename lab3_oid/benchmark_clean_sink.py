@@ -0,0 +1,115 @@
+import argparse
+import os
+import tempfile
+import time
+from collections import defaultdict
+
+import pyarrow.dataset as ds
+
+from data_generator import write_sensor_data
+from data_processor import process_data_stream
+from parquet_sink import SECONDS_PER_DAY
+from serialization import get_default_codec
+
+FORMATS = ("jsonl", "parquet")
+
+
+def _prepare_input(path: str, num_records: int, num_sensors: int, days: int, seed: int) -> None:
+    """Потік за days днів (по дню на частину) — щоб Parquet-вихід мав кілька партицій date=…"""
+    base_timestamp = 1_714_521_600  # 2024-05-01 UTC
+    per_day = num_records // days
+    with open(path, "w") as f:
+        for day in range(days):
+            write_sensor_data(f, "BENCH_PRES", day * per_day + 1, per_day, num_sensors=num_sensors,
+                              seed=seed + day, base_timestamp=base_timestamp + day * SECONDS_PER_DAY)
+
+
+def _output_size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+
+
+def _scan_jsonl(path: str, sensor_id=None) -> dict:
+    """Подальша аналітика над JSONL: кожен рядок розбирається заново (найшвидшим бекендом кодека)."""
+    decode = get_default_codec().decode
+    sums, counts = defaultdict(float), defaultdict(int)
+    with open(path) as f:
+        for line in f:
+            record = decode(line)
+            if sensor_id is not None and record["sensor_id"] != sensor_id:
+                continue
+            sums[record["sensor_id"]] += float(record["value"])
+            counts[record["sensor_id"]] += 1
+    return {sensor: (counts[sensor], round(sums[sensor] / counts[sensor], 6)) for sensor in sums}
+
+
+def _scan_parquet(path: str, sensor_id=None) -> dict:
+    """Та сама аналітика над Parquet: лише потрібні колонки, фільтр за sensor_id відсікає каталоги."""
+    dataset = ds.dataset(path, format="parquet", partitioning="hive")
+    table = dataset.to_table(columns=["sensor_id", "value"],
+                             filter=(ds.field("sensor_id") == sensor_id) if sensor_id is not None else None)
+    result = table.group_by("sensor_id", use_threads=False).aggregate([("value", "count"), ("value", "mean")])
+    return {sensor: (count, round(mean, 6)) for sensor, count, mean in
+            zip(*(result[c].to_pylist() for c in ("sensor_id", "value_count", "value_mean")))}
+
+
+SCANS = {"jsonl": _scan_jsonl, "parquet": _scan_parquet}
+
+
+def _best(fn, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(num_records: int, num_sensors: int, days: int, repeats: int, seed: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        stream_path = os.path.join(tmp, "input_stream.txt")
+        _prepare_input(stream_path, num_records, num_sensors, days, seed)
+        outputs = {"jsonl": os.path.join(tmp, "clean_data.jsonl"), "parquet": os.path.join(tmp, "clean_data_parquet")}
+
+        write_times = {name: float("inf") for name in FORMATS}
+        stats = {}
+        # Варіанти чергуються, тож фонові коливання диска впливають на обидва однаково
+        for _ in range(repeats):
+            for name in FORMATS:
+                start = time.perf_counter()
+                stats[name] = process_data_stream(stream_path, outputs[name], os.path.join(tmp, f"dlq_{name}.jsonl"),
+                                                  clean_format=name)
+                write_times[name] = min(write_times[name], time.perf_counter() - start)
+
+        one_sensor = "BENCH_PRES" if num_sensors == 1 else "BENCH_PRES_000"
+        print(f"\n--- Clean-вихід: {stats['jsonl']['processed']:,} рядків, {stats['jsonl']['valid']:,} валідних, "
+              f"{num_sensors} сенсорів × {days} днів ---")
+        print(f"{'ФОРМАТ':<8} {'ЗАПИС, С':>9} {'РЯДКІВ/С':>11} {'РОЗМІР, МБ':>11} {'СКАН, С':>8} "
+              f"{'СКАН 1 СЕНСОРА, С':>18} {'ЗБІГ':>6}")
+        print("-" * 79)
+        reference = None
+        for name in FORMATS:
+            t_scan, result = _best(lambda: SCANS[name](outputs[name]), repeats)
+            t_one, one = _best(lambda: SCANS[name](outputs[name], one_sensor), repeats)
+            if reference is None:
+                reference = result
+            same = stats[name] == stats["jsonl"] and result == reference and one == {one_sensor: reference[one_sensor]}
+            print(f"{name:<8} {write_times[name]:>9.2f} {stats[name]['processed'] / write_times[name]:>11,.0f} "
+                  f"{_output_size(outputs[name]) / 2 ** 20:>11.2f} {t_scan:>8.3f} {t_one:>18.3f} "
+                  f"{'так' if same else 'НІ':>6}")
+
+        files = ds.dataset(outputs["parquet"], format="parquet", partitioning="hive").files
+        print(f"Parquet: {len(files)} файлів у {len({os.path.dirname(f) for f in files})} партиціях")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Clean-вихід: JSONL vs Parquet (запис, розмір, подальший скан).")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--sensors", type=int, default=8)
+    parser.add_argument("--days", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(args.records, args.sensors, args.days, args.repeats, args.seed)
@@ -0,0 +1,71 @@
+import argparse
+import json
+import time
+
+from data_generator import generate_sensor_data
+from data_processor import validate_record
+from serialization import BACKENDS, RecordCodec
+
+
+def _baseline(lines):
+    """Початковий шлях: json.loads + json.dumps (+ record.copy() для DLQ)."""
+    out = []
+    for line in lines:
+        record = json.loads(line)
+        is_valid, error_reason = validate_record(record)
+        if is_valid:
+            out.append(json.dumps(record))
+        else:
+            dlq_record = record.copy()
+            dlq_record["error"] = error_reason
+            out.append(json.dumps(dlq_record))
+    return out
+
+
+def _with_codec(lines, codec: RecordCodec):
+    out = []
+    for line in lines:
+        record = codec.decode(line)
+        is_valid, error_reason = validate_record(record)
+        if is_valid:
+            out.append(codec.encode_clean(record, line))
+        else:
+            out.append(codec.encode_dlq(record, line, error_reason))
+    return out
+
+
+def _time(fn, *args, repeat: int = 3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(num_records: int) -> None:
+    lines = generate_sensor_data(sensor_id="BENCH_PRES", sequence_start=1, num_records=num_records)
+    n = len(lines)
+
+    print(f"\n--- Мікробенчмарк серіалізації ({n:,} рядків) ---")
+    print(f"{'ВАРІАНТ':<22} {'DECODE, С':>10} {'ПОВНИЙ ЦИКЛ, С':>15} {'РЯДКІВ/С':>12} {'ЗБІГ':>6}")
+    print("-" * 70)
+
+    t_decode, _ = _time(lambda: [json.loads(line) for line in lines])
+    t_full, expected = _time(_baseline, lines)
+    print(f"{'json (початковий)':<22} {t_decode:>10.3f} {t_full:>15.3f} {n / t_full:>12,.0f} {'-':>6}")
+
+    for backend in BACKENDS:
+        codec = RecordCodec(backend)
+        t_decode, _ = _time(lambda: [codec.decode(line) for line in lines])
+        t_full, result = _time(_with_codec, lines, codec)
+        print(f"{'codec/' + backend:<22} {t_decode:>10.3f} {t_full:>15.3f} {n / t_full:>12,.0f} "
+              f"{'так' if result == expected else 'НІ':>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Порівняння бекендів розбору/серіалізації записів.")
+    parser.add_argument("--records", type=int, default=500_000)
+    args = parser.parse_args()
+
+    run_benchmark(args.records)
@@ -0,0 +1,83 @@
+import argparse
+import multiprocessing as mp
+import random
+import resource
+import time
+
+from dedup_store import create_dedup_store
+
+# Конфігурації сховищ, що порівнюються (назва -> (тип, параметри))
+STORE_CONFIGS = {
+    "set[str] (початковий)": ("set", {}),
+    "window (точний)": ("window", {}),
+    "window (N=65536)": ("window", {"window": 65536}),
+    "bloom (p=0.001)": ("bloom", {"error_rate": 0.001}),
+}
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss у Linux вимірюється в КБ
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_store(kind: str, options: dict, num_records: int, num_sensors: int, seed: int, result_queue) -> None:
+    """Проганяє синтетичний потік ID через сховище у окремому процесі та повертає метрики."""
+    if kind == "bloom":
+        options = dict(options, capacity=num_records)
+    rng = random.Random(seed)
+    sensors = [f"SENSOR_{i:03}" for i in range(num_sensors)]
+    next_seq = [1000] * num_sensors
+
+    rss_before = _peak_rss_mb()
+    store = create_dedup_store(kind, **options)
+    duplicates = 0
+
+    start = time.perf_counter()
+    for i in range(num_records):
+        s = i % num_sensors
+        sensor_id = sensors[s]
+        # ~15% дублікатів попереднього номера, як у generate_sensor_data
+        if rng.random() < 0.15 and next_seq[s] > 1000:
+            sequence_id = next_seq[s] - 1
+        else:
+            sequence_id = next_seq[s]
+            next_seq[s] += 1
+
+        if store.seen(sensor_id, sequence_id):
+            duplicates += 1
+            continue
+        # ~20% записів невалідні й не потрапляють у сховище
+        if rng.random() >= 0.2:
+            store.add(sensor_id, sequence_id)
+    elapsed = time.perf_counter() - start
+
+    result_queue.put({
+        "records_per_s": num_records / elapsed,
+        "rss_mb": _peak_rss_mb() - rss_before,
+        "duplicates": duplicates,
+    })
+
+
+def run_benchmark(num_records: int, num_sensors: int, seed: int) -> None:
+    print(f"--- Бенчмарк дедуплікації: {num_records:,} записів, {num_sensors} сенсорів ---")
+    print(f"{'СХОВИЩЕ':<24} {'ЗАПИСІВ/С':>12} {'ΔRSS, МБ':>10} {'ДУБЛІКАТІВ':>12}")
+    print("-" * 62)
+
+    ctx = mp.get_context("fork")
+    for name, (kind, options) in STORE_CONFIGS.items():
+        result_queue = ctx.Queue()
+        proc = ctx.Process(target=_run_store, args=(kind, options, num_records, num_sensors, seed, result_queue))
+        proc.start()
+        result = result_queue.get()
+        proc.join()
+        print(f"{name:<24} {result['records_per_s']:>12,.0f} {result['rss_mb']:>10.1f} {result['duplicates']:>12,}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Порівняння сховищ дедуплікації (RSS та записів/с).")
+    parser.add_argument("--records", type=int, default=10_000_000)
+    parser.add_argument("--sensors", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    run_benchmark(args.records, args.sensors, args.seed)
@@ -0,0 +1,62 @@
+import argparse
+import logging
+import os
+import tempfile
+import time
+
+from data_generator import write_sensor_data
+from data_processor import process_data_stream
+from metrics import MetricsExporter, PipelineMetrics
+
+
+def _run(stream_path: str, tmp: str, **options) -> float:
+    start = time.perf_counter()
+    process_data_stream(stream_path, os.path.join(tmp, "clean.jsonl"), os.path.join(tmp, "dlq.jsonl"), **options)
+    return time.perf_counter() - start
+
+
+def run_benchmark(num_records: int, repeat: int, sample_every: int, log_every: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        stream_path = os.path.join(tmp, "input_stream.txt")
+        n = write_sensor_data(stream_path, "BENCH_PRES", 1, num_records, seed=42)
+
+        # Детальні логи йдуть у /dev/null, щоб міряти вартість logging, а не терміналу
+        root = logging.getLogger()
+        saved_handlers = root.handlers[:]
+        root.handlers = [logging.StreamHandler(open(os.devnull, "w"))]
+        try:
+            variants = [
+                ("без метрик", {}),
+                (f"метрики (1/{sample_every})", {"metrics": PipelineMetrics(sample_every)}),
+                ("метрики + jsonl 0.1с", {"metrics": PipelineMetrics(sample_every, MetricsExporter(
+                    os.path.join(tmp, "metrics.jsonl"), "jsonl", interval=0.1))}),
+                ("метрики + prom 0.1с", {"metrics": PipelineMetrics(sample_every, MetricsExporter(
+                    os.path.join(tmp, "metrics.prom"), "prometheus", interval=0.1))}),
+                ("логи: кожна подія", {"show_detailed_logs": True}),
+                (f"логи: 1/{log_every}", {"show_detailed_logs": True, "log_every": log_every}),
+            ]
+            # Варіанти чергуються в кожному повторі, щоб фоновий шум впливав на всі однаково
+            results = dict.fromkeys((name for name, _ in variants), float("inf"))
+            for _ in range(repeat):
+                for name, options in variants:
+                    results[name] = min(results[name], _run(stream_path, tmp, **options))
+        finally:
+            root.handlers = saved_handlers
+
+        baseline = results["без метрик"]
+        print(f"\n--- Накладні витрати інструментування ({n:,} рядків, найкращий з {repeat}) ---")
+        print(f"{'ВАРІАНТ':<24} {'ЧАС, С':>8} {'РЯДКІВ/С':>12} {'НАКЛАДНІ':>10}")
+        print("-" * 58)
+        for name, elapsed in results.items():
+            print(f"{name:<24} {elapsed:>8.3f} {n / elapsed:>12,.0f} {(elapsed / baseline - 1) * 100:>+9.1f}%")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Накладні витрати метрик і вибіркового логування.")
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--sample-every", type=int, default=16)
+    parser.add_argument("--log-every", type=int, default=1000)
+    args = parser.parse_args()
+
+    run_benchmark(args.records, args.repeat, args.sample_every, args.log_every)
@@ -0,0 +1,56 @@
+import argparse
+import filecmp
+import os
+import tempfile
+import time
+
+from data_generator import generate_sensor_data
+from data_processor import process_data_stream
+from parallel_processor import process_data_stream_parallel
+
+
+def _prepare_input(path: str, num_records: int) -> None:
+    with open(path, "w") as f:
+        for record_str in generate_sensor_data(sensor_id="BENCH_PRES", sequence_start=1, num_records=num_records):
+            f.write(record_str + "\n")
+
+
+def run_benchmark(num_records: int, max_workers: int, chunk_size: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        stream_path = os.path.join(tmp, "input_stream.txt")
+        _prepare_input(stream_path, num_records)
+        size_mb = os.path.getsize(stream_path) / 1024 / 1024
+
+        serial_clean, serial_dlq = os.path.join(tmp, "clean_serial.jsonl"), os.path.join(tmp, "dlq_serial.jsonl")
+        start = time.perf_counter()
+        serial_stats = process_data_stream(stream_path, serial_clean, serial_dlq)
+        t_serial = time.perf_counter() - start
+
+        print(f"\n--- Масштабування: {serial_stats['processed']:,} рядків ({size_mb:.1f} МБ) ---")
+        print(f"{'ВОРКЕРИ':<10} {'ЧАС, С':>8} {'РЯДКІВ/С':>12} {'ПРИСКОРЕННЯ':>12} {'ЗБІГ':>6}")
+        print("-" * 52)
+        print(f"{'serial':<10} {t_serial:>8.2f} {serial_stats['processed'] / t_serial:>12,.0f} {1.0:>12.2f} {'-':>6}")
+
+        workers = 1
+        while workers <= max_workers:
+            clean, dlq = os.path.join(tmp, f"clean_{workers}.jsonl"), os.path.join(tmp, f"dlq_{workers}.jsonl")
+            start = time.perf_counter()
+            stats = process_data_stream_parallel(stream_path, clean, dlq, workers=workers, chunk_size=chunk_size)
+            elapsed = time.perf_counter() - start
+
+            # Перевірка: вихід паралельного режиму має побайтово збігатися з послідовним
+            same = (stats == serial_stats and filecmp.cmp(clean, serial_clean, shallow=False)
+                    and filecmp.cmp(dlq, serial_dlq, shallow=False))
+            print(f"{workers:<10} {elapsed:>8.2f} {stats['processed'] / elapsed:>12,.0f} "
+                  f"{t_serial / elapsed:>12.2f} {'так' if same else 'НІ':>6}")
+            workers *= 2
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Бенчмарк масштабування паралельної обробки (1..N процесів).")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=4 * 1024 * 1024)
+    args = parser.parse_args()
+
+    run_benchmark(args.records, args.max_workers, args.chunk_size)
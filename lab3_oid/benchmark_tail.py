@@ -0,0 +1,75 @@
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from data_generator import iter_sensor_data
+from incremental_processor import follow_stream
+
+
+def _writer(stream_path: str, num_records: int, rate: float, append_times: dict, done: threading.Event) -> None:
+    """Дописує записи у вхідний файл з заданою швидкістю, запам'ятовуючи час запису кожного рядка."""
+    interval = 1.0 / rate
+    start = time.perf_counter()
+    with open(stream_path, "a") as f:
+        for i, line in enumerate(iter_sensor_data("TAIL_PRES", 1, num_records, duplicate_rate=0.0, error_rate=0.0)):
+            f.write(line + "\n")
+            f.flush()
+            append_times[json.loads(line)["sequence_id"]] = time.perf_counter()
+            # Рівномірний темп без накопичення похибки sleep()
+            delay = (i + 1) * interval - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+    done.set()
+
+
+def _percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def run_benchmark(num_records: int, rate: float, poll_interval: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        stream_path = os.path.join(tmp, "input_stream.txt")
+        clean_path, dlq_path = os.path.join(tmp, "clean_data.jsonl"), os.path.join(tmp, "dlq.jsonl")
+        checkpoint_path = os.path.join(tmp, "checkpoint.json")
+        open(stream_path, "w").close()
+
+        append_times, latencies = {}, []
+
+        def on_block(lines):
+            now = time.perf_counter()
+            for line in lines:
+                appended = append_times.get(json.loads(line)["sequence_id"])
+                if appended is not None:
+                    latencies.append(now - appended)
+
+        done = threading.Event()
+        writer = threading.Thread(target=_writer, args=(stream_path, num_records, rate, append_times, done))
+        writer.start()
+
+        stop = threading.Event()
+        threading.Thread(target=lambda: (done.wait(), time.sleep(poll_interval * 5), stop.set())).start()
+        stats = follow_stream(stream_path, clean_path, dlq_path, checkpoint_path, checkpoint_interval=1.0,
+                              poll_interval=poll_interval, stop_event=stop, on_block=on_block)
+        writer.join()
+
+        print(f"\n--- Затримка 'рядок дописано -> рядок записано' ({stats['processed']:,} рядків, "
+              f"{rate:,.0f} рядків/с, опитування {poll_interval * 1000:.0f} мс) ---")
+        print(f"p50: {_percentile(latencies, 0.50) * 1000:.1f} мс")
+        print(f"p95: {_percentile(latencies, 0.95) * 1000:.1f} мс")
+        print(f"p99: {_percentile(latencies, 0.99) * 1000:.1f} мс")
+        print(f"max: {max(latencies) * 1000:.1f} мс, середня: {statistics.mean(latencies) * 1000:.1f} мс")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Наскрізна затримка інкрементального (tail) режиму.")
+    parser.add_argument("--records", type=int, default=20_000)
+    parser.add_argument("--rate", type=float, default=2_000.0, help="Рядків за секунду від записувача.")
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    run_benchmark(args.records, args.rate, args.poll_interval)
@@ -0,0 +1,103 @@
+import argparse
+import filecmp
+import json
+import os
+import tempfile
+import time
+
+from batch_validator import parse_lines
+from data_generator import write_sensor_data
+from data_processor import DEFAULT_BATCH_SIZE, VALIDATION_CONFIG, process_data_stream, validate_record
+from serialization import get_default_codec
+
+
+def _read_blocks(path: str, batch_size: int):
+    with open(path) as f:
+        lines = [line.strip() for line in f]
+    return [lines[i:i + batch_size] for i in range(0, len(lines), batch_size)]
+
+
+def _validate_rows(blocks) -> list:
+    """Звичайний шлях: розбір кожного рядка кодеком і validate_record для кожного запису."""
+    decode = get_default_codec().decode
+    results = []
+    for block in blocks:
+        for line in block:
+            try:
+                results.append(validate_record(decode(line))[0])
+            except json.JSONDecodeError:  # порожні й зламані рядки
+                results.append(None)
+    return results
+
+
+def _validate_columns(blocks) -> list:
+    """Стовпцевий шлях: parse_lines і маска діапазону на блок; неканонічні рядки — звичайним шляхом."""
+    value_min, value_max = VALIDATION_CONFIG["value_min"], VALIDATION_CONFIG["value_max"]
+    results = []
+    for block in blocks:
+        columns = parse_lines(block)
+        canonical = columns.canonical.tolist()
+        valid = ((columns.values >= value_min) & (columns.values <= value_max)).tolist()
+        fallback = iter(_validate_rows([[line for line, c in zip(block, canonical) if not c]]))
+        results.extend(v if c else next(fallback) for c, v in zip(canonical, valid))
+    return results
+
+
+def _best(fn, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def run_benchmark(num_records: int, num_sensors: int, repeats: int, seed: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        stream_path = os.path.join(tmp, "input_stream.txt")
+        write_sensor_data(stream_path, "BENCH_VAL", 1, num_records, num_sensors=num_sensors, seed=seed)
+        blocks = _read_blocks(stream_path, DEFAULT_BATCH_SIZE)
+        canonical = sum(int(parse_lines(block).canonical.sum()) for block in blocks)
+        total = sum(len(block) for block in blocks)
+
+        print(f"\n--- Валідація: {total:,} рядків, канонічної форми {canonical / total:.1%} ---")
+        print(f"{'ЕТАП':<28} {'РЯДКОВО, С':>11} {'СТОВПЦЯМИ, С':>13} {'ПРИСКОРЕННЯ':>12} {'ЗБІГ':>6}")
+        print("-" * 74)
+
+        t_rows, rows = _best(lambda: _validate_rows(blocks), repeats)
+        t_columns, columns = _best(lambda: _validate_columns(blocks), repeats)
+        print(f"{'розбір + валідація':<28} {t_rows:>11.2f} {t_columns:>13.2f} {t_rows / t_columns:>11.2f}× "
+              f"{'так' if rows == columns else 'НІ':>6}")
+
+        # Увесь конвеєр: дедуплікація, маршрутизація й запис clean/DLQ лишаються порядковими
+        for clean_format in ("jsonl", "parquet"):
+            times, stats = {False: float("inf"), True: float("inf")}, {}
+            for _ in range(repeats):
+                # Варіанти чергуються, тож фонові коливання диска впливають на обидва однаково
+                for batch_validation in (False, True):
+                    suffix = f"{clean_format}_{batch_validation}"
+                    clean_path = os.path.join(tmp, f"clean_{suffix}" + (".jsonl" if clean_format == "jsonl" else ""))
+                    start = time.perf_counter()
+                    stats[batch_validation] = process_data_stream(
+                        stream_path, clean_path, os.path.join(tmp, f"dlq_{suffix}.jsonl"),
+                        clean_format=clean_format, batch_validation=batch_validation)
+                    times[batch_validation] = min(times[batch_validation], time.perf_counter() - start)
+            same = stats[False] == stats[True] and filecmp.cmp(
+                os.path.join(tmp, f"dlq_{clean_format}_False.jsonl"), os.path.join(tmp, f"dlq_{clean_format}_True.jsonl"),
+                shallow=False)
+            if clean_format == "jsonl":
+                same = same and filecmp.cmp(os.path.join(tmp, "clean_jsonl_False.jsonl"),
+                                            os.path.join(tmp, "clean_jsonl_True.jsonl"), shallow=False)
+            print(f"{'конвеєр, clean ' + clean_format:<28} {times[False]:>11.2f} {times[True]:>13.2f} "
+                  f"{times[False] / times[True]:>11.2f}× {'так' if same else 'НІ':>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Валідація: порядково (json.loads) vs стовпцями (batch_validator).")
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--sensors", type=int, default=8)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(args.records, args.sensors, args.repeats, args.seed)
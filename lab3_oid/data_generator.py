@@ -1,65 +1,227 @@
+import argparse
 import json
+import sys
 import time
 import random
-from typing import List
+from typing import IO, Iterator, List, Optional, Union
 
+try:
+    import numpy as np
+except ImportError:  # numpy потрібен лише для векторизованого режиму
+    np = None
 
-def generate_sensor_data(sensor_id: str, sequence_start: int, num_records: int) -> List[str]:
+# Як часто (у записах) оновлювати мітку часу в потоковому режимі
+TIMESTAMP_REFRESH = 1024
+
+# Розмір блоку векторизованої генерації
+DEFAULT_GENERATION_BATCH = 65536
+
+
+def _sensor_names(sensor_id: str, num_sensors: int) -> List[str]:
+    """Один сенсор зберігає назву як є, кілька — отримують суфікси _000, _001, ..."""
+    if num_sensors == 1:
+        return [sensor_id]
+    return [f"{sensor_id}_{k:03}" for k in range(num_sensors)]
+
+
+def iter_sensor_data(sensor_id: str, sequence_start: int, num_records: int, num_sensors: int = 1,
+                     error_rate: float = 0.2, duplicate_rate: float = 0.15, seed: Optional[int] = None,
+                     base_timestamp: Optional[int] = None) -> Iterator[str]:
     """
-    Генерує потік записів даних із штучно введеними помилками (пошкодження, дублікати).
-    Повертає список рядків у форматі JSON.
+    Потоковий генератор записів (по одному JSON-рядку) з тими самими помилками та дублікатами,
+    що й generate_sensor_data, але без накопичення списку в пам'яті.
+
+    num_sensors    — кількість сенсорів; кожен має власну нумерацію від sequence_start.
+    seed           — зерно для відтворюваного потоку.
+    base_timestamp — фіксована мітка часу (для відтворюваності); інакше — поточний час.
     """
-    data_stream = []
+    rng = random.Random(seed)
+    names = _sensor_names(sensor_id, num_sensors)
+    next_sequence = [sequence_start] * num_sensors
 
     # Стан для імітації дублювання
     last_record_str = None
-
-    print(f"--- Генератор: Починаємо генерацію {num_records} записів для {sensor_id} ---")
+    current_time = base_timestamp if base_timestamp is not None else int(time.time())
 
     for i in range(num_records):
-        sequence_id = sequence_start + i
-        current_time = int(time.time())
+        if base_timestamp is None and i % TIMESTAMP_REFRESH == 0:
+            current_time = int(time.time())
+
+        sensor = rng.randrange(num_sensors) if num_sensors > 1 else 0
+        sequence_id = next_sequence[sensor]
+        next_sequence[sensor] += 1
 
         # Базовий валідний запис (тиск у діапазоні 20-30)
         record = {
-            "sensor_id": sensor_id,
+            "sensor_id": names[sensor],
             "timestamp": current_time,
             "sequence_id": sequence_id,
-            "value": round(random.uniform(20.0, 30.0), 2)
+            "value": round(rng.uniform(20.0, 30.0), 2)
         }
 
-        # --- Введення помилок (приблизно 20% ймовірності) ---
-        if random.random() < 0.2:
-            error_type = random.choice(["RANGE_ERROR", "FORMAT_ERROR", "MISSING_FIELD"])
+        # --- Введення помилок (за замовчуванням ~20% ймовірності) ---
+        if rng.random() < error_rate:
+            error_type = rng.choice(["RANGE_ERROR", "FORMAT_ERROR", "MISSING_FIELD"])
 
             if error_type == "RANGE_ERROR":
-                record["value"] = round(random.uniform(500.0, 5000.0), 2)  # Нереалістичне значення
-                # print(f"|--- Помилка: Запис {sequence_id} - Значення поза діапазоном.")
+                record["value"] = round(rng.uniform(500.0, 5000.0), 2)  # Нереалістичне значення
             elif error_type == "FORMAT_ERROR":
                 record["value"] = "ERROR_VAL"  # Неправильний тип даних
-                # print(f"|--- Помилка: Запис {sequence_id} - Неправильний формат значення.")
             elif error_type == "MISSING_FIELD":
                 del record["value"]  # Відсутнє критичне поле
-                # print(f"|--- Помилка: Запис {sequence_id} - Відсутнє поле 'value'.")
 
         current_record_str = json.dumps(record)
-        data_stream.append(current_record_str)
+        yield current_record_str
 
-        # --- Дублікати (15% ймовірності) ---
-        if last_record_str and random.random() < 0.15:
-            # Дублюємо останній запис
-            data_stream.append(last_record_str)
-            # print(f"|--- Помилка: Запис {sequence_id} - Створено дублікат.")
+        # --- Дублікати (за замовчуванням 15% ймовірності) ---
+        if last_record_str and rng.random() < duplicate_rate:
+            # Дублюємо попередній запис
+            yield last_record_str
 
         last_record_str = current_record_str
 
+
+def iter_sensor_data_batches(sensor_id: str, sequence_start: int, num_records: int, num_sensors: int = 1,
+                             error_rate: float = 0.2, duplicate_rate: float = 0.15, seed: Optional[int] = None,
+                             base_timestamp: Optional[int] = None,
+                             batch_size: int = DEFAULT_GENERATION_BATCH) -> Iterator[List[str]]:
+    """
+    Векторизована генерація блоками: значення, помилки та дублікати для цілого блоку
+    розігруються генератором numpy, а в Python лишається тільки форматування рядків.
+    Розподіли ті самі, що й у iter_sensor_data, але послідовність випадкових чисел інша.
+    """
+    if np is None:
+        raise RuntimeError("Векторизована генерація потребує numpy (pip install numpy).")
+
+    rng = np.random.default_rng(seed)
+    names = [json.dumps(name) for name in _sensor_names(sensor_id, num_sensors)]
+    next_sequence = np.full(num_sensors, sequence_start, dtype=np.int64)
+    last_record_str = None
+
+    for block_start in range(0, num_records, batch_size):
+        n = min(batch_size, num_records - block_start)
+        current_time = base_timestamp if base_timestamp is not None else int(time.time())
+
+        # Номери послідовності: для кожного сенсора — власний лічильник
+        if num_sensors > 1:
+            sensors = rng.integers(0, num_sensors, n)
+            order = np.argsort(sensors, kind="stable")
+            counts = np.bincount(sensors, minlength=num_sensors)
+            group_start = np.cumsum(counts) - counts
+            sequences = np.empty(n, dtype=np.int64)
+            sorted_sensors = sensors[order]
+            sequences[order] = next_sequence[sorted_sensors] + np.arange(n) - group_start[sorted_sensors]
+            next_sequence += counts
+        else:
+            sensors = np.zeros(n, dtype=np.int64)
+            sequences = next_sequence[0] + np.arange(n)
+            next_sequence[0] += n
+
+        values = np.round(rng.uniform(20.0, 30.0, n), 2)
+        is_error = rng.random(n) < error_rate
+        error_types = rng.integers(0, 3, n)  # 0 — RANGE_ERROR, 1 — FORMAT_ERROR, 2 — MISSING_FIELD
+        range_values = np.round(rng.uniform(500.0, 5000.0, n), 2)
+        is_duplicate = rng.random(n) < duplicate_rate
+
+        values = np.where(is_error & (error_types == 0), range_values, values)
+        value_text = list(map(repr, values.tolist()))
+        for i in np.flatnonzero(is_error & (error_types == 1)).tolist():
+            value_text[i] = '"ERROR_VAL"'
+
+        lines = [f'{{"sensor_id": {names[s]}, "timestamp": {current_time}, "sequence_id": {q}, "value": {v}}}'
+                 for s, q, v in zip(sensors.tolist(), sequences.tolist(), value_text)]
+        for i in np.flatnonzero(is_error & (error_types == 2)).tolist():
+            lines[i] = (f'{{"sensor_id": {names[sensors[i]]}, "timestamp": {current_time}, '
+                        f'"sequence_id": {sequences[i]}}}')
+
+        # Дублікат попереднього запису йде одразу після поточного (як у iter_sensor_data)
+        if last_record_str is None:
+            is_duplicate[0] = False
+        if is_duplicate.any():
+            pool = [last_record_str] + lines
+            index = np.repeat(np.arange(1, n + 1), 1 + is_duplicate)
+            second = np.flatnonzero(index[1:] == index[:-1]) + 1
+            index[second] -= 1
+            block = [pool[k] for k in index.tolist()]
+        else:
+            block = lines
+
+        last_record_str = lines[-1]
+        yield block
+
+
+def generate_sensor_data(sensor_id: str, sequence_start: int, num_records: int, **options) -> List[str]:
+    """
+    Генерує потік записів даних із штучно введеними помилками (пошкодження, дублікати).
+    Повертає список рядків у форматі JSON. Додаткові параметри — як у iter_sensor_data.
+    """
+    print(f"--- Генератор: Починаємо генерацію {num_records} записів для {sensor_id} ---")
+
+    data_stream = list(iter_sensor_data(sensor_id, sequence_start, num_records, **options))
+
     print(f"--- Генератор: Генерація завершена. Згенеровано {len(data_stream)} записів. ---")
     return data_stream
 
 
+def write_sensor_data(output: Union[str, IO[str]], sensor_id: str, sequence_start: int, num_records: int,
+                      vectorized: bool = False, batch_size: int = DEFAULT_GENERATION_BATCH,
+                      buffer_size: int = 1024 * 1024, **options) -> int:
+    """
+    Пише потік безпосередньо у файл, пайп або відкритий потік ('-' — stdout)
+    великими блоками замість запису по одному рядку. Повертає кількість рядків.
+    """
+    if vectorized:
+        blocks = iter_sensor_data_batches(sensor_id, sequence_start, num_records, batch_size=batch_size, **options)
+    else:
+        stream = iter_sensor_data(sensor_id, sequence_start, num_records, **options)
+        blocks = iter(lambda: [line for _, line in zip(range(batch_size), stream)], [])
+
+    if output == "-":
+        target, close = sys.stdout, False
+    elif isinstance(output, str):
+        target, close = open(output, "w", buffering=buffer_size), True
+    else:
+        target, close = output, False
+
+    written = 0
+    try:
+        for block in blocks:
+            target.write("\n".join(block) + "\n")
+            written += len(block)
+    finally:
+        if close:
+            target.close()
+        else:
+            target.flush()
+    return written
+
+
 if __name__ == '__main__':
-    # Приклад для тестування
-    stream = generate_sensor_data(sensor_id="LAB_TEST", sequence_start=1, num_records=10)
-    print("\nПриклад згенерованого потоку:")
-    for record_str in stream:
-        print(record_str)
+    parser = argparse.ArgumentParser(description="Генератор синтетичного потоку даних сенсорів.")
+    parser.add_argument("--output", help="Файл для запису ('-' — stdout). Без параметра — короткий приклад.")
+    parser.add_argument("--records", type=int, default=10)
+    parser.add_argument("--sensors", type=int, default=1)
+    parser.add_argument("--sensor-id", default="LAB_TEST")
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--duplicate-rate", type=float, default=0.15)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--base-timestamp", type=int, help="Фіксована мітка часу (для відтворюваного виходу).")
+    parser.add_argument("--vectorized", action="store_true", help="Блокова генерація через numpy.")
+    args = parser.parse_args()
+
+    if args.output is None:
+        # Приклад для тестування
+        stream = generate_sensor_data(sensor_id=args.sensor_id, sequence_start=1, num_records=args.records,
+                                      seed=args.seed)
+        print("\nПриклад згенерованого потоку:")
+        for record_str in stream:
+            print(record_str)
+    else:
+        start = time.perf_counter()
+        count = write_sensor_data(args.output, args.sensor_id, 1, args.records, vectorized=args.vectorized,
+                                  num_sensors=args.sensors, error_rate=args.error_rate,
+                                  duplicate_rate=args.duplicate_rate, seed=args.seed,
+                                  base_timestamp=args.base_timestamp)
+        elapsed = time.perf_counter() - start
+        print(f"--- Генератор: записано {count} рядків за {elapsed:.2f} сек ({count / elapsed:,.0f} рядків/с) ---",
+              file=sys.stderr)
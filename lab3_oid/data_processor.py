@@ -1,6 +1,15 @@
 import json
 import logging
-from typing import Dict, Any, Set, Tuple
+import os
+import time
+from itertools import repeat
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
+
+import batch_validator
+from dedup_store import SetDedupStore, load_dedup_store, save_dedup_store
+from metrics import PipelineMetrics
+from parquet_sink import ParquetCleanSink
+from serialization import RecordCodec, append_error, get_default_codec
 
 # Налаштування логування
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
@@ -12,90 +21,320 @@ VALIDATION_CONFIG = {
 }
 
 
-def validate_record(record: Dict[str, Any]) -> Tuple[bool, str]:
-    """Виконує валідацію схеми та діапазону."""
+# Обов'язкові поля запису та готові результати валідації (не створюються на кожен запис)
+REQUIRED_FIELDS = ("sensor_id", "timestamp", "sequence_id", "value")
+_MISSING_FIELD_RESULTS = {field: (False, f"MISSING_FIELD: Поле '{field}' відсутнє.") for field in REQUIRED_FIELDS}
+_FORMAT_ERROR_RESULT = (False, "FORMAT_ERROR: 'value' не є числовим типом.")
+_VALID_RESULT = (True, "Valid")
+
+
+def range_error(value: float, value_min: float, value_max: float) -> str:
+    return f"RANGE_ERROR: Значення {value} поза допустимим діапазоном ({value_min}-{value_max})."
+
+
+def validate_record(record: Dict[str, Any], value_min: Optional[float] = None,
+                    value_max: Optional[float] = None) -> Tuple[bool, str]:
+    """
+    Виконує валідацію схеми та діапазону. Межі value — з VALIDATION_CONFIG, якщо їх не передано
+    (RecordRouter читає конфігурацію раз на блок).
+    """
+    if value_min is None:
+        value_min = VALIDATION_CONFIG["value_min"]
+    if value_max is None:
+        value_max = VALIDATION_CONFIG["value_max"]
 
     # 1. Перевірка схеми (наявність полів)
-    required_fields = ["sensor_id", "timestamp", "sequence_id", "value"]
-    for field in required_fields:
+    for field in REQUIRED_FIELDS:
         if field not in record:
-            return False, f"MISSING_FIELD: Поле '{field}' відсутнє."
+            return _MISSING_FIELD_RESULTS[field]
 
     # 2. Перевірка типу даних
     try:
         value = float(record["value"])
     except (ValueError, TypeError):
-        return False, "FORMAT_ERROR: 'value' не є числовим типом."
+        return _FORMAT_ERROR_RESULT
 
     # 3. Перевірка діапазону
-    if not (VALIDATION_CONFIG["value_min"] <= value <= VALIDATION_CONFIG["value_max"]):
-        return False, f"RANGE_ERROR: Значення {value} поза допустимим діапазоном ({VALIDATION_CONFIG['value_min']}-{VALIDATION_CONFIG['value_max']})."
+    if not (value_min <= value <= value_max):
+        return False, range_error(value, value_min, value_max)
+
+    return _VALID_RESULT
+
+
+# Кількість рядків, що читаються та валідуються одним блоком
+DEFAULT_BATCH_SIZE = 4096
+
+# Формати clean-виходу: рядки JSONL або каталог Parquet, розбитий за sensor_id і датою
+CLEAN_FORMATS = ("jsonl", "parquet")
+
+# Маркери для рядків блоку, які не є записами
+BLANK_LINE = object()
+DECODE_FAILED = object()
+
+
+def read_blocks(stream_file: Iterable[str], batch_size: int) -> Iterator[List[str]]:
+    """Групує рядки файлу в блоки по batch_size."""
+    block = []
+    for line in stream_file:
+        block.append(line)
+        if len(block) >= batch_size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+class RecordRouter:
+    """
+    Стан обробки потоку: дедуплікація, валідація та запис рядків у clean/DLQ.
+    Обробляє рядки блоками, тож його можна живити як з файлу цілком (process_data_stream),
+    так і інкрементально (хвіст файлу, черга тощо). Лічильники — у self.stats.
+
+    clean_file — файл або приймач з write(); якщо приймач має write_record(record) (напр.
+                 parquet_sink.ParquetCleanSink), валідні записи передаються йому без серіалізації.
+    metrics   — metrics.PipelineMetrics для затримок етапів і лічильників класів помилок.
+    log_every — детальні логи (show_detailed_logs) пишуться для кожної log_every-ї події.
+    batch_validation — рядки канонічної форми розбираються й перевіряються стовпцями
+                 (batch_validator.parse_lines) без json.loads; решта — звичайним шляхом.
+    """
+
+    def __init__(self, clean_file, dlq_file, dedup_store=None, codec: Optional[RecordCodec] = None,
+                 show_detailed_logs: bool = False, stats: Optional[Dict[str, int]] = None,
+                 metrics: Optional[PipelineMetrics] = None, log_every: int = 1,
+                 batch_validation: bool = False):
+        if batch_validation and batch_validator.np is None:
+            raise RuntimeError("Стовпцева валідація потребує numpy (pip install numpy).")
+        self.batch_validation = batch_validation
+        self.clean_file = clean_file
+        self.write_record = getattr(clean_file, "write_record", None)
+        self.dlq_file = dlq_file
+        self.dedup_store = dedup_store if dedup_store is not None else SetDedupStore()
+        self.codec = codec or get_default_codec()
+        self.show_detailed_logs = show_detailed_logs
+        self.stats = stats if stats is not None else {"processed": 0, "valid": 0, "duplicates": 0, "invalid": 0}
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.stats = self.stats
+        self.log_every = log_every
+        self._log_events = 0
+
+    def _log_due(self) -> bool:
+        """Вибірковий детальний лог: True для першої та кожної log_every-ї події."""
+        self._log_events += 1
+        return (self._log_events - 1) % self.log_every == 0
+
+    def process_block(self, block: List[str]) -> None:
+        """Обробляє блок сирих рядків (з '\\n' або без) у порядку надходження."""
+        codec = self.codec
+        metrics = self.metrics
+        if metrics is not None:
+            block_start = time.perf_counter()
+
+        lines = [line.strip() for line in block]
+        columns = batch_validator.parse_lines(lines) if self.batch_validation else None
+        verdicts = self._column_verdicts(columns) if columns is not None else None
+        entries = []
+        for line, verdict in zip(lines, verdicts or repeat(None)):
+            if verdict is not None:
+                entries.append((line, None))
+            elif not line:
+                entries.append((line, BLANK_LINE))
+            else:
+                try:
+                    entries.append((line, codec.decode(line)))
+                except json.JSONDecodeError:
+                    entries.append((line, DECODE_FAILED))
+        if columns is not None and self.write_record is not None:
+            # Приймачу з write_record потрібні самі записи — будуються лише для канонічних рядків
+            canonical = [i for i, verdict in enumerate(verdicts) if verdict is not None]
+            for i, record in zip(canonical, columns.records(canonical)):
+                entries[i] = (lines[i], record)
+        if metrics is not None:
+            metrics.observe_block("decode", time.perf_counter() - block_start, len(block))
+        self.process_entries(entries, verdicts)
+
+    @staticmethod
+    def _column_verdicts(columns: "batch_validator.LineColumns") -> list:
+        """
+        Вердикти стовпцевої валідації: для рядка канонічної форми — (sensor_id, sequence_id,
+        причина відмови або None), для решти — None. Межі value читаються раз на блок.
+        """
+        value_min, value_max = VALIDATION_CONFIG["value_min"], VALIDATION_CONFIG["value_max"]
+        values = columns.values
+        in_range = ((values >= value_min) & (values <= value_max)).tolist()
+        return [None if not canonical else
+                (sensor_id, sequence_id, None if valid else range_error(value, value_min, value_max))
+                for canonical, sensor_id, sequence_id, value, valid in
+                zip(columns.canonical.tolist(), columns.sensor_ids, columns.sequence_ids.tolist(),
+                    values.tolist(), in_range)]
+
+    def process_entries(self, entries: List[Tuple[str, Any]], verdicts: Optional[list] = None) -> None:
+        """
+        Обробляє вже розібраний блок: пари (рядок без '\\n', запис). Запис може бути маркером
+        BLANK_LINE (порожній рядок) або DECODE_FAILED (рядок не розібрався).
+
+        verdicts — результати стовпцевої валідації (див. _column_verdicts), по одному на пару:
+        для рядка з вердиктом запис не потрібен (None), а рядок канонічний, тож пишеться як є.
+        """
+        stats = self.stats
+        codec = self.codec
+        dedup_store = self.dedup_store
+        clean_file, dlq_file = self.clean_file, self.dlq_file
+        write_record = self.write_record
+        show_detailed_logs = self.show_detailed_logs
+        metrics = self.metrics
+        # Поетапний замір кожного запису — лише у кожному sample_every-му блоці
+        timed = metrics is not None and metrics.counters["blocks"] % metrics.sample_every == 0
+        if metrics is not None:
+            histograms = metrics.histograms
+        value_min, value_max = VALIDATION_CONFIG["value_min"], VALIDATION_CONFIG["value_max"]
+
+        for (line, record), verdict in zip(entries, verdicts or repeat(None)):
+            stats["processed"] += 1
+            if verdict is not None:
+                sensor_id, sequence_id, error_reason = verdict
+                unique_id = f"{sensor_id}_{sequence_id}"
+            elif record is BLANK_LINE:
+                continue
+
+            elif record is DECODE_FAILED:
+                error_message = "JSON_DECODE_ERROR: Неможливо розібрати JSON."
+                dlq_file.write(json.dumps({"raw_data": line, "error": error_message}) + "\n")
+                if show_detailed_logs and self._log_due(): logging.warning(f"[{stats['processed']}] DLQ: {error_message}")
+                stats["invalid"] += 1
+                if metrics is not None:
+                    metrics.errors["JSON_DECODE_ERROR"] += 1
+                continue
+
+            # Запобігання помилці, якщо відсутні ключові поля для ID
+            elif not all(k in record for k in ['sensor_id', 'sequence_id']):
+                unique_id = f"UNKNOWN_{stats['processed']}"
+                sensor_id, sequence_id = "UNKNOWN", stats['processed']
+            else:
+                sensor_id, sequence_id = record['sensor_id'], record['sequence_id']
+                unique_id = f"{sensor_id}_{sequence_id}"
+
+            if timed:
+                t0 = time.perf_counter()
+
+            # 1. Перевірка на дублікат (Ідемпотентність)
+            if dedup_store.seen(sensor_id, sequence_id):
+                if timed:
+                    histograms["dedup"].observe(time.perf_counter() - t0)
+                if show_detailed_logs and self._log_due(): logging.info(
+                    f"[{stats['processed']}] DUPLICATE (ІДЕМПОТЕНТНІСТЬ): Виявлено дублікат {unique_id}. Пропущено.")
+                stats["duplicates"] += 1
+                continue
 
-    return True, "Valid"
+            if timed:
+                t1 = time.perf_counter()
+                histograms["dedup"].observe(t1 - t0)
 
+            # 2. Валідація даних (рядки з вердиктом уже перевірено стовпцями)
+            if verdict is None:
+                is_valid, error_reason = validate_record(record, value_min, value_max)
+            else:
+                is_valid = error_reason is None
+            if timed:
+                t2 = time.perf_counter()
+                histograms["validate"].observe(t2 - t1)
 
-def process_data_stream(stream_path: str, clean_data_path: str, dlq_path: str, show_detailed_logs: bool = False) -> \
-Dict[str, int]:
+            if is_valid and write_record is not None:
+                # Приймач із фіксованою схемою може відхилити запис (напр. нечисловий timestamp)
+                schema_error = write_record(record)
+                if schema_error is not None:
+                    is_valid, error_reason = False, schema_error
 
+            if is_valid:
+                # Валідний запис: зберігаємо, відзначаємо ID як оброблений
+                if write_record is None:
+                    clean_file.write((line if verdict is not None else codec.encode_clean(record, line)) + "\n")
+                dedup_store.add(sensor_id, sequence_id)
+                # if show_detailed_logs: logging.debug(f"[{stats['processed']}] VALID: Оброблено {unique_id}.")
+                stats["valid"] += 1
+            else:
+                # Невалідний запис: відправляємо в DLQ (Мертва черга)
+                dlq_file.write((append_error(line, error_reason) if verdict is not None
+                                else codec.encode_dlq(record, line, error_reason)) + "\n")
+                if show_detailed_logs and self._log_due(): logging.warning(
+                    f"[{stats['processed']}] DLQ (ПОМИЛКА): Запис {unique_id} - {error_reason}")
+                stats["invalid"] += 1
+                if metrics is not None:
+                    metrics.count_error(error_reason)
 
-    # Набір для відстеження унікальних ідентифікаторів (для ІДЕМПОТЕНТНОСТІ)
-    processed_ids: Set[str] = set()
+            if timed:
+                histograms["write"].observe(time.perf_counter() - t2)
+
+        if metrics is not None:
+            metrics.end_block(timed)
+
+
+def _open_clean_output(path: str, mode: str, clean_format: str):
+    if clean_format == "parquet":
+        return ParquetCleanSink(path, mode)
+    return open(path, mode)
+
+
+def process_data_stream(stream_path: str, clean_data_path: str, dlq_path: str, show_detailed_logs: bool = False,
+                        dedup_store=None, dedup_state_path: Optional[str] = None,
+                        batch_size: int = DEFAULT_BATCH_SIZE, codec: Optional[RecordCodec] = None,
+                        metrics: Optional[PipelineMetrics] = None, log_every: int = 1,
+                        clean_format: str = "jsonl", batch_validation: bool = False) -> Dict[str, int]:
+    """
+    Обробляє потік: дедуплікація, валідація, запис у clean/DLQ.
+
+    dedup_store      — сховище для відстеження оброблених ID (SetDedupStore,
+                       SequenceWindowDedupStore або BloomDedupStore з dedup_store.py).
+    dedup_state_path — файл зі станом дедуплікації. Якщо він існує, стан відновлюється,
+                       а вихідні файли доповнюються (повторний прогін того ж входу не
+                       дублює записи). Після обробки стан зберігається у цей файл.
+    codec            — розбір/серіалізація записів (serialization.RecordCodec); вихід побайтово
+                       збігається з json.dumps незалежно від бекенду.
+    metrics          — metrics.PipelineMetrics: затримки етапів (read, decode, dedup, validate, write),
+                       лічильники класів помилок і періодичні знімки (через MetricsExporter).
+    log_every        — писати детальний лог лише для кожної log_every-ї події.
+    clean_format     — 'jsonl' (рядок на запис) або 'parquet': clean_data_path — каталог,
+                       записи пишуться parquet_sink.ParquetCleanSink.
+    batch_validation — стовпцева валідація рядків канонічної форми (див. RecordRouter);
+                       вихід і stats ті самі, що й без неї.
+    """
+    if clean_format not in CLEAN_FORMATS:
+        raise ValueError(f"Невідомий формат clean-виходу: {clean_format}")
+    # Сховище для відстеження унікальних ідентифікаторів (для ІДЕМПОТЕНТНОСТІ)
+    resume = dedup_state_path is not None and os.path.exists(dedup_state_path)
+    if resume:
+        dedup_store = load_dedup_store(dedup_state_path)
+    elif dedup_store is None:
+        dedup_store = SetDedupStore()
+    output_mode = 'a' if resume else 'w'
 
     stats = {"processed": 0, "valid": 0, "duplicates": 0, "invalid": 0}
 
     try:
         with open(stream_path, 'r') as stream_file, \
-                open(clean_data_path, 'w') as clean_file, \
-                open(dlq_path, 'w') as dlq_file:
+                _open_clean_output(clean_data_path, output_mode, clean_format) as clean_file, \
+                open(dlq_path, output_mode) as dlq_file:
 
             if show_detailed_logs:
                 print("\n--- ЕТАП 2: ОБРОБКА ТА ВАЛІДАЦІЯ (Детальні Логи) ---")
 
-            for line in stream_file:
-                stats["processed"] += 1
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    record = json.loads(line)
-                except json.JSONDecodeError:
-                    error_message = "JSON_DECODE_ERROR: Неможливо розібрати JSON."
-                    dlq_file.write(json.dumps({"raw_data": line, "error": error_message}) + "\n")
-                    if show_detailed_logs: logging.warning(f"[{stats['processed']}] DLQ: {error_message}")
-                    stats["invalid"] += 1
-                    continue
-
-                # Запобігання помилці, якщо відсутні ключові поля для ID
-                if not all(k in record for k in ['sensor_id', 'sequence_id']):
-                    unique_id = f"UNKNOWN_{stats['processed']}"
-                else:
-                    unique_id = f"{record['sensor_id']}_{record['sequence_id']}"
-
-                # 1. Перевірка на дублікат (Ідемпотентність)
-                if unique_id in processed_ids:
-                    if show_detailed_logs: logging.info(
-                        f"[{stats['processed']}] DUPLICATE (ІДЕМПОТЕНТНІСТЬ): Виявлено дублікат {unique_id}. Пропущено.")
-                    stats["duplicates"] += 1
-                    continue
-
-                # 2. Валідація даних
-                is_valid, error_reason = validate_record(record)
-
-                if is_valid:
-                    # Валідний запис: зберігаємо, відзначаємо ID як оброблений
-                    clean_file.write(json.dumps(record) + "\n")
-                    processed_ids.add(unique_id)
-                    # if show_detailed_logs: logging.debug(f"[{stats['processed']}] VALID: Оброблено {unique_id}.")
-                    stats["valid"] += 1
-                else:
-                    # Невалідний запис: відправляємо в DLQ (Мертва черга)
-                    dlq_record = record.copy()
-                    dlq_record["error"] = error_reason
-                    dlq_file.write(json.dumps(dlq_record) + "\n")
-                    if show_detailed_logs: logging.warning(
-                        f"[{stats['processed']}] DLQ (ПОМИЛКА): Запис {unique_id} - {error_reason}")
-                    stats["invalid"] += 1
+            router = RecordRouter(clean_file, dlq_file, dedup_store=dedup_store, codec=codec,
+                                  show_detailed_logs=show_detailed_logs, stats=stats,
+                                  metrics=metrics, log_every=log_every, batch_validation=batch_validation)
+            blocks = read_blocks(stream_file, batch_size)
+            if metrics is None:
+                for block in blocks:
+                    router.process_block(block)
+            else:
+                while True:
+                    read_start = time.perf_counter()
+                    block = next(blocks, None)
+                    if block is None:
+                        break
+                    metrics.observe_block("read", time.perf_counter() - read_start, len(block))
+                    router.process_block(block)
+                if metrics.exporter is not None:
+                    metrics.exporter.export(metrics)
 
             if show_detailed_logs:
                 print("--- Споживач: Обробка завершена. ---")
@@ -105,3 +344,7 @@ Dict[str, int]:
         logging.error(f"Файл не знайдено: {stream_path}")
         return stats
 
+    finally:
+        # Стан дедуплікації відповідає вже записаним рядкам, тож зберігаємо його навіть після помилки
+        if dedup_state_path is not None:
+            save_dedup_store(dedup_store, dedup_state_path)
@@ -0,0 +1,370 @@
+import base64
+import glob
+import json
+import math
+import os
+from hashlib import blake2b as _blake2b
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Максимальний розмір бітової карти одного сенсора (у бітах) у точному режимі.
+# Номери, що виходять за цю межу (аномальні стрибки sequence_id), зберігаються окремо.
+MAX_BITMAP_SPAN = 1 << 27
+
+# Журнал дедуплікації не переписується у знімок, поки коротший за стільки записів
+MIN_COMPACT_ENTRIES = 100_000
+
+
+def make_unique_id(sensor_id: Any, sequence_id: Any) -> str:
+    """Формує рядковий ідентифікатор запису (як у початковій версії конвеєра)."""
+    return f"{sensor_id}_{sequence_id}"
+
+
+class SetDedupStore:
+    """
+    Початкова реалізація: множина рядків "{sensor_id}_{sequence_id}".
+    Пам'ять зростає лінійно з кількістю унікальних записів.
+    """
+
+    kind = "set"
+
+    def __init__(self):
+        self._ids: Set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def seen(self, sensor_id: Any, sequence_id: Any) -> bool:
+        return make_unique_id(sensor_id, sequence_id) in self._ids
+
+    def add(self, sensor_id: Any, sequence_id: Any) -> None:
+        self._ids.add(make_unique_id(sensor_id, sequence_id))
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"kind": self.kind, "ids": sorted(self._ids)}
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SetDedupStore":
+        store = cls()
+        store._ids.update(state["ids"])
+        return store
+
+
+class _SensorWindow:
+    """Бітова карта номерів послідовності одного сенсора: біт i відповідає номеру base + i."""
+
+    __slots__ = ("base", "bits", "high", "overflow")
+
+    def __init__(self, first_sequence: int):
+        self.base = first_sequence - first_sequence % 8
+        self.bits = bytearray(1)
+        self.high = first_sequence
+        self.overflow: Set[int] = set()
+
+    def contains(self, seq: int) -> bool:
+        offset = seq - self.base
+        if 0 <= offset < len(self.bits) * 8:
+            return bool(self.bits[offset >> 3] & (1 << (offset & 7)))
+        return seq in self.overflow
+
+    def set(self, seq: int) -> None:
+        offset = seq - self.base
+        if offset < 0:
+            # Запис "з минулого": розширюємо карту вліво на цілу кількість байтів
+            shift = (-offset + 7) // 8
+            if (len(self.bits) + shift) * 8 > MAX_BITMAP_SPAN:
+                self.overflow.add(seq)
+                return
+            self.bits[0:0] = bytes(shift)
+            self.base -= shift * 8
+            offset = seq - self.base
+        elif offset >= len(self.bits) * 8:
+            needed = (offset >> 3) + 1
+            if needed * 8 > MAX_BITMAP_SPAN:
+                self.overflow.add(seq)
+                return
+            # Геометричне зростання, щоб не перевиділяти пам'ять на кожному записі
+            self.bits.extend(bytes(max(needed - len(self.bits), len(self.bits))))
+        self.bits[offset >> 3] |= 1 << (offset & 7)
+        if seq > self.high:
+            self.high = seq
+
+    def trim(self, window: int) -> None:
+        """Відкидає байти карти, що повністю лежать нижче high - window."""
+        drop = (self.high - window + 1 - self.base) // 8
+        if drop <= 0:
+            return
+        if drop >= len(self.bits):
+            self.bits = bytearray(1)
+        else:
+            del self.bits[:drop]
+        self.base += drop * 8
+        if self.overflow:
+            self.overflow = {s for s in self.overflow if s >= self.base}
+
+
+class SequenceWindowDedupStore:
+    """
+    Компактне сховище: для кожного сенсора — high-water mark та бітова карта
+    номерів послідовності (1 біт на номер замість окремого рядка на запис).
+
+    window=None — точний режим (карта покриває весь діапазон номерів).
+    window=N    — обмежена пам'ять: пам'ятаються лише останні N номерів сенсора,
+                  а записи зі старішими номерами вважаються дублікатами.
+
+    Записи з нестандартними ключами (sensor_id не рядок або sequence_id не ціле)
+    відстежуються окремою множиною рядкових ідентифікаторів.
+    """
+
+    kind = "window"
+
+    def __init__(self, window: Optional[int] = None):
+        if window is not None and window <= 0:
+            raise ValueError("window має бути додатним числом або None.")
+        self.window = window
+        self._sensors: Dict[str, _SensorWindow] = {}
+        self._fallback: Set[str] = set()
+        self.stale = 0  # скільки записів відкинуто як "застарілі" (лише з window)
+
+    def __len__(self) -> int:
+        total = len(self._fallback)
+        for state in self._sensors.values():
+            total += int.from_bytes(state.bits, "little").bit_count() + len(state.overflow)
+        return total
+
+    def seen(self, sensor_id: Any, sequence_id: Any) -> bool:
+        if type(sensor_id) is not str or type(sequence_id) is not int:
+            return make_unique_id(sensor_id, sequence_id) in self._fallback
+        state = self._sensors.get(sensor_id)
+        if state is None:
+            return False
+        if self.window is not None and sequence_id <= state.high - self.window:
+            self.stale += 1
+            return True
+        return state.contains(sequence_id)
+
+    def add(self, sensor_id: Any, sequence_id: Any) -> None:
+        if type(sensor_id) is not str or type(sequence_id) is not int:
+            self._fallback.add(make_unique_id(sensor_id, sequence_id))
+            return
+        state = self._sensors.get(sensor_id)
+        if state is None:
+            state = self._sensors[sensor_id] = _SensorWindow(sequence_id)
+        elif self.window is not None and sequence_id > state.high:
+            # Спершу зсуваємо вікно, щоб стрибок номера не роздував карту
+            state.high = sequence_id
+            state.trim(self.window)
+        state.set(sequence_id)
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "window": self.window,
+            "sensors": {
+                sensor_id: {
+                    "base": s.base,
+                    "high": s.high,
+                    "bits": base64.b64encode(bytes(s.bits)).decode("ascii"),
+                    "overflow": sorted(s.overflow),
+                }
+                for sensor_id, s in self._sensors.items()
+            },
+            "fallback": sorted(self._fallback),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "SequenceWindowDedupStore":
+        store = cls(window=state["window"])
+        for sensor_id, data in state["sensors"].items():
+            window_state = _SensorWindow(data["base"])
+            window_state.base = data["base"]
+            window_state.high = data["high"]
+            window_state.bits = bytearray(base64.b64decode(data["bits"]))
+            window_state.overflow = set(data["overflow"])
+            store._sensors[sensor_id] = window_state
+        store._fallback.update(state["fallback"])
+        return store
+
+
+class BloomDedupStore:
+    """
+    Фільтр Блума з фіксованим обсягом пам'яті.
+    Ймовірність хибного спрацювання (валідний запис вважається дублікатом)
+    не перевищує error_rate, поки кількість записів не більша за capacity.
+    """
+
+    kind = "bloom"
+
+    def __init__(self, capacity: int = 10_000_000, error_rate: float = 0.001):
+        if capacity <= 0 or not (0.0 < error_rate < 1.0):
+            raise ValueError("capacity має бути > 0, а error_rate — у межах (0, 1).")
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _positions(self, sensor_id: Any, sequence_id: Any):
+        # Подвійне хешування: k позицій з двох 64-бітних половин одного дайджесту
+        digest = int.from_bytes(_blake2b(f"{sensor_id}_{sequence_id}".encode(), digest_size=16).digest(), "little")
+        h1 = digest & 0xFFFFFFFFFFFFFFFF
+        h2 = (digest >> 64) | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def seen(self, sensor_id: Any, sequence_id: Any) -> bool:
+        bits = self.bits
+        for pos in self._positions(sensor_id, sequence_id):
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+    def add(self, sensor_id: Any, sequence_id: Any) -> None:
+        bits = self.bits
+        for pos in self._positions(sensor_id, sequence_id):
+            bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "capacity": self.capacity,
+            "error_rate": self.error_rate,
+            "count": self.count,
+            "bits": base64.b64encode(bytes(self.bits)).decode("ascii"),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "BloomDedupStore":
+        store = cls(capacity=state["capacity"], error_rate=state["error_rate"])
+        store.bits = bytearray(base64.b64decode(state["bits"]))
+        store.count = state["count"]
+        return store
+
+
+DEDUP_STORES = {
+    SetDedupStore.kind: SetDedupStore,
+    SequenceWindowDedupStore.kind: SequenceWindowDedupStore,
+    BloomDedupStore.kind: BloomDedupStore,
+}
+
+
+def create_dedup_store(kind: str = "set", **options: Any):
+    """Створює сховище дедуплікації за назвою: 'set', 'window' або 'bloom'."""
+    if kind not in DEDUP_STORES:
+        raise ValueError(f"Невідомий тип сховища дедуплікації: {kind}. Доступні: {', '.join(DEDUP_STORES)}")
+    return DEDUP_STORES[kind](**options)
+
+
+def dedup_store_from_state(state: Dict[str, Any]):
+    """Відновлює сховище зі словника, отриманого через to_state()."""
+    return DEDUP_STORES[state["kind"]].from_state(state)
+
+
+def save_dedup_store(store, path: str) -> None:
+    """Атомарно зберігає стан сховища на диск (через тимчасовий файл та os.replace)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(store.to_state(), f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_dedup_store(path: str):
+    """Завантажує стан сховища, збережений save_dedup_store()."""
+    with open(path, "r") as f:
+        return dedup_store_from_state(json.load(f))
+
+
+class JournaledDedupStore:
+    """
+    Обгортка над сховищем дедуплікації для інкрементального режиму. Стан на диску — знімок
+    (save_dedup_store) і журнал ID, доданих після нього: {prefix}.{покоління}.json/.log.
+    commit() дописує в журнал лише ID, додані з попереднього commit(), тож вартість чекпоінту
+    пропорційна новим даним, а не всій історії. Коли журнал довший за знімок (і за
+    MIN_COMPACT_ENTRIES), пишеться знімок нового покоління — амортизовано O(1) на запис.
+
+    commit() повертає позицію (покоління, розмір журналу), яку зберігає чекпоінт; restore()
+    відновлює стан саме на цю позицію, відкидаючи хвіст журналу, дописаний після чекпоінту.
+    """
+
+    def __init__(self, store, prefix: str, position: Dict[str, int]):
+        self.store = store
+        self.prefix = prefix
+        self.position = position
+        self._pending: List[Tuple[Any, Any]] = []
+
+    @classmethod
+    def create(cls, store, prefix: str) -> "JournaledDedupStore":
+        """Новий журнал з початковим знімком store (файли попередніх запусків видаляються)."""
+        journal = cls(store, prefix, {"generation": -1})
+        journal._compact()
+        journal.remove_stale()
+        return journal
+
+    @classmethod
+    def restore(cls, prefix: str, position: Dict[str, int]) -> "JournaledDedupStore":
+        """Знімок покоління position['generation'] + перші position['log_size'] байтів журналу."""
+        snapshot_path, log_path = cls._paths(prefix, position["generation"])
+        store = load_dedup_store(snapshot_path)
+        with open(log_path, "r+b") as log:
+            log.truncate(position["log_size"])
+            for line in log:
+                sensor_id, sequence_id = json.loads(line)
+                store.add(sensor_id, sequence_id)
+        journal = cls(store, prefix, dict(position))
+        journal.remove_stale()
+        return journal
+
+    @staticmethod
+    def _paths(prefix: str, generation: int) -> Tuple[str, str]:
+        return f"{prefix}.{generation}.json", f"{prefix}.{generation}.log"
+
+    def __len__(self) -> int:
+        return len(self.store)
+
+    def seen(self, sensor_id: Any, sequence_id: Any) -> bool:
+        return self.store.seen(sensor_id, sequence_id)
+
+    def add(self, sensor_id: Any, sequence_id: Any) -> None:
+        self.store.add(sensor_id, sequence_id)
+        self._pending.append((sensor_id, sequence_id))
+
+    def to_state(self) -> Dict[str, Any]:
+        return self.store.to_state()
+
+    def _compact(self) -> None:
+        generation = self.position["generation"] + 1
+        snapshot_path, log_path = self._paths(self.prefix, generation)
+        save_dedup_store(self.store, snapshot_path)
+        open(log_path, "w").close()
+        self.position = {"generation": generation, "log_size": 0, "log_entries": 0,
+                         "snapshot_entries": len(self.store)}
+        self._pending = []
+
+    def commit(self) -> Dict[str, int]:
+        """Скидає нові ID у журнал (fsync) і повертає позицію для чекпоінту."""
+        position = self.position
+        if position["log_entries"] + len(self._pending) >= max(MIN_COMPACT_ENTRIES, position["snapshot_entries"]):
+            self._compact()
+        elif self._pending:
+            _, log_path = self._paths(self.prefix, position["generation"])
+            with open(log_path, "a") as log:
+                log.write("".join(json.dumps(key) + "\n" for key in self._pending))
+                log.flush()
+                os.fsync(log.fileno())
+                position["log_size"] = log.tell()
+            position["log_entries"] += len(self._pending)
+            self._pending = []
+        return dict(self.position)
+
+    def remove_stale(self) -> None:
+        """Видаляє файли інших поколінь — викликається, коли чекпоінт уже посилається на поточне."""
+        current = set(self._paths(self.prefix, self.position["generation"]))
+        for path in glob.glob(f"{glob.escape(self.prefix)}.*"):
+            if path not in current and (path.endswith(".json") or path.endswith(".log")):
+                os.remove(path)
@@ -0,0 +1,352 @@
+import argparse
+import json
+import mmap
+import os
+import re
+import struct
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # без numpy запити за індексом проходять записи в Python
+    np = None
+
+from metrics import ERROR_CLASSES
+
+# Заголовок індексу: сигнатура, проіндексована довжина файлу, кількість рядків, inode файлу,
+# CRC початку та CRC кінця проіндексованої частини
+_HEADER = struct.Struct("<8sQQQII")
+_MAGIC = b"JSONLIX2"
+
+# Запис індексу на кожен рядок: зсув початку, sequence_id, код класу помилки
+_ENTRY = struct.Struct("<QqB7x")
+if np is not None:
+    _ENTRY_DTYPE = np.dtype([("offset", "<u8"), ("sequence", "<i8"), ("code", "u1"), ("pad", "V7")])
+
+# Впорядкований за sequence_id індекс (<path>.idx.seq): сигнатура, кількість рядків і
+# заголовок основного індексу, для якого його побудовано; далі sequence_id та номери рядків
+_SEQ_HEADER = struct.Struct("<8sQ32s")
+_SEQ_MAGIC = b"JSONLSQ1"
+
+# Файл сканується блоками такого розміру, а записи індексу пишуться на диск після кожного блоку
+SCAN_BLOCK = 4 * 2 ** 20
+
+# sequence_id відсутній або не є цілим числом
+NO_SEQUENCE = -(1 << 63)
+
+# Код класу помилки для рядків без поля 'error' або з невідомим класом
+UNKNOWN_ERROR = 255
+_ERROR_CODES = {name.encode(): code for code, name in enumerate(ERROR_CLASSES)}
+
+# Скільки байтів на початку і в кінці проіндексованої частини покриває CRC (виявлення перезаписаного файлу)
+_CRC_SPAN = 4096
+
+_ERROR_KEY = b'"error": "'
+_SEQUENCE_KEY = b'"sequence_id": '
+_SEQUENCE_VALUE = re.compile(rb"-?\d+(?=[,}])")
+
+
+def _error_code(line: bytes) -> int:
+    """Клас помилки з хвоста рядка DLQ без повного розбору JSON (поле 'error' — останнє)."""
+    start = line.rfind(_ERROR_KEY)
+    if start < 0:
+        return UNKNOWN_ERROR
+    start += len(_ERROR_KEY)
+    end = line.find(b":", start)
+    return _ERROR_CODES.get(line[start:end], UNKNOWN_ERROR) if end > 0 else UNKNOWN_ERROR
+
+
+def _sequence_id(line: bytes) -> int:
+    """sequence_id без повного розбору JSON; NO_SEQUENCE, якщо поля немає або воно не ціле."""
+    # У raw_data лапки екрановані (\"sequence_id\"), тож ключ там не знайдеться
+    start = line.find(_SEQUENCE_KEY)
+    if start < 0:
+        return NO_SEQUENCE
+    match = _SEQUENCE_VALUE.match(line, start + len(_SEQUENCE_KEY))
+    if match is None:
+        return NO_SEQUENCE
+    value = int(match.group())
+    return value if NO_SEQUENCE < value < (1 << 63) else NO_SEQUENCE
+
+
+class IndexedJsonl:
+    """
+    Читання великого JSONL-файлу (DLQ, вхідний потік) без завантаження в пам'ять.
+
+    Поруч із файлом ведеться індекс (<path>.idx) із записом фіксованої довжини на кожен рядок:
+    зсув, sequence_id і клас помилки. Файл та індекс читаються через mmap, тож доступ до
+    рядка за номером — O(1), а підрахунок класів помилок проходить лише індекс, не розбираючи
+    JSON. find_sequence() — двійковий пошук у впорядкованому за sequence_id індексі
+    (<path>.idx.seq, будується за потреби; потребує numpy). update() дописує в індекс тільки
+    нові рядки, пам'ять — один блок SCAN_BLOCK. Останній рядок без '\\n' теж індексується
+    і переіндексовується, коли його допишуть. Якщо файл обрізали, замінили (інший inode)
+    або змінили початок чи кінець проіндексованої частини, індекс будується заново.
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None, update: bool = True):
+        self.path = path
+        self.index_path = index_path or f"{path}.idx"
+        self._data: Optional[mmap.mmap] = None
+        self._index: Optional[mmap.mmap] = None
+        self._header = b""
+        self.indexed_size = 0
+        self.count = 0
+        if update:
+            self.update()
+        else:
+            self._open_index()
+
+    # --- побудова індексу ---
+
+    def _read_header(self) -> Optional[Tuple[int, int, int, int, int]]:
+        if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) < _HEADER.size:
+            return None
+        with open(self.index_path, "rb") as f:
+            magic, *fields = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC:
+            return None
+        return tuple(fields)
+
+    @staticmethod
+    def _crcs(f, size: int) -> Tuple[int, int]:
+        """CRC перших і останніх _CRC_SPAN байтів з перших size байтів файлу."""
+        f.seek(0)
+        head = zlib.crc32(f.read(min(size, _CRC_SPAN)))
+        f.seek(max(size - _CRC_SPAN, 0))
+        return head, zlib.crc32(f.read(min(size, _CRC_SPAN)))
+
+    def update(self) -> int:
+        """Дописує в індекс нові рядки файлу. Повертає, на скільки зросла кількість рядків."""
+        self.close()
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(self.path)
+
+        with open(self.path, "rb") as f:
+            file_stat = os.fstat(f.fileno())
+            file_size = file_stat.st_size
+            header = self._read_header()
+            if header is not None:
+                indexed_size, count, inode, head_crc, tail_crc = header
+                # Файл коротший за проіндексовану частину, інший файл або змінені дані — перебудова
+                if (indexed_size > file_size or inode != file_stat.st_ino
+                        or self._crcs(f, indexed_size) != (head_crc, tail_crc)):
+                    header = None
+            if header is None:
+                indexed_size, count = 0, 0
+            previous_count = count
+
+            mode = "r+b" if header is not None else "w+b"
+            with open(self.index_path, mode) as index_file:
+                position = indexed_size
+                if count:
+                    f.seek(indexed_size - 1)
+                    if f.read(1) != b"\n":
+                        # Останній проіндексований рядок був незавершеним — індексуємо його заново
+                        count -= 1
+                        index_file.seek(_HEADER.size + count * _ENTRY.size)
+                        position = _ENTRY.unpack(index_file.read(_ENTRY.size))[0]
+
+                # Спершу записи, потім заголовок: після збою заголовок лишається узгодженим зі старою частиною
+                index_file.seek(_HEADER.size + count * _ENTRY.size)
+                index_file.truncate()
+                f.seek(position)
+                carry = b""
+                remaining = file_size - position
+                while remaining > 0:
+                    block = f.read(min(SCAN_BLOCK, remaining))
+                    if not block:
+                        break
+                    remaining -= len(block)
+                    lines = (carry + block).split(b"\n")
+                    carry = lines.pop()
+                    if remaining <= 0 and carry:
+                        lines.append(carry)  # останній рядок без '\n'
+                    entries = []
+                    for line in lines:
+                        entries.append(_ENTRY.pack(position, _sequence_id(line), _error_code(line)))
+                        position += len(line) + 1
+                    index_file.write(b"".join(entries))
+                    count += len(entries)
+                end = min(position, file_size)
+
+                head_crc, tail_crc = self._crcs(f, end)
+                index_file.flush()
+                index_file.seek(0)
+                index_file.write(_HEADER.pack(_MAGIC, end, count, file_stat.st_ino, head_crc, tail_crc))
+
+        self._open_index()
+        return count - previous_count
+
+    def _open_index(self) -> None:
+        self.close()
+        header = self._read_header()
+        if header is None:
+            raise ValueError(f"Індекс {self.index_path} відсутній або пошкоджений.")
+        self.indexed_size, self.count = header[:2]
+        with open(self.index_path, "rb") as f:
+            self._header = f.read(_HEADER.size)
+        if self.count:
+            with open(self.index_path, "rb") as f:
+                self._index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            with open(self.path, "rb") as f:
+                self._data = mmap.mmap(f.fileno(), self.indexed_size, access=mmap.ACCESS_READ)
+
+    def close(self) -> None:
+        for mm in (self._data, self._index):
+            if mm is not None:
+                mm.close()
+        self._data = self._index = None
+
+    def __enter__(self) -> "IndexedJsonl":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # --- доступ до рядків ---
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, n: int) -> Tuple[int, int, int]:
+        return _ENTRY.unpack_from(self._index, _HEADER.size + n * _ENTRY.size)
+
+    def _entries(self) -> Iterator[Tuple[int, int, int]]:
+        if not self.count:
+            return iter(())
+        return _ENTRY.iter_unpack(memoryview(self._index)[_HEADER.size:_HEADER.size + self.count * _ENTRY.size])
+
+    def line(self, n: int) -> str:
+        """Рядок номер n (з 0) без '\\n'."""
+        if not 0 <= n < self.count:
+            raise IndexError(f"Рядка {n} немає (усього {self.count}).")
+        start = self._entry(n)[0]
+        if n + 1 < self.count:
+            end = self._entry(n + 1)[0] - 1
+        else:
+            end = self.indexed_size - (self._data[self.indexed_size - 1:self.indexed_size] == b"\n")
+        return self._data[start:end].decode()
+
+    def record(self, n: int) -> Dict[str, Any]:
+        return json.loads(self.line(n))
+
+    def lines(self, start: int = 0, stop: Optional[int] = None) -> Iterator[Tuple[int, str]]:
+        """Пари (номер, рядок) для діапазону [start, stop)."""
+        stop = self.count if stop is None else min(stop, self.count)
+        for n in range(max(start, 0), stop):
+            yield n, self.line(n)
+
+    def page(self, page: int, page_size: int = 50) -> List[Tuple[int, str]]:
+        """Сторінка рядків (сторінки нумеруються з 1)."""
+        start = (page - 1) * page_size
+        return list(self.lines(start, start + page_size))
+
+    def pages(self, page_size: int = 50) -> int:
+        return (self.count + page_size - 1) // page_size
+
+    # --- запити за індексом ---
+
+    def _entry_array(self) -> "np.ndarray":
+        return np.frombuffer(self._index, dtype=_ENTRY_DTYPE, count=self.count, offset=_HEADER.size)
+
+    def _sequence_order(self) -> Tuple["np.ndarray", "np.ndarray"]:
+        """
+        (sequence_id за зростанням, номери відповідних рядків) з <index_path>.seq. Файл
+        перебудовується, якщо основний індекс змінився після його побудови.
+        """
+        seq_path = f"{self.index_path}.seq"
+        expected = _SEQ_HEADER.pack(_SEQ_MAGIC, self.count, self._header[8:40])
+        if not (os.path.exists(seq_path) and os.path.getsize(seq_path) == _SEQ_HEADER.size + 16 * self.count):
+            valid = False
+        else:
+            with open(seq_path, "rb") as f:
+                valid = f.read(_SEQ_HEADER.size) == expected
+        if not valid:
+            sequences = self._entry_array()["sequence"]
+            order = np.argsort(sequences, kind="stable")
+            tmp_path = f"{seq_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(expected)
+                f.write(sequences[order].astype("<i8").tobytes())
+                f.write(order.astype("<i8").tobytes())
+            os.replace(tmp_path, seq_path)
+        sorted_index = np.memmap(seq_path, dtype="<i8", mode="r", offset=_SEQ_HEADER.size, shape=(2, self.count))
+        return sorted_index[0], sorted_index[1]
+
+    def find_sequence(self, sequence_id: int) -> List[int]:
+        """Номери рядків із заданим sequence_id (у різних сенсорів номери можуть збігатися)."""
+        if not self.count or not NO_SEQUENCE < sequence_id < (1 << 63):
+            return []
+        if np is None:
+            return [n for n, (_, seq, _) in enumerate(self._entries()) if seq == sequence_id]
+        sequences, lines = self._sequence_order()
+        left = int(np.searchsorted(sequences, sequence_id, "left"))
+        right = int(np.searchsorted(sequences, sequence_id, "right"))
+        # argsort зі stable зберігає порядок рядків серед однакових sequence_id
+        return lines[left:right].tolist()
+
+    def error_counts(self) -> Dict[str, int]:
+        """Кількість рядків за класами помилок (лише за індексом)."""
+        if np is not None:
+            counts = np.bincount(self._entry_array()["code"], minlength=256).tolist() if self.count else [0] * 256
+        else:
+            counts = [0] * 256
+            for _, _, code in self._entries():
+                counts[code] += 1
+        result = {name: counts[code] for code, name in enumerate(ERROR_CLASSES) if counts[code]}
+        if counts[UNKNOWN_ERROR]:
+            result["UNKNOWN"] = counts[UNKNOWN_ERROR]
+        return result
+
+    def lines_with_error(self, error_class: str) -> Iterator[int]:
+        """Номери рядків заданого класу помилки."""
+        code = ERROR_CLASSES.index(error_class) if error_class in ERROR_CLASSES else UNKNOWN_ERROR
+        if np is not None and self.count:
+            return map(int, np.flatnonzero(self._entry_array()["code"] == code))
+        return (n for n, (_, _, c) in enumerate(self._entries()) if c == code)
+
+
+def format_dlq_line(line: str, line_number: int) -> str:
+    """Рядок DLQ у форматі виводу display_dlq_content."""
+    try:
+        record = json.loads(line)
+        error = record.get("error", "Невідома помилка")
+        seq_id = record.get("sequence_id", "N/A")
+        return f"* Запис ID {seq_id}: [{error.split(':')[0]}] Причина: {error}"
+    except json.JSONDecodeError:
+        return f"* Помилка: Некоректний JSON у DLQ для рядка {line_number + 1}."
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Запити до DLQ через індекс зсувів.")
+    parser.add_argument("path", nargs="?", default="dead_letter_queue.jsonl")
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--line", type=int, help="Вивести рядок за номером (з 1).")
+    parser.add_argument("--sequence-id", type=int, help="Знайти рядки з цим sequence_id.")
+    parser.add_argument("--error-class", help="Лише рядки цього класу помилки.")
+    parser.add_argument("--counts", action="store_true", help="Кількість рядків за класами помилок.")
+    args = parser.parse_args()
+
+    with IndexedJsonl(args.path) as dlq:
+        if args.counts:
+            for error_class, count in dlq.error_counts().items():
+                print(f"{error_class:<20} {count:>12,}")
+            print(f"{'ВСЬОГО':<20} {len(dlq):>12,}")
+        elif args.line is not None:
+            print(dlq.line(args.line - 1))
+        else:
+            if args.sequence_id is not None:
+                numbers = dlq.find_sequence(args.sequence_id)
+            elif args.error_class is not None:
+                numbers = dlq.lines_with_error(args.error_class)
+            else:
+                numbers = range(len(dlq))
+            # Пагінація без матеріалізації всього списку номерів
+            start = (args.page - 1) * args.page_size
+            for i, n in enumerate(numbers):
+                if i >= start + args.page_size:
+                    break
+                if i >= start:
+                    print(f"{n + 1:>8}: {format_dlq_line(dlq.line(n), n)}")
@@ -0,0 +1,149 @@
+import argparse
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from data_processor import BLANK_LINE, DECODE_FAILED, DEFAULT_BATCH_SIZE, VALIDATION_CONFIG, RecordRouter, read_blocks
+from dedup_store import SetDedupStore, load_dedup_store, save_dedup_store
+from serialization import RecordCodec, get_default_codec
+
+_ERROR_SUFFIX = ', "error": '
+
+
+def seed_dedup_from_clean(clean_data_path: str, dedup_store=None, batch_size: int = DEFAULT_BATCH_SIZE):
+    """Відновлює стан дедуплікації з уже записаного clean-файлу (якщо збереженого стану немає)."""
+    dedup_store = dedup_store if dedup_store is not None else SetDedupStore()
+    if not os.path.exists(clean_data_path):
+        return dedup_store
+    codec = get_default_codec()
+    with open(clean_data_path, "r") as clean_file:
+        for block in read_blocks(clean_file, batch_size):
+            for line in block:
+                line = line.strip()
+                if not line:
+                    continue
+                record = codec.decode(line)
+                dedup_store.add(record["sensor_id"], record["sequence_id"])
+    return dedup_store
+
+
+def _strip_error(line: str, codec: RecordCodec) -> Tuple[str, Any]:
+    """
+    Рядок DLQ -> (рядок запису без 'error', запис) для повторної обробки.
+    Для JSON_DECODE_ERROR повертається початковий сирий рядок (raw_data).
+    """
+    try:
+        record = codec.decode(line)
+    except json.JSONDecodeError:
+        return line, DECODE_FAILED  # пошкоджений рядок самого DLQ лишається в DLQ як є
+
+    if type(record) is not dict:
+        return line, record
+    if "raw_data" in record and len(record) == 2:
+        raw = record["raw_data"].strip()
+        if not raw:
+            return raw, BLANK_LINE
+        try:
+            return raw, codec.decode(raw)
+        except json.JSONDecodeError:
+            return raw, DECODE_FAILED
+
+    record.pop("error", None)
+    # Рядок з encode_dlq — це канонічний запис із дописаним 'error': відрізаємо хвіст без json.dumps
+    cut = line.rfind(_ERROR_SUFFIX)
+    if cut > 0:
+        candidate = line[:cut] + "}"
+        if codec.is_canonical(record, candidate):
+            return candidate, record
+    return json.dumps(record), record
+
+
+def replay_dlq(dlq_path: str, clean_data_path: str, compacted_dlq_path: Optional[str] = None,
+               dedup_store=None, dedup_state_path: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+               codec: Optional[RecordCodec] = None, show_detailed_logs: bool = False,
+               **router_options) -> Dict[str, int]:
+    """
+    Повторна обробка DLQ за поточним VALIDATION_CONFIG.
+
+    DLQ читається потоково блоками по batch_size; з кожного запису прибирається поле 'error',
+    і блок проходить той самий RecordRouter, що й у process_data_stream: записи, які тепер
+    валідні, дописуються в clean_data_path (з тією самою дедуплікацією), решта — з новою
+    причиною — у компактований DLQ. Той атомарно замінює dlq_path, якщо compacted_dlq_path
+    не задано.
+
+    Стан дедуплікації береться з dedup_state_path (якщо файл існує), з dedup_store або,
+    за їх відсутності, відновлюється з clean_data_path. Стан зберігається в dedup_state_path
+    (якщо його задано) і тоді, коли replay перервано, — як у process_data_stream.
+
+    Повертає stats: processed — прочитано з DLQ, valid — перенесено в clean,
+    duplicates — відкинуто як дублікати, invalid — лишилося в DLQ.
+    """
+    codec = codec or get_default_codec()
+    if dedup_state_path is not None and os.path.exists(dedup_state_path):
+        dedup_store = load_dedup_store(dedup_state_path)
+    elif dedup_store is None:
+        dedup_store = seed_dedup_from_clean(clean_data_path, batch_size=batch_size)
+
+    target_path = compacted_dlq_path or dlq_path
+    tmp_path = f"{target_path}.replay.tmp"
+    stats = {"processed": 0, "valid": 0, "duplicates": 0, "invalid": 0}
+
+    try:
+        with open(dlq_path, "r") as dlq_file, \
+                open(clean_data_path, "a") as clean_file, \
+                open(tmp_path, "w") as compacted_file:
+            router = RecordRouter(clean_file, compacted_file, dedup_store=dedup_store, codec=codec,
+                                  show_detailed_logs=show_detailed_logs,
+                                  stats=stats, **router_options)
+            for block in read_blocks(dlq_file, batch_size):
+                entries: List[Tuple[str, Any]] = []
+                for line in block:
+                    line = line.strip()
+                    entries.append((line, BLANK_LINE) if not line else _strip_error(line, codec))
+                router.process_entries(entries)
+    except FileNotFoundError:
+        logging.error(f"Файл не знайдено: {dlq_path}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    else:
+        # clean уже дописано й закрито, тож DLQ замінюється лише після того, як записи потрапили в clean
+        os.replace(tmp_path, target_path)
+    finally:
+        # Рядки, дописані в clean до переривання, там і лишаються: збережений стан їх уже містить,
+        # тож повторний replay того самого DLQ відкине їх як дублікати
+        if dedup_state_path is not None:
+            save_dedup_store(dedup_store, dedup_state_path)
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Повторна обробка DLQ за поточною конфігурацією валідації.")
+    parser.add_argument("--dlq", default="dead_letter_queue.jsonl")
+    parser.add_argument("--clean", default="clean_data.jsonl")
+    parser.add_argument("--output", help="Куди записати компактований DLQ (за замовчуванням — замість --dlq).")
+    parser.add_argument("--dedup-state", help="Файл стану дедуплікації (див. process_data_stream).")
+    parser.add_argument("--value-min", type=float, help="Перевизначити VALIDATION_CONFIG['value_min'].")
+    parser.add_argument("--value-max", type=float, help="Перевизначити VALIDATION_CONFIG['value_max'].")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    if args.value_min is not None:
+        VALIDATION_CONFIG["value_min"] = args.value_min
+    if args.value_max is not None:
+        VALIDATION_CONFIG["value_max"] = args.value_max
+
+    start = time.perf_counter()
+    stats = replay_dlq(args.dlq, args.clean, compacted_dlq_path=args.output, dedup_state_path=args.dedup_state,
+                       batch_size=args.batch_size)
+    elapsed = time.perf_counter() - start
+    print(f"--- Replay DLQ: {stats['processed']} записів за {elapsed:.2f} сек "
+          f"({stats['processed'] / max(elapsed, 1e-9):,.0f} записів/с) ---")
+    print(f"   -> ✅ Перенесено в clean: {stats['valid']}")
+    print(f"   -> 🔄 Дублікатів відкинуто: {stats['duplicates']}")
+    print(f"   -> 🚨 Лишилося в DLQ: {stats['invalid']}")
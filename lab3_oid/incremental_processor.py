@@ -0,0 +1,183 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from data_processor import DEFAULT_BATCH_SIZE, RecordRouter
+from dedup_store import JournaledDedupStore, SetDedupStore, dedup_store_from_state
+
+# Скільки байтів читати з хвоста файлу за один раз
+READ_SIZE = 1024 * 1024
+
+
+def load_checkpoint(checkpoint_path: str) -> Optional[Dict[str, Any]]:
+    """Читає чекпоінт (або None, якщо його ще немає)."""
+    if not os.path.exists(checkpoint_path):
+        return None
+    with open(checkpoint_path, "r") as f:
+        return json.load(f)
+
+
+def save_checkpoint(checkpoint_path: str, checkpoint: Dict[str, Any]) -> None:
+    """Атомарно записує чекпоінт: тимчасовий файл + fsync + os.replace."""
+    tmp_path = f"{checkpoint_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, checkpoint_path)
+
+
+def _sync(f) -> int:
+    """Скидає буфер файлу на диск і повертає його поточний розмір."""
+    f.flush()
+    os.fsync(f.fileno())
+    return f.tell()
+
+
+def _stream_changed(stream_path: str, stream_file, offset: int) -> Optional[str]:
+    """
+    Чи замінено файл, за яким стежимо: 'rotated' — шлях указує на інший файл (інший inode)
+    або файл видалено, 'truncated' — той самий файл став коротшим за прочитаний зсув.
+    """
+    try:
+        path_stat = os.stat(stream_path)
+    except FileNotFoundError:
+        return "rotated"
+    file_stat = os.fstat(stream_file.fileno())
+    if (path_stat.st_ino, path_stat.st_dev) != (file_stat.st_ino, file_stat.st_dev):
+        return "rotated"
+    if path_stat.st_size < offset:
+        return "truncated"
+    return None
+
+
+def follow_stream(stream_path: str, clean_data_path: str, dlq_path: str, checkpoint_path: str,
+                  checkpoint_interval: float = 5.0, poll_interval: float = 0.2,
+                  idle_timeout: Optional[float] = None, stop_event: Optional[threading.Event] = None,
+                  dedup_store=None, batch_size: int = DEFAULT_BATCH_SIZE, show_detailed_logs: bool = False,
+                  on_block: Optional[Callable[[List[str]], None]] = None, **router_options) -> Dict[str, int]:
+    """
+    Інкрементальний режим: стежить за хвостом stream_path і обробляє лише нові рядки,
+    доповнюючи clean/DLQ файли.
+
+    Кожні checkpoint_interval секунд зберігається чекпоінт: зсув і inode вхідного файлу, розміри
+    вихідних файлів, stats та позиція журналу дедуплікації (dedup_store.JournaledDedupStore у
+    {checkpoint_path}.dedup.*: чекпоінт дописує лише нові ID). Після збою обробка продовжується
+    з чекпоінту: вихідні файли обрізаються до збережених розмірів (усе, що записано після
+    чекпоінту, буде записано повторно з тих самих вхідних рядків), тож вихід не дублюється.
+
+    Ротація вхідного файлу (перейменування/видалення й новий файл під тим самим шляхом)
+    визначається за inode: старий файл дочитується до кінця, далі читання нового з початку.
+    Обрізаний файл читається з початку.
+
+    Зупинка — через stop_event або після idle_timeout секунд без нових даних.
+    on_block(lines) викликається після того, як оброблений блок скинуто на диск.
+    """
+    journal_prefix = f"{checkpoint_path}.dedup"
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is not None:
+        offset = checkpoint["offset"]
+        stats = checkpoint["stats"]
+        resume_inode = checkpoint.get("stream_inode")
+        if "dedup_journal" in checkpoint:
+            dedup_store = JournaledDedupStore.restore(journal_prefix, checkpoint["dedup_journal"])
+        else:
+            # Чекпоінт старого формату зі станом дедуплікації всередині
+            dedup_store = JournaledDedupStore.create(dedup_store_from_state(checkpoint["dedup"]), journal_prefix)
+        # Відкидаємо вихід, записаний після останнього чекпоінту
+        for path, size in ((clean_data_path, checkpoint["clean_size"]), (dlq_path, checkpoint["dlq_size"])):
+            if os.path.exists(path) and os.path.getsize(path) > size:
+                os.truncate(path, size)
+        logging.info(f"Відновлення з чекпоінту: зсув {offset}, оброблено {stats['processed']} рядків.")
+    else:
+        offset = 0
+        resume_inode = None
+        stats = {"processed": 0, "valid": 0, "duplicates": 0, "invalid": 0}
+        dedup_store = JournaledDedupStore.create(dedup_store if dedup_store is not None else SetDedupStore(),
+                                                 journal_prefix)
+        for path in (clean_data_path, dlq_path):
+            open(path, "w").close()
+
+    def make_checkpoint() -> None:
+        save_checkpoint(checkpoint_path, {
+            "offset": offset,
+            "stream_inode": os.fstat(stream_file.fileno()).st_ino if stream_file is not None else None,
+            "clean_size": _sync(clean_file),
+            "dlq_size": _sync(dlq_file),
+            "stats": stats,
+            "dedup_journal": dedup_store.commit(),
+        })
+        # Попереднє покоління журналу більше не потрібне: чекпоінт посилається на нове
+        dedup_store.remove_stale()
+
+    def process_lines(lines: List[str]) -> None:
+        for start in range(0, len(lines), batch_size):
+            router.process_block(lines[start:start + batch_size])
+        clean_file.flush()
+        dlq_file.flush()
+        if on_block is not None:
+            on_block(lines)
+
+    pending = b""
+    last_data_time = last_checkpoint_time = time.monotonic()
+
+    with open(clean_data_path, "a") as clean_file, open(dlq_path, "a") as dlq_file:
+        router = RecordRouter(clean_file, dlq_file, dedup_store=dedup_store, stats=stats,
+                              show_detailed_logs=show_detailed_logs, **router_options)
+        stream_file = None
+        try:
+            while stop_event is None or not stop_event.is_set():
+                if stream_file is None:
+                    if not os.path.exists(stream_path):
+                        if idle_timeout is not None and time.monotonic() - last_data_time >= idle_timeout:
+                            break
+                        time.sleep(poll_interval)
+                        continue
+                    stream_file = open(stream_path, "rb")
+                    if resume_inode is not None and resume_inode != os.fstat(stream_file.fileno()).st_ino:
+                        logging.warning(f"Файл {stream_path} замінено після чекпоінту; читання з початку.")
+                        offset = 0
+                    resume_inode = None
+                    stream_file.seek(offset)
+
+                chunk = stream_file.read(READ_SIZE)
+                if chunk:
+                    last_data_time = time.monotonic()
+                    pending += chunk
+                    # Обробляємо лише завершені рядки; незавершений хвіст чекає наступного читання
+                    cut = pending.rfind(b"\n") + 1
+                    if cut:
+                        process_lines(pending[:cut].decode().split("\n")[:-1])
+                        offset += cut
+                        pending = pending[cut:]
+                else:
+                    change = _stream_changed(stream_path, stream_file, offset)
+                    if change == "truncated":
+                        logging.warning(f"Файл {stream_path} став коротшим за зсув {offset}; читання з початку.")
+                    elif change == "rotated":
+                        # Старий файл дочитано; його останній рядок без '\n' уже не буде дописано
+                        logging.info(f"Файл {stream_path} ротовано; перехід до нового файлу.")
+                        if pending:
+                            process_lines([pending.decode()])
+                    if change is not None:
+                        stream_file.close()
+                        stream_file, offset, pending = None, 0, b""
+                        continue
+                    if idle_timeout is not None and time.monotonic() - last_data_time >= idle_timeout:
+                        break
+                    time.sleep(poll_interval)
+
+                if time.monotonic() - last_checkpoint_time >= checkpoint_interval:
+                    make_checkpoint()
+                    last_checkpoint_time = time.monotonic()
+
+            # Чекпоінт лише при штатній зупинці: після збою лишається останній узгоджений
+            make_checkpoint()
+        finally:
+            if stream_file is not None:
+                stream_file.close()
+
+    return stats
@@ -1,30 +1,44 @@
+import argparse
 import os
-import json
-from data_generator import generate_sensor_data
+from typing import Optional
+
+from async_pipeline import print_report, process_generated_stream
+from data_generator import write_sensor_data
 from data_processor import process_data_stream
+from dlq_reader import IndexedJsonl, format_dlq_line
 
 # Визначення шляхів до файлів
 INPUT_STREAM_FILE = "input_stream.txt"
 CLEAN_DATA_FILE = "clean_data.jsonl"
+CLEAN_PARQUET_DIR = "clean_data_parquet"
 DLQ_FILE = "dead_letter_queue.jsonl"
 
+# Параметри згенерованого потоку (спільні для обох режимів і для повідомлень)
+SENSOR_ID = "LAB_PRES_02"
+SEQUENCE_START = 1000
+NUM_RECORDS = 50
+
 
-def display_raw_stream():
-    """Виводить згенерований сирий потік у консоль (УСІ РЯДКИ)."""
+def display_raw_stream(page: Optional[int] = None, page_size: int = 50):
+    """
+    Виводить згенерований сирий потік у консоль (УСІ РЯДКИ або одну сторінку).
+    Рядки читаються через індекс зсувів (dlq_reader.IndexedJsonl), а не списком у пам'яті.
+    """
     if not os.path.exists(INPUT_STREAM_FILE):
         print(f"Помилка: Файл {INPUT_STREAM_FILE} не знайдено.")
         return
 
     print("\n### 📋 ЗГЕНЕРОВАНИЙ СИРИЙ ПОТІК (Вхідні дані) ###")
-    with open(INPUT_STREAM_FILE, "r") as f:
-        lines = f.readlines()
-
-        print(f"Кількість записів у потоці: {len(lines)}\n")
+    with IndexedJsonl(INPUT_STREAM_FILE) as stream:
+        print(f"Кількість записів у потоці: {len(stream)}\n")
 
-        # *** ЗМІНА ТУТ: ВИДАЛЯЄМО ОБМЕЖЕННЯ [ :15 ] ***
-        for i, line in enumerate(lines):  # Перебираємо УСІ рядки
+        start, stop = (0, len(stream)) if page is None else ((page - 1) * page_size, page * page_size)
+        previous = stream.line(start - 1).strip() if 0 < start <= len(stream) else None
+        for i, line in stream.lines(start, stop):
             line = line.strip()
-            if not line: continue
+            if not line:
+                previous = line
+                continue
 
             suffix = ""
 
@@ -33,18 +47,25 @@ def display_raw_stream():
                 suffix = " <-- ЙМОВІРНЕ ПОШКОДЖЕННЯ"
 
             # Спроба виявити простий дублікат
-            if i > 0 and lines[i - 1].strip() == line:
+            if previous == line:
                 suffix = " <-- ДУБЛІКАТ"
 
             print(f"{i + 1:03}: {line}{suffix}")
+            previous = line
+
+        if page is not None:
+            print(f"\nСторінка {page} з {stream.pages(page_size)}")
 
         print("\n--------------------------------------------------------------")
 
 
 # pipeline_runner.py (оновлена функція)
 
-def display_dlq_content():
-    """Виводить увесь вміст DLQ для демонстрації обробки помилок."""
+def display_dlq_content(page: Optional[int] = None, page_size: int = 50):
+    """
+    Виводить вміст DLQ (увесь або одну сторінку) для демонстрації обробки помилок.
+    Кількість записів за класами помилок рахується за індексом, без розбору JSON.
+    """
     if not os.path.exists(DLQ_FILE) or os.path.getsize(DLQ_FILE) == 0:
         print("\n--- DLQ: Файл порожній. Всі дані були валідними. ---")
         return
@@ -52,61 +73,89 @@ def display_dlq_content():
     print("\n### 🚨 ВМІСТ DEAD-LETTER QUEUE (DLQ) - ПОВНИЙ ВИВІД ###")
     print(" (Записи, ізольовані через порушення цілісності)")
 
-    dlq_records = []
     try:
-        with open(DLQ_FILE, "r") as f:
-            # Зчитуємо всі записи
-            for line in f:
-                dlq_records.append(line)
-    except Exception as e:
+        dlq = IndexedJsonl(DLQ_FILE)
+    except (OSError, ValueError) as e:
         print(f"Помилка читання DLQ файлу: {e}")
         return
 
-    # Перебираємо всі записи без обмежень
-    for i, line in enumerate(dlq_records):
-        try:
-            record = json.loads(line)
-            error = record.get("error", "Невідома помилка")
-            seq_id = record.get("sequence_id", "N/A")
-
-            # Виводимо запис у потрібному форматі
-            print(f"* Запис ID {seq_id}: [{error.split(':')[0]}] Причина: {error}")
-        except json.JSONDecodeError:
-            print(f"* Помилка: Некоректний JSON у DLQ для рядка {i + 1}.")
-
-    print(f"\nВСЬОГО записів у DLQ: {len(dlq_records)}")
+    with dlq:
+        start, stop = (0, len(dlq)) if page is None else ((page - 1) * page_size, page * page_size)
+        # Декодуються лише рядки, що виводяться
+        for i, line in dlq.lines(start, stop):
+            print(format_dlq_line(line, i))
+
+        if page is not None:
+            print(f"\nСторінка {page} з {dlq.pages(page_size)}")
+        print(f"\nВСЬОГО записів у DLQ: {len(dlq)}")
+        for error_class, count in dlq.error_counts().items():
+            print(f"   {error_class}: {count}")
     print("--------------------------------------------------------------")
 
 
-def run_pipeline():
+def run_pipeline(streaming: bool = False, keep_raw_stream: bool = True, clean_format: str = "jsonl",
+                 batch_validation: bool = False):
+    """
+    streaming       — генератор і обробник працюють одночасно через asyncio-чергу
+                      (async_pipeline.py), без проміжного читання input_stream.txt.
+    keep_raw_stream — у потоковому режимі також записати сирий потік у input_stream.txt.
+    clean_format    — 'parquet': валідні записи пишуться в каталог clean_data_parquet
+                      (sensor_id=…/date=…), лише в послідовному режимі.
+    batch_validation — стовпцева валідація блоків (batch_validator.py), лише в послідовному режимі.
+    """
+    if streaming and clean_format != "jsonl":
+        raise ValueError("Потоковий режим пише clean-дані лише в JSONL.")
+    if streaming and batch_validation:
+        raise ValueError("Стовпцева валідація підтримується лише в послідовному режимі.")
+    clean_output = CLEAN_PARQUET_DIR if clean_format == "parquet" else CLEAN_DATA_FILE
+
     print("==============================================")
     print("🚀 СТІЙКИЙ КОНВЕЙЄР ДАНИХ (ЛАБОРАТОРНА РОБОТА)")
     print("==============================================")
 
-    # 1. Етап: Генерація Ненадійних Даних
-    print("\n--- ЕТАП 1/3: ГЕНЕРАЦІЯ ТА СИРИЙ ВВІД ---")
-    data_stream = generate_sensor_data(
-        sensor_id="LAB_PRES_02",
-        sequence_start=1000,
-        num_records=50
-    )
-
-    # Запис у "вхідну чергу" (файл)
-    with open(INPUT_STREAM_FILE, "w") as f:
-        for record_str in data_stream:
-            f.write(record_str + "\n")
-
-    # Виводимо згенерований потік
-    display_raw_stream()
-
-    # 2. Етап: Обробка та Валідація
-    # Очищуємо файли перед обробкою
-    for f in [CLEAN_DATA_FILE, DLQ_FILE]:
-        if os.path.exists(f): os.remove(f)
-
-    print("\n--- ЕТАП 2/3: ОБРОБКА ТА ВАЛІДАЦІЯ (Логування Помилок) ---")
-    # Запускаємо обробник з детальними логами
-    stats = process_data_stream(INPUT_STREAM_FILE, CLEAN_DATA_FILE, DLQ_FILE, show_detailed_logs=True)
+    if streaming:
+        # Без keep_raw_stream input_stream.txt з попереднього запуску не відповідав би цьому потоку
+        for f in [CLEAN_DATA_FILE, DLQ_FILE, INPUT_STREAM_FILE]:
+            if os.path.exists(f): os.remove(f)
+
+        print("\n--- ЕТАП 1-2/3: ПОТОКОВА ГЕНЕРАЦІЯ, ОБРОБКА ТА ВАЛІДАЦІЯ ---")
+        stats, report = process_generated_stream(
+            CLEAN_DATA_FILE, DLQ_FILE,
+            sensor_id=SENSOR_ID,
+            sequence_start=SEQUENCE_START,
+            num_records=NUM_RECORDS,
+            raw_stream_path=INPUT_STREAM_FILE if keep_raw_stream else None,
+            show_detailed_logs=True
+        )
+        print_report(report)
+
+        if keep_raw_stream:
+            display_raw_stream()
+    else:
+        # 1. Етап: Генерація Ненадійних Даних
+        print("\n--- ЕТАП 1/3: ГЕНЕРАЦІЯ ТА СИРИЙ ВВІД ---")
+        # Генерація одразу у "вхідну чергу" (файл) — потоково, без проміжного списку
+        print(f"--- Генератор: Починаємо генерацію {NUM_RECORDS} записів для {SENSOR_ID} ---")
+        written = write_sensor_data(
+            INPUT_STREAM_FILE,
+            sensor_id=SENSOR_ID,
+            sequence_start=SEQUENCE_START,
+            num_records=NUM_RECORDS
+        )
+        print(f"--- Генератор: Генерація завершена. Згенеровано {written} записів. ---")
+
+        # Виводимо згенерований потік
+        display_raw_stream()
+
+        # 2. Етап: Обробка та Валідація
+        # Очищуємо файли перед обробкою
+        for f in [CLEAN_DATA_FILE, DLQ_FILE]:
+            if os.path.exists(f): os.remove(f)
+
+        print("\n--- ЕТАП 2/3: ОБРОБКА ТА ВАЛІДАЦІЯ (Логування Помилок) ---")
+        # Запускаємо обробник з детальними логами
+        stats = process_data_stream(INPUT_STREAM_FILE, clean_output, DLQ_FILE, show_detailed_logs=True,
+                                    clean_format=clean_format, batch_validation=batch_validation)
 
     # Виводимо вміст DLQ
     display_dlq_content()
@@ -116,7 +165,7 @@ def run_pipeline():
 
     print("### 📊 СТАТИСТИКА РОБОТИ КОНВЕЄРА ###")
     print(f"📋 Загалом оброблено записів: {stats['processed']}")
-    print(f"   -> ✅ Валідних та унікальних: {stats['valid']} (Збережено в clean_data.jsonl)")
+    print(f"   -> ✅ Валідних та унікальних: {stats['valid']} (Збережено в {clean_output})")
     print(f"   -> 🔄 Пропущено дублікатів: {stats['duplicates']} (Завдяки ІДЕМПОТЕНТНОСТІ)")
     print(f"   -> 🚨 Відправлено в DLQ: {stats['invalid']} (Завдяки СТІЙКОСТІ)")
 
@@ -124,4 +173,20 @@ def run_pipeline():
 
 
 if __name__ == '__main__':
-    run_pipeline()
+    parser = argparse.ArgumentParser(description="Стійкий конвеєр даних.")
+    parser.add_argument("--streaming", action="store_true",
+                        help="Генерація та обробка одночасно через asyncio-чергу.")
+    parser.add_argument("--no-raw-stream", action="store_true",
+                        help="У потоковому режимі не записувати input_stream.txt.")
+    parser.add_argument("--clean-format", choices=["jsonl", "parquet"], default="jsonl",
+                        help="Формат clean-виходу: clean_data.jsonl або каталог clean_data_parquet.")
+    parser.add_argument("--batch-validation", action="store_true",
+                        help="Розбирати й перевіряти рядки стовпцями (numpy) замість json.loads на кожен рядок.")
+    args = parser.parse_args()
+    if args.streaming and args.clean_format != "jsonl":
+        parser.error("--clean-format parquet підтримується лише без --streaming")
+    if args.streaming and args.batch_validation:
+        parser.error("--batch-validation підтримується лише без --streaming")
+
+    run_pipeline(streaming=args.streaming, keep_raw_stream=not args.no_raw_stream, clean_format=args.clean_format,
+                 batch_validation=args.batch_validation)
@@ -0,0 +1,153 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+# Етапи обробки, для яких ведуться гістограми затримок
+STAGES = ("read", "decode", "dedup", "validate", "write")
+
+# Класи помилок DLQ (префікс поля 'error' до двокрапки)
+ERROR_CLASSES = ("MISSING_FIELD", "FORMAT_ERROR", "RANGE_ERROR", "JSON_DECODE_ERROR", "SCHEMA_ERROR")
+
+# Межі кошиків гістограми (сек): 1-2.5-5 на кожен порядок від 100 нс до 10 с
+DEFAULT_BUCKETS = tuple(float(f"{m}e{e}") for e in range(-7, 1) for m in (1, 2.5, 5)) + (10.0,)
+
+# Кожен який блок отримує поетапний замір часу для кожного запису
+DEFAULT_SAMPLE_EVERY = 16
+
+
+class Histogram:
+    """Гістограма з фіксованими кошиками; observe() — один bisect і кілька додавань."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = list(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)  # останній кошик — +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float, n: int = 1) -> None:
+        """Додає n спостережень зі значенням value (напр. середня затримка запису в блоці)."""
+        self.counts[bisect_left(self.bounds, value)] += n
+        self.count += n
+        self.sum += value * n
+
+    def quantile(self, q: float) -> float:
+        """Оцінка квантиля — верхня межа кошика, у який він потрапляє."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"count": self.count, "sum": self.sum,
+                "p50": self.quantile(0.5), "p99": self.quantile(0.99)}
+
+
+class PipelineMetrics:
+    """
+    Метрики конвеєра: лічильники, гістограми затримок етапів і лічильники класів помилок.
+
+    Етапи read і decode вимірюються цілим блоком (у гістограму йде середня затримка на запис
+    з вагою розміру блоку). dedup, validate і write чергуються для кожного запису, тож їх
+    поетапно вимірюють лише в кожному sample_every-му блоці — решта блоків не платить
+    за виклики perf_counter.
+    """
+
+    def __init__(self, sample_every: int = DEFAULT_SAMPLE_EVERY, exporter: Optional["MetricsExporter"] = None):
+        self.sample_every = sample_every
+        self.exporter = exporter
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.errors = dict.fromkeys(ERROR_CLASSES, 0)
+        self.counters = {"blocks": 0, "sampled_blocks": 0}
+        self.stats: Dict[str, int] = {}  # stats обробника (processed/valid/duplicates/invalid)
+        self.started = time.time()
+
+    def observe_block(self, stage: str, elapsed: float, n: int) -> None:
+        if n:
+            self.histograms[stage].observe(elapsed / n, n)
+
+    def count_error(self, error_reason: str) -> None:
+        error_class = error_reason.split(":", 1)[0]
+        self.errors[error_class] = self.errors.get(error_class, 0) + 1
+
+    def end_block(self, timed: bool = False) -> None:
+        """Викликається після кожного блоку; за потреби знімає періодичний знімок."""
+        self.counters["blocks"] += 1
+        if timed:
+            self.counters["sampled_blocks"] += 1
+        if self.exporter is not None:
+            self.exporter.maybe_export(self)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "timestamp": time.time(),
+            "uptime_s": time.time() - self.started,
+            "stats": dict(self.stats),
+            "errors": dict(self.errors),
+            "counters": dict(self.counters),
+            "latency_s": {stage: h.as_dict() for stage, h in self.histograms.items()},
+        }
+
+    def to_prometheus(self) -> str:
+        """Знімок у текстовому форматі Prometheus (exposition format 0.0.4)."""
+        lines: List[str] = []
+        lines.append("# HELP pipeline_records_total Records by outcome.")
+        lines.append("# TYPE pipeline_records_total counter")
+        for outcome, value in self.stats.items():
+            lines.append(f'pipeline_records_total{{outcome="{outcome}"}} {value}')
+
+        lines.append("# HELP pipeline_dlq_errors_total DLQ records by error class.")
+        lines.append("# TYPE pipeline_dlq_errors_total counter")
+        for error_class, value in self.errors.items():
+            lines.append(f'pipeline_dlq_errors_total{{error_class="{error_class}"}} {value}')
+
+        lines.append("# HELP pipeline_blocks_total Processed blocks.")
+        lines.append("# TYPE pipeline_blocks_total counter")
+        lines.append(f"pipeline_blocks_total {self.counters['blocks']}")
+
+        lines.append("# HELP pipeline_stage_latency_seconds Per-record latency of a pipeline stage.")
+        lines.append("# TYPE pipeline_stage_latency_seconds histogram")
+        for stage, h in self.histograms.items():
+            cumulative = 0
+            for bound, count in zip(h.bounds, h.counts):
+                cumulative += count
+                lines.append(f'pipeline_stage_latency_seconds_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'pipeline_stage_latency_seconds_bucket{{stage="{stage}",le="+Inf"}} {h.count}')
+            lines.append(f'pipeline_stage_latency_seconds_sum{{stage="{stage}"}} {h.sum:.9f}')
+            lines.append(f'pipeline_stage_latency_seconds_count{{stage="{stage}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """
+    Періодичні знімки метрик: 'prometheus' — файл перезаписується атомарно (для textfile-колектора
+    node_exporter), 'jsonl' — кожен знімок дописується окремим рядком.
+    """
+
+    def __init__(self, path: str, fmt: str = "jsonl", interval: float = 5.0):
+        if fmt not in ("prometheus", "jsonl"):
+            raise ValueError(f"Невідомий формат метрик: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.interval = interval
+        self._last_export = time.monotonic()
+
+    def maybe_export(self, metrics: PipelineMetrics) -> None:
+        if time.monotonic() - self._last_export >= self.interval:
+            self.export(metrics)
+
+    def export(self, metrics: PipelineMetrics) -> None:
+        if self.fmt == "prometheus":
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w") as f:
+                f.write(metrics.to_prometheus())
+            os.replace(tmp_path, self.path)
+        else:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(metrics.snapshot()) + "\n")
+        self._last_export = time.monotonic()
@@ -0,0 +1,176 @@
+import io
+import json
+import logging
+import multiprocessing as mp
+import os
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+from data_processor import validate_record
+from dedup_store import SetDedupStore, load_dedup_store, save_dedup_store
+from serialization import get_default_codec
+
+# Типи результатів обробки рядка у воркері
+LINE_BLANK = 0
+LINE_DECODE_ERROR = 1
+LINE_VALID = 2
+LINE_INVALID = 3
+
+# Розмір одного фрагмента вхідного файлу (у байтах)
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+
+
+def split_into_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Tuple[int, int]]:
+    """
+    Ділить файл на діапазони байтів [start, end), вирівняні по межах рядків:
+    кожен діапазон закінчується одразу після символу '\\n' (або в кінці файлу).
+    """
+    file_size = os.path.getsize(path)
+    bounds = []
+    with open(path, 'rb') as f:
+        start = 0
+        while start < file_size:
+            end = min(start + chunk_size, file_size)
+            if end < file_size:
+                f.seek(end)
+                f.readline()  # дочитуємо рядок, на який припала межа
+                end = f.tell()
+            bounds.append((start, end))
+            start = end
+    return bounds
+
+
+def _process_chunk(task: Tuple[str, int, int]) -> List[Tuple]:
+    """
+    Воркер: розбір JSON та валідація рядків одного фрагмента.
+    Дедуплікація тут не виконується — вона залежить від порядку записів
+    і робиться в головному процесі, який бачить фрагменти послідовно.
+    """
+    path, start, end = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    codec = get_default_codec()
+    results = []
+    # TextIOWrapper дає ті самі правила розбиття рядків і кодування, що й open(path, 'r')
+    for line in io.TextIOWrapper(io.BytesIO(data)):
+        line = line.strip()
+        if not line:
+            results.append((LINE_BLANK,))
+            continue
+
+        try:
+            record = codec.decode(line)
+        except json.JSONDecodeError:
+            error_message = "JSON_DECODE_ERROR: Неможливо розібрати JSON."
+            results.append((LINE_DECODE_ERROR, json.dumps({"raw_data": line, "error": error_message}), error_message))
+            continue
+
+        if not all(k in record for k in ['sensor_id', 'sequence_id']):
+            key = None
+        else:
+            key = (record['sensor_id'], record['sequence_id'])
+
+        is_valid, error_reason = validate_record(record)
+        if is_valid:
+            results.append((LINE_VALID, key, codec.encode_clean(record, line)))
+        else:
+            results.append((LINE_INVALID, key, codec.encode_dlq(record, line, error_reason), error_reason))
+    return results
+
+
+def process_data_stream_parallel(stream_path: str, clean_data_path: str, dlq_path: str,
+                                 show_detailed_logs: bool = False, workers: Optional[int] = None,
+                                 chunk_size: int = DEFAULT_CHUNK_SIZE, dedup_store=None,
+                                 dedup_state_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Паралельний аналог process_data_stream: розбір і валідація виконуються у пулі
+    процесів по фрагментах файлу, а дедуплікація та запис — у головному процесі
+    в початковому порядку рядків. Вихідні файли та stats збігаються з послідовним шляхом.
+    """
+    resume = dedup_state_path is not None and os.path.exists(dedup_state_path)
+    if resume:
+        dedup_store = load_dedup_store(dedup_state_path)
+    elif dedup_store is None:
+        dedup_store = SetDedupStore()
+    output_mode = 'a' if resume else 'w'
+
+    stats = {"processed": 0, "valid": 0, "duplicates": 0, "invalid": 0}
+
+    if not os.path.exists(stream_path):
+        logging.error(f"Файл не знайдено: {stream_path}")
+        return stats
+
+    workers = workers or os.cpu_count() or 1
+    tasks = [(stream_path, start, end) for start, end in split_into_chunks(stream_path, chunk_size)]
+
+    try:
+        with open(clean_data_path, output_mode) as clean_file, \
+                open(dlq_path, output_mode) as dlq_file, \
+                mp.get_context("spawn").Pool(workers) as pool:
+
+            if show_detailed_logs:
+                print(f"\n--- ЕТАП 2: ПАРАЛЕЛЬНА ОБРОБКА ({workers} процесів, {len(tasks)} фрагментів) ---")
+
+            # Обмежуємо кількість фрагментів "у польоті", щоб не тримати весь файл у пам'яті
+            pending = deque()
+            task_iter = iter(tasks)
+            for task in task_iter:
+                pending.append(pool.apply_async(_process_chunk, (task,)))
+                if len(pending) >= 2 * workers:
+                    break
+
+            while pending:
+                chunk_results = pending.popleft().get()
+                next_task = next(task_iter, None)
+                if next_task is not None:
+                    pending.append(pool.apply_async(_process_chunk, (next_task,)))
+                _route_chunk(chunk_results, stats, dedup_store, clean_file, dlq_file, show_detailed_logs)
+
+            if show_detailed_logs:
+                print("--- Споживач: Обробка завершена. ---")
+            return stats
+
+    finally:
+        if dedup_state_path is not None:
+            save_dedup_store(dedup_store, dedup_state_path)
+
+
+def _route_chunk(chunk_results: List[Tuple], stats: Dict[str, int], dedup_store: Any,
+                 clean_file, dlq_file, show_detailed_logs: bool) -> None:
+    """Дедуплікація та запис результатів одного фрагмента (так само, як у process_data_stream)."""
+    for item in chunk_results:
+        stats["processed"] += 1
+        kind = item[0]
+        if kind == LINE_BLANK:
+            continue
+
+        if kind == LINE_DECODE_ERROR:
+            dlq_file.write(item[1] + "\n")
+            if show_detailed_logs: logging.warning(f"[{stats['processed']}] DLQ: {item[2]}")
+            stats["invalid"] += 1
+            continue
+
+        key = item[1]
+        if key is None:
+            sensor_id, sequence_id = "UNKNOWN", stats['processed']
+        else:
+            sensor_id, sequence_id = key
+        unique_id = f"{sensor_id}_{sequence_id}"
+
+        if dedup_store.seen(sensor_id, sequence_id):
+            if show_detailed_logs: logging.info(
+                f"[{stats['processed']}] DUPLICATE (ІДЕМПОТЕНТНІСТЬ): Виявлено дублікат {unique_id}. Пропущено.")
+            stats["duplicates"] += 1
+            continue
+
+        if kind == LINE_VALID:
+            clean_file.write(item[2] + "\n")
+            dedup_store.add(sensor_id, sequence_id)
+            stats["valid"] += 1
+        else:
+            dlq_file.write(item[2] + "\n")
+            if show_detailed_logs: logging.warning(
+                f"[{stats['processed']}] DLQ (ПОМИЛКА): Запис {unique_id} - {item[3]}")
+            stats["invalid"] += 1
@@ -0,0 +1,217 @@
+import os
+import shutil
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow потрібен лише для колонкового приймача
+    pa = pq = None
+
+# Фіксована схема clean-даних (ті самі поля, що перевіряє validate_record).
+# Parquet не має одиниці "s", тож timestamp у файлі зберігається в мілісекундах
+if pa is not None:
+    CLEAN_SCHEMA = pa.schema([
+        ("sensor_id", pa.string()),
+        ("timestamp", pa.timestamp("s", tz="UTC")),
+        ("sequence_id", pa.int64()),
+        ("value", pa.float64()),
+    ])
+
+# Рядків у буфері однієї партиції, після яких вони пишуться в файл окремою групою рядків
+DEFAULT_ROW_GROUP_SIZE = 64 * 1024
+
+# Файл закривається й замінюється новим, коли досягає розміру або віку
+DEFAULT_MAX_FILE_BYTES = 128 * 2 ** 20
+DEFAULT_MAX_FILE_SECONDS = 300.0
+
+# Більше відкритих файлів — найдавніше використаний закривається (як і при ротації)
+DEFAULT_MAX_OPEN_FILES = 64
+
+# Як часто (у записах) перевіряти вік файлів у write_record
+CLOCK_CHECK_EVERY = 4096
+
+SECONDS_PER_DAY = 24 * 3600
+
+# Межі, які запис має вмістити, щоб не зламати запис групи рядків: sequence_id — int64,
+# timestamp — дата з роками 1..9999 (для каталогу date=…); у мс така мітка теж вміщується в int64
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+MIN_TIMESTAMP = int(datetime(1, 1, 1, tzinfo=timezone.utc).timestamp())
+MAX_TIMESTAMP = int(datetime(9999, 12, 31, 23, 59, 59, tzinfo=timezone.utc).timestamp())
+
+_EPOCH = date(1970, 1, 1)
+
+
+def partition_dir(base_dir: str, sensor_id: str, day: int) -> str:
+    """Каталог партиції sensor_id=…/date=YYYY-MM-DD (day — номер дня від епохи, UTC)."""
+    # isoformat, а не strftime: роки до 1000 теж мають 4 цифри
+    iso_date = (_EPOCH + timedelta(days=day)).isoformat()
+    # sensor_id може містити '/' тощо; hive-розбиття pyarrow декодує URI-екранування
+    return os.path.join(base_dir, f"sensor_id={quote(sensor_id, safe='')}", f"date={iso_date}")
+
+
+class _PartitionFile:
+    """Відкритий файл партиції: пишеться під тимчасовим ім'ям з крапкою, яке ігнорує pyarrow.dataset."""
+    __slots__ = ("path", "tmp_path", "sink", "writer", "opened", "rows")
+
+    def __init__(self, directory: str, compression: str):
+        os.makedirs(directory, exist_ok=True)
+        index = sum(1 for name in os.listdir(directory) if name.startswith("part-"))
+        self.path = os.path.join(directory, f"part-{index:05d}.parquet")
+        self.tmp_path = os.path.join(directory, f".part-{index:05d}.parquet.tmp")
+        self.sink = pa.OSFile(self.tmp_path, "wb")
+        self.writer = pq.ParquetWriter(self.sink, CLEAN_SCHEMA, compression=compression)
+        self.opened = time.monotonic()
+        self.rows = 0
+
+    def close(self) -> None:
+        self.writer.close()
+        self.sink.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class ParquetCleanSink:
+    """
+    Колонковий приймач clean-даних замість рядків JSONL. Записи накопичуються по партиціях
+    (sensor_id, дата UTC) у списках колонок і пишуться групами рядків фіксованої схеми
+    CLEAN_SCHEMA у base_dir/sensor_id=…/date=…/part-NNNNN.parquet.
+
+    Файл ротується, коли досягає max_file_bytes або старший за max_file_seconds; лише закритий
+    файл отримує остаточне ім'я, тож читачі бачать тільки завершені файли. flush() записує
+    буфери та закриває прострочені файли (для повільних потоків), close() — записує все.
+    Використовується як контекстний менеджер, тож буфери скидаються і при зупинці конвеєра.
+    mode — як у open(): 'w' очищає base_dir, 'a' додає нові файли до наявних.
+
+    RecordRouter передає сюди записи через write_record() замість рядків через write().
+    """
+
+    def __init__(self, base_dir: str, mode: str = "w", row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 max_file_bytes: int = DEFAULT_MAX_FILE_BYTES,
+                 max_file_seconds: Optional[float] = DEFAULT_MAX_FILE_SECONDS,
+                 max_open_files: int = DEFAULT_MAX_OPEN_FILES, compression: str = "zstd"):
+        if pa is None:
+            raise RuntimeError("Колонковий приймач потребує pyarrow (pip install pyarrow).")
+        if mode not in ("w", "a"):
+            raise ValueError(f"Невідомий режим: {mode}")
+        self.base_dir = base_dir
+        self.row_group_size = row_group_size
+        self.max_file_bytes = max_file_bytes
+        self.max_file_seconds = max_file_seconds
+        self.max_open_files = max_open_files
+        self.compression = compression
+        self.stats = {"rows": 0, "row_groups": 0, "files": 0, "bytes": 0}
+        # (sensor_id, день) → (timestamp, sequence_id, value) — списки колонок буфера
+        self._buffers: Dict[Tuple[str, int], Tuple[List[int], List[int], List[float]]] = {}
+        self._buffer_started: Dict[Tuple[str, int], float] = {}
+        self._files: "OrderedDict[Tuple[str, int], _PartitionFile]" = OrderedDict()
+        self._until_clock_check = CLOCK_CHECK_EVERY
+        if mode == "w":
+            shutil.rmtree(base_dir, ignore_errors=True)
+        os.makedirs(base_dir, exist_ok=True)
+
+    def __enter__(self) -> "ParquetCleanSink":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write_record(self, record: Dict[str, Any]) -> Optional[str]:
+        """
+        Додає валідний запис у буфер. Повертає None або причину відмови (SCHEMA_ERROR), якщо
+        поля не приводяться до схеми — такий запис обробник відправляє в DLQ.
+        """
+        sensor_id = record["sensor_id"]
+        if type(sensor_id) is not str:
+            return "SCHEMA_ERROR: 'sensor_id' не є рядком."
+        if type(record["timestamp"]) is bool or type(record["sequence_id"]) is bool:
+            return "SCHEMA_ERROR: 'timestamp' або 'sequence_id' є булевим значенням."
+        try:
+            timestamp = int(record["timestamp"])
+            sequence_id = int(record["sequence_id"])
+            value = float(record["value"])
+        except (ValueError, TypeError, OverflowError):
+            return "SCHEMA_ERROR: 'timestamp', 'sequence_id' або 'value' не приводяться до типів схеми."
+        if not MIN_TIMESTAMP <= timestamp <= MAX_TIMESTAMP:
+            return f"SCHEMA_ERROR: 'timestamp' {timestamp} поза діапазоном дат (роки 1-9999)."
+        if not INT64_MIN <= sequence_id <= INT64_MAX:
+            return f"SCHEMA_ERROR: 'sequence_id' {sequence_id} не вміщується в int64."
+
+        key = (sensor_id, timestamp // SECONDS_PER_DAY)
+        columns = self._buffers.get(key)
+        if columns is None:
+            columns = self._buffers[key] = ([], [], [])
+            self._buffer_started[key] = time.monotonic()
+        columns[0].append(timestamp)
+        columns[1].append(sequence_id)
+        columns[2].append(value)
+        if len(columns[0]) >= self.row_group_size:
+            self._write_buffer(key)
+
+        self._until_clock_check -= 1
+        if self._until_clock_check <= 0:
+            self._until_clock_check = CLOCK_CHECK_EVERY
+            self._roll_expired(flush_buffers=False)
+        return None
+
+    def _write_buffer(self, key: Tuple[str, int]) -> None:
+        timestamps, sequence_ids, values = self._buffers.pop(key)
+        del self._buffer_started[key]
+        batch = pa.record_batch([
+            pa.array([key[0]] * len(timestamps), pa.string()),
+            pa.array(timestamps, pa.int64()).cast(CLEAN_SCHEMA.field("timestamp").type),
+            pa.array(sequence_ids, pa.int64()),
+            pa.array(values, pa.float64()),
+        ], schema=CLEAN_SCHEMA)
+
+        partition_file = self._files.get(key)
+        if partition_file is None:
+            if len(self._files) >= self.max_open_files:
+                self._close_file(next(iter(self._files)))
+            partition_file = self._files[key] = _PartitionFile(partition_dir(self.base_dir, *key), self.compression)
+        else:
+            self._files.move_to_end(key)
+        partition_file.writer.write_batch(batch)
+        partition_file.rows += batch.num_rows
+        self.stats["rows"] += batch.num_rows
+        self.stats["row_groups"] += 1
+        if partition_file.sink.tell() >= self.max_file_bytes:
+            self._close_file(key)
+
+    def _close_file(self, key: Tuple[str, int]) -> None:
+        partition_file = self._files.pop(key)
+        partition_file.close()
+        self.stats["files"] += 1
+        self.stats["bytes"] += os.path.getsize(partition_file.path)
+
+    def _roll_expired(self, flush_buffers: bool) -> None:
+        """
+        Закриває файли, старші за max_file_seconds, і партиції, буфер яких чекає довше
+        (разом із буфером). Перевіряється кожні CLOCK_CHECK_EVERY записів і у flush().
+        """
+        if self.max_file_seconds is not None:
+            deadline = time.monotonic() - self.max_file_seconds
+            expired = {key for key, f in self._files.items() if f.opened <= deadline}
+            expired.update(key for key, started in self._buffer_started.items() if started <= deadline)
+            for key in expired:
+                if key in self._buffers:
+                    self._write_buffer(key)
+                if key in self._files:
+                    self._close_file(key)
+        if flush_buffers:
+            for key in list(self._buffers):
+                self._write_buffer(key)
+
+    def flush(self) -> None:
+        """Пише всі буфери та закриває прострочені файли; решта файлів лишається відкритою."""
+        self._roll_expired(flush_buffers=True)
+
+    def close(self) -> None:
+        """Пише всі буфери й закриває всі файли."""
+        for key in list(self._buffers):
+            self._write_buffer(key)
+        while self._files:
+            self._close_file(next(iter(self._files)))
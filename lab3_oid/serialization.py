@@ -0,0 +1,143 @@
+import json
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson — необов'язкова залежність
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # msgspec — необов'язкова залежність
+    msgspec = None
+
+# Цілі за межами 64 біт orjson повертає як float; такі (та вкладені) значення перевіряє json
+_SAFE_FLOAT_MIN = -9.2e18
+_SAFE_FLOAT_MAX = 1.8e19
+
+
+def _needs_stdlib(obj: Any) -> bool:
+    """Чи може результат стороннього бекенду відрізнятися від json.loads."""
+    if type(obj) is not dict:
+        return True
+    for value in obj.values():
+        t = type(value)
+        if t is float:
+            if not _SAFE_FLOAT_MIN < value < _SAFE_FLOAT_MAX:
+                return True
+        elif t is dict or t is list:
+            return True
+    return False
+
+
+def _render_record(record: Dict[str, Any]) -> Optional[str]:
+    """
+    Швидке подання запису сенсора з чотирьох полів у форматі json.dumps (f-рядок замість енкодера).
+    Повертає None, якщо запис не має очікуваної форми.
+    """
+    try:
+        sensor_id = record["sensor_id"]
+        value = record["value"]
+        if type(value) is str:
+            if not value.isascii():
+                return None
+            value = f'"{value}"'
+        else:
+            value = repr(value)
+        if type(sensor_id) is not str or not sensor_id.isascii():
+            return None
+        return (f'{{"sensor_id": "{sensor_id}", "timestamp": {record["timestamp"]}, '
+                f'"sequence_id": {record["sequence_id"]}, "value": {value}}}')
+    except (KeyError, TypeError):
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _encode_str(text: str) -> str:
+    return json.dumps(text)
+
+
+def append_error(line: str, error: str) -> str:
+    """
+    Рядок DLQ для канонічного рядка запису (line == json.dumps(record)): поле 'error'
+    дописується останнім — так само, як у json.dumps(record | {"error": ...}).
+    """
+    return f'{line[:-1]}, "error": {_encode_str(error)}}}'
+
+
+def _stdlib_loads(line: str) -> Any:
+    return json.loads(line)
+
+
+def _orjson_loads(line: str) -> Any:
+    try:
+        record = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        return json.loads(line)  # NaN/Infinity, поодинокі сурогати тощо — нехай вирішує json
+    return json.loads(line) if _needs_stdlib(record) else record
+
+
+def _msgspec_loads(line: str) -> Any:
+    try:
+        record = msgspec.json.decode(line)
+    except msgspec.DecodeError:
+        return json.loads(line)
+    return json.loads(line) if _needs_stdlib(record) else record
+
+
+BACKENDS: Dict[str, Callable[[str], Any]] = {"json": _stdlib_loads}
+if orjson is not None:
+    BACKENDS["orjson"] = _orjson_loads
+if msgspec is not None:
+    BACKENDS["msgspec"] = _msgspec_loads
+
+
+class RecordCodec:
+    """
+    Розбір і серіалізація записів сенсора для clean/DLQ.
+
+    Розбір виконує найшвидший доступний бекенд ('orjson', 'msgspec' або 'json') з поверненням
+    до json.loads для всього, що бекенд розбирає інакше. Вихід формується без json.dumps:
+    якщо вихідний рядок уже має канонічну форму (збігається з json.dumps запису), він
+    копіюється як є, а в DLQ поле 'error' дописується до нього. Інакше — json.dumps, тож
+    вихід побайтово збігається з початковою реалізацією незалежно від бекенду.
+    """
+
+    def __init__(self, backend: str = "auto"):
+        if backend == "auto":
+            backend = next(name for name in ("orjson", "msgspec", "json") if name in BACKENDS)
+        if backend not in BACKENDS:
+            raise ValueError(f"Бекенд '{backend}' недоступний. Доступні: {', '.join(BACKENDS)}")
+        self.backend = backend
+        self.decode = BACKENDS[backend]  # помилка розбору — json.JSONDecodeError
+
+    @staticmethod
+    def is_canonical(record: Any, line: str) -> bool:
+        """Чи збігається json.dumps(record) з line (line — рядок, з якого розібрано record)."""
+        # Рівність із f-рядком можлива лише для рядка без escape-послідовностей, а isascii()
+        # у _render_record відсікає символи, які json.dumps екранував би
+        return type(record) is dict and len(record) == 4 and _render_record(record) == line
+
+    def encode_clean(self, record: Dict[str, Any], line: str) -> str:
+        """Рядок для clean_data.jsonl (без '\\n')."""
+        return line if self.is_canonical(record, line) else json.dumps(record)
+
+    def encode_dlq(self, record: Dict[str, Any], line: str, error: str) -> str:
+        """Рядок для DLQ: запис із доданим полем 'error' (без '\\n')."""
+        if self.is_canonical(record, line):
+            return append_error(line, error)
+        dlq_record = record.copy()
+        dlq_record["error"] = error
+        return json.dumps(dlq_record)
+
+
+_default_codec: Optional[RecordCodec] = None
+
+
+def get_default_codec() -> RecordCodec:
+    """Кодек за замовчуванням (найшвидший доступний бекенд)."""
+    global _default_codec
+    if _default_codec is None:
+        _default_codec = RecordCodec()
+    return _default_codec
@@ -0,0 +1,165 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import tempfile
+
+from mobile_app_data import write_interactions_csv
+from scaling import ENGINES, fit_amdahl, fit_gustafson, karp_flatt, run_session_job
+
+
+def _worker_counts(max_workers: int) -> list:
+    counts = [1]
+    while counts[-1] * 2 <= max_workers:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != max_workers:
+        counts.append(max_workers)
+    return counts
+
+
+def _warm_pool(workers: int):
+    """
+    Пул створюється й прогрівається до замірів, як уже запущені виконавці Spark: spawn-процес
+    імпортує цей модуль (а з ним scaling і pyarrow) під час старту, тож заміри його не містять.
+    """
+    pool = multiprocessing.get_context("spawn").Pool(workers)
+    pool.map(abs, range(workers), chunksize=1)
+    return pool
+
+
+def _best_run(csv_path: str, pool, partitions: int, work_dir: str, engine: str, repeats: int) -> dict:
+    runs = [run_session_job(csv_path, pool, partitions, work_dir, engine) for _ in range(repeats)]
+    return min(runs, key=lambda r: r["total_s"])
+
+
+def _dataset(cache: dict, work_dir: str, users: int, seed: int) -> str:
+    if users not in cache:
+        cache[users] = os.path.join(work_dir, f"interactions_{users}.csv")
+        write_interactions_csv(cache[users], users, seed=seed)
+    return cache[users]
+
+
+def run_harness(max_workers: int, partition_counts: list, sizes: list, weak_users_per_worker: int,
+                weak_partitions_per_worker: int, engine: str, repeats: int, seed: int) -> dict:
+    workers_list = _worker_counts(max_workers)
+    results = {
+        "machine": {"cpu_count": os.cpu_count(), "platform": platform.platform(),
+                    "python": platform.python_version()},
+        "config": {"engine": engine, "workers": workers_list, "partitions": partition_counts, "users": sizes,
+                   "weak_users_per_worker": weak_users_per_worker,
+                   "weak_partitions_per_worker": weak_partitions_per_worker, "repeats": repeats},
+        "runs": [],
+        "strong_scaling": [],
+        "weak_scaling": {},
+        "optimal_partitions": [],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        datasets = {}
+        weak_runs = []
+        for workers in workers_list:
+            pool = _warm_pool(workers)
+            try:
+                for users in sizes:
+                    csv_path = _dataset(datasets, tmp, users, seed)
+                    for partitions in partition_counts:
+                        run = _best_run(csv_path, pool, partitions, tmp, engine, repeats)
+                        run.update({"kind": "strong", "users": users, "workers": workers, "partitions": partitions})
+                        results["runs"].append(run)
+                        print(f"strong: users={users:,} workers={workers} partitions={partitions}: "
+                              f"{run['total_s']:.2f} с (паралельно {run['parallel_s']:.2f} с)")
+
+                users = weak_users_per_worker * workers
+                partitions = weak_partitions_per_worker * workers
+                run = _best_run(_dataset(datasets, tmp, users, seed), pool, partitions, tmp, engine, repeats)
+                run.update({"kind": "weak", "users": users, "workers": workers, "partitions": partitions})
+                results["runs"].append(run)
+                weak_runs.append(run)
+                print(f"weak:   users={users:,} workers={workers} partitions={partitions}: {run['total_s']:.2f} с")
+            finally:
+                pool.close()
+                pool.join()
+
+    strong = [r for r in results["runs"] if r["kind"] == "strong"]
+    for users in sizes:
+        for partitions in partition_counts:
+            series = sorted((r for r in strong if r["users"] == users and r["partitions"] == partitions),
+                            key=lambda r: r["workers"])
+            base = series[0]
+            points = []
+            for r in series:
+                speedup = base["total_s"] / r["total_s"]
+                points.append({"workers": r["workers"], "seconds": r["total_s"], "speedup": speedup,
+                               "efficiency": speedup / r["workers"],
+                               "karp_flatt_serial_fraction": karp_flatt(speedup, r["workers"])})
+            results["strong_scaling"].append({
+                "users": users, "events": base["events"], "partitions": partitions, "points": points,
+                "amdahl": fit_amdahl([r["workers"] for r in series], [r["total_s"] for r in series]),
+                # Частка послідовних етапів (читання, розподіл, злиття) у виміряному T(1)
+                "measured_serial_fraction": base["serial_s"] / base["total_s"],
+            })
+
+        for workers in workers_list:
+            candidates = [r for r in strong if r["users"] == users and r["workers"] == workers]
+            best = min(candidates, key=lambda r: r["total_s"])
+            results["optimal_partitions"].append({"users": users, "workers": workers,
+                                                  "partitions": best["partitions"], "seconds": best["total_s"]})
+
+    base = weak_runs[0]
+    results["weak_scaling"] = {
+        "points": [{"workers": r["workers"], "users": r["users"], "events": r["events"], "seconds": r["total_s"],
+                    "scaled_speedup": r["workers"] * base["total_s"] / r["total_s"],
+                    "efficiency": base["total_s"] / r["total_s"]} for r in weak_runs],
+        "gustafson": fit_gustafson([r["workers"] for r in weak_runs], [r["total_s"] for r in weak_runs]),
+    }
+    return results
+
+
+def print_summary(results: dict) -> None:
+    print(f"\n--- Сильне масштабування (CPU: {results['machine']['cpu_count']}) ---")
+    print(f"{'КОРИСТ.':>9} {'ПАРТИЦІЙ':>9} {'s (АМДАЛ)':>10} {'S_max':>7} {'s (ЕТАПИ)':>10} "
+          f"{'ЕФЕКТ. НА N':>12}")
+    print("-" * 62)
+    for series in results["strong_scaling"]:
+        amdahl = series["amdahl"]
+        s_max = f"{amdahl['max_speedup']:.1f}" if amdahl["max_speedup"] is not None else "∞"
+        print(f"{series['users']:>9,} {series['partitions']:>9} {amdahl['serial_fraction']:>10.3f} {s_max:>7} "
+              f"{series['measured_serial_fraction']:>10.3f} {series['points'][-1]['efficiency']:>12.2f}")
+
+    gustafson = results["weak_scaling"]["gustafson"]
+    print(f"\n--- Слабке масштабування: α (Густафсон) = {gustafson['serial_fraction']:.3f} ---")
+    for point in results["weak_scaling"]["points"]:
+        print(f"  воркерів {point['workers']}: {point['seconds']:.2f} с, "
+              f"масштабоване прискорення {point['scaled_speedup']:.2f}, ефективність {point['efficiency']:.2f}")
+
+    print("\n--- Оптимальна кількість партицій ---")
+    for best in results["optimal_partitions"]:
+        print(f"  користувачів {best['users']:,}, воркерів {best['workers']}: {best['partitions']} "
+              f"({best['seconds']:.2f} с)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Сильне/слабке масштабування задачі тривалості сесій "
+                                                 "з підбором законів Амдала і Густафсона.")
+    # Для підбору моделей потрібно щонайменше два виміри (1 і N воркерів)
+    parser.add_argument("--max-workers", type=int, default=max(os.cpu_count() or 1, 2))
+    parser.add_argument("--partitions", type=int, nargs="+", default=[1, 4, 8, 24, 64])
+    parser.add_argument("--users", type=int, nargs="+", default=[25_000, 100_000],
+                        help="Розміри даних для сильного масштабування (кількість користувачів).")
+    parser.add_argument("--weak-users-per-worker", type=int, default=25_000)
+    parser.add_argument("--weak-partitions-per-worker", type=int, default=4)
+    parser.add_argument("--engine", choices=ENGINES, default="streaming")
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="scaling_results.json")
+    args = parser.parse_args()
+    if args.max_workers < 2:
+        parser.error("--max-workers має бути не менше 2")
+
+    harness_results = run_harness(args.max_workers, args.partitions, args.users, args.weak_users_per_worker,
+                                  args.weak_partitions_per_worker, args.engine, args.repeats, args.seed)
+    print_summary(harness_results)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(harness_results, f, indent=2, ensure_ascii=False)
+    print(f"\nРезультати збережено в {args.output}")
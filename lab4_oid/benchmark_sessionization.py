@@ -0,0 +1,114 @@
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from collections import Counter
+
+from mobile_app_data import write_interactions_csv
+from sessionization import DEFAULT_IDLE_TIMEOUT, average_duration, session_durations_groupby, sessionize_csv
+
+
+def _groupby(csv_path: str, idle_timeout: int) -> dict:
+    sessions = session_durations_groupby(csv_path)
+    durations = Counter(sessions["session_duration_seconds"].to_pylist())
+    return {"sessions": sessions.num_rows, "average": average_duration(sessions), "durations": durations}
+
+
+def _streaming(order: str, infer_missing: bool):
+    def run(csv_path: str, idle_timeout: int) -> dict:
+        # Розподіл тривалостей (тривалість → кількість) — для перевірки збігу з groupBy без збереження сесій
+        durations = Counter()
+        stats = sessionize_csv(csv_path, idle_timeout, order, infer_missing,
+                               on_session=lambda s: durations.update((s[3] - s[2],)))
+        return {"sessions": stats.sessions, "average": stats.average_duration, "durations": durations,
+                "max_open": stats.max_open_sessions}
+    return run
+
+
+VARIANTS = {
+    "groupBy (Arrow)": _groupby,
+    "потік, time": _streaming("time", infer_missing=False),
+    "потік, user": _streaming("user", infer_missing=False),
+    "потік, infer": _streaming("time", infer_missing=True),
+}
+
+
+def _peak_rss_mb() -> float:
+    """Пік RSS процесу: враховує і буфери Arrow, яких не бачить tracemalloc."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # ru_maxrss на Linux переживає exec, тож завищений, якщо батьківський процес був більшим
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _child(name: str, csv_path: str, idle_timeout: int, queue) -> None:
+    start = time.perf_counter()
+    result = VARIANTS[name](csv_path, idle_timeout)
+    result["elapsed"] = time.perf_counter() - start
+    result["max_rss_mb"] = _peak_rss_mb()
+    queue.put(result)
+
+
+def _run_isolated(name: str, csv_path: str, idle_timeout: int) -> dict:
+    """Кожен запуск — у свіжому процесі, щоб пік пам'яті не успадковувався від попередніх."""
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_child, args=(name, csv_path, idle_timeout, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run_benchmark(num_users: int, idle_timeout: int, repeats: int, missing_session_share: float) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = {order: os.path.join(tmp, f"interactions_{order}.csv") for order in ("time", "user")}
+        for order, path in inputs.items():
+            events = write_interactions_csv(path, num_users, order=order, missing_session_share=missing_session_share,
+                                            bad_timestamp_rate=0.0)
+        size_mb = os.path.getsize(inputs["time"]) / 2 ** 20
+        # Ті самі події з усіма session_id (генератор лише обнуляє їх) — еталон для сесій, відновлених за паузами
+        truth = None
+        if missing_session_share > 0:
+            truth_path = os.path.join(tmp, "interactions_truth.csv")
+            write_interactions_csv(truth_path, num_users, order="time", bad_timestamp_rate=0.0)
+            truth = _groupby(truth_path, idle_timeout)
+
+        print(f"\n--- Сесіонізація: {events:,} подій ({size_mb:.1f} МБ), idle timeout {idle_timeout} с, "
+              f"без session_id: {missing_session_share:.0%} користувачів ---")
+        print(f"{'ВАРІАНТ':<18} {'СЕСІЙ':>10} {'СЕРЕДНЯ, С':>12} {'ЧАС, С':>8} {'ПОДІЙ/С':>12} "
+              f"{'ПІК RSS, МБ':>12} {'ВІДКРИТИХ':>10} {'ЗБІГ':>6}")
+        print("-" * 97)
+
+        reference = None
+        for name in VARIANTS:
+            csv_path = inputs["user"] if name.endswith("user") else inputs["time"]
+            runs = [_run_isolated(name, csv_path, idle_timeout) for _ in range(repeats)]
+            result = min(runs, key=lambda r: r["elapsed"])
+            if reference is None:
+                reference = result
+            # Порядок входу не змінює набір сесій; infer порівнюється з вихідними session_id
+            expected = truth if truth is not None and name.endswith("infer") else reference
+            same = result["durations"] == expected["durations"]
+            print(f"{name:<18} {result['sessions']:>10,} {result['average']:>12.4f} {result['elapsed']:>8.2f} "
+                  f"{events / result['elapsed']:>12,.0f} {result['max_rss_mb']:>12.1f} "
+                  f"{result.get('max_open', '-'):>10} {'так' if same else 'НІ':>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Потокова сесіонізація vs groupBy(user_id, session_id).")
+    parser.add_argument("--users", type=int, default=200_000)
+    parser.add_argument("--idle-timeout", type=int, default=DEFAULT_IDLE_TIMEOUT)
+    parser.add_argument("--missing-session-share", type=float, default=0.0,
+                        help="Частка користувачів без session_id (для groupBy вони дають одну сесію на користувача).")
+    parser.add_argument("--repeats", type=int, default=2)
+    args = parser.parse_args()
+
+    run_benchmark(args.users, args.idle_timeout, args.repeats, args.missing_session_share)
@@ -0,0 +1,102 @@
+import argparse
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+
+# Формат timestamp у mobile_app_interactions_expanded.csv (TIME_FORMAT у lab_4_oid.ipynb)
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+EVENT_TYPES = np.array(["app_open", "screen_view", "tap", "scroll", "search", "add_to_cart", "purchase", "app_close"])
+SCREENS = np.array(["home", "catalog", "product", "cart", "checkout", "profile", "settings", "search"])
+
+PERIOD_START = int(datetime(2024, 5, 1, tzinfo=timezone.utc).timestamp())
+
+# Між сесіями одного користувача — щонайменше стільки секунд (більше за типовий idle timeout)
+MIN_SESSION_GAP = 45 * 60
+
+
+def generate_interactions(num_users: int, sessions_per_user: float = 4.0, mean_events: float = 6.0,
+                          mean_gap: float = 3.5, period_days: int = 30, missing_session_share: float = 0.0,
+                          bad_timestamp_rate: float = 0.001, order: str = "time", seed: int = 0) -> pa.Table:
+    """
+    Синтетичні mobile_app_interactions: user_id, session_id, timestamp, event_type, screen.
+    Події сесії йдуть з експоненційними паузами (mean_gap сек), сесії одного користувача
+    розділені щонайменше MIN_SESSION_GAP. missing_session_share — частка користувачів без
+    session_id (старі версії застосунку), bad_timestamp_rate — частка непарсованих timestamp.
+    order: 'time' — як журнал подій, 'user' — згруповано за користувачем (кожен — за часом).
+    """
+    if order not in ("time", "user"):
+        raise ValueError(f"Невідомий порядок: {order}")
+    rng = np.random.default_rng(seed)
+
+    sessions_count = np.maximum(rng.poisson(sessions_per_user, num_users), 1)
+    session_user = np.repeat(np.arange(num_users), sessions_count)
+    num_sessions = len(session_user)
+
+    events_count = rng.geometric(1 / mean_events, num_sessions)
+    event_session = np.repeat(np.arange(num_sessions), events_count)
+    num_events = len(event_session)
+    gaps = np.minimum(rng.exponential(mean_gap, num_events), 600.0)
+    session_first_event = np.r_[0, np.cumsum(events_count)[:-1]]
+    gaps[session_first_event] = 0.0
+    # Час від початку сесії: кумулятивна сума пауз у межах сесії
+    elapsed = np.cumsum(gaps)
+    elapsed -= np.repeat(elapsed[session_first_event], events_count)
+    durations = elapsed[session_first_event + events_count - 1]
+
+    # Початки сесій користувача: кожна наступна — після кінця попередньої плюс щонайменше MIN_SESSION_GAP
+    period = period_days * 24 * 3600
+    offsets = MIN_SESSION_GAP + np.r_[0.0, durations[:-1]] + rng.exponential(period / (sessions_per_user + 1),
+                                                                             num_sessions)
+    first_session = np.r_[0, np.cumsum(sessions_count)[:-1]]
+    session_start = np.cumsum(offsets)
+    session_start -= np.repeat(session_start[first_session] - rng.uniform(0, period / 4, num_users), sessions_count)
+    seconds = PERIOD_START + (session_start[event_session] + elapsed).astype(np.int64)
+
+    event_user = session_user[event_session]
+    if order == "user":
+        ordering = np.lexsort((seconds, event_user))
+    else:
+        ordering = np.argsort(seconds, kind="stable")
+    event_session, event_user, seconds = event_session[ordering], event_user[ordering], seconds[ordering]
+
+    user_ids = np.char.add("U", np.char.zfill(event_user.astype(str), 7)).astype(object)
+    session_ids = np.char.add("S", np.char.zfill(event_session.astype(str), 9)).astype(object)
+    session_ids[rng.random(num_users)[event_user] < missing_session_share] = None
+
+    timestamps = np.datetime_as_string(seconds.astype("datetime64[s]"), unit="s").astype(object)
+    bad = rng.random(num_events) < bad_timestamp_rate
+    timestamps[bad] = rng.choice(np.array(["", "N/A", "2024-13-45T99:00:00"], dtype=object), int(bad.sum()))
+
+    return pa.table({
+        "user_id": pa.array(user_ids, pa.string()),
+        "session_id": pa.array(session_ids, pa.string()),
+        "timestamp": pa.array(timestamps, pa.string()),
+        "event_type": pa.array(EVENT_TYPES[rng.integers(0, len(EVENT_TYPES), num_events)]),
+        "screen": pa.array(SCREENS[rng.integers(0, len(SCREENS), num_events)]),
+    })
+
+
+def write_interactions_csv(path: str, num_users: int, **options) -> int:
+    """Пише mobile_app_interactions у CSV (з заголовком, як у вихідному файлі). Повертає кількість рядків."""
+    table = generate_interactions(num_users, **options)
+    pa_csv.write_csv(table, path, write_options=pa_csv.WriteOptions(quoting_style="none"))
+    return table.num_rows
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Генератор синтетичного mobile_app_interactions CSV.")
+    parser.add_argument("--output", default="mobile_app_interactions_expanded.csv")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--order", choices=["time", "user"], default="time")
+    parser.add_argument("--missing-session-share", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count = write_interactions_csv(args.output, args.users, order=args.order,
+                                   missing_session_share=args.missing_session_share, seed=args.seed)
+    print(f"Згенеровано {count:,} подій у {args.output} за {time.perf_counter() - start:.1f} сек.")
@@ -0,0 +1,150 @@
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.feather as feather
+
+from mobile_app_data import TIMESTAMP_FORMAT
+from sessionization import DEFAULT_IDLE_TIMEOUT, Sessionizer
+
+ENGINES = ("streaming", "groupby")
+
+
+def load_events(csv_path: str) -> pa.Table:
+    """Послідовний етап: читання CSV і розбір timestamp (як df_cleaned у ноутбуці)."""
+    table = pa_csv.read_csv(csv_path, convert_options=pa_csv.ConvertOptions(
+        include_columns=["user_id", "session_id", "timestamp"],
+        column_types={"user_id": pa.string(), "session_id": pa.string(), "timestamp": pa.string()},
+        strings_can_be_null=True,
+    ))
+    seconds = pc.strptime(table["timestamp"], format=TIMESTAMP_FORMAT, unit="s", error_is_null=True).cast(pa.int64())
+    events = pa.table({"user_id": table["user_id"], "session_id": table["session_id"], "ts": seconds})
+    return events.filter(pc.is_valid(events["ts"]))
+
+
+def partition_events(events: pa.Table, partitions: int, out_dir: str) -> List[str]:
+    """
+    Аналог repartition(N, user_id): події розкладаються за користувачем у partitions файлів Arrow IPC,
+    у кожному — згруповано за користувачем і за часом (вхід для Sessionizer(order='user')).
+    """
+    users = events["user_id"].combine_chunks().dictionary_encode().indices
+    buckets = pa.array(users.to_numpy() % partitions)
+    keyed = events.append_column("bucket", buckets).append_column("user_code", users)
+    keyed = keyed.sort_by([("bucket", "ascending"), ("user_code", "ascending"), ("ts", "ascending")])
+
+    counts = keyed.group_by("bucket", use_threads=False).aggregate([([], "count_all")]).sort_by("bucket")
+    paths = []
+    offset = 0
+    for bucket, count in zip(counts["bucket"].to_pylist(), counts["count_all"].to_pylist()):
+        path = os.path.join(out_dir, f"partition-{bucket:05d}.arrow")
+        feather.write_feather(keyed.slice(offset, count).select(["user_id", "session_id", "ts"]), path,
+                              compression="uncompressed")
+        paths.append(path)
+        offset += count
+    return paths
+
+
+def session_partition(task: Tuple[str, str, int]) -> Tuple[int, int]:
+    """Воркер: сесії однієї партиції; повертає (кількість сесій, сума тривалостей) для злиття."""
+    path, engine, idle_timeout = task
+    table = feather.read_table(path)
+    if engine == "groupby":
+        sessions = table.group_by(["user_id", "session_id"], use_threads=False).aggregate([("ts", "min_max")])
+        bounds = sessions["ts_min_max"].combine_chunks()
+        durations = pc.subtract(bounds.field("max"), bounds.field("min"))
+        return sessions.num_rows, pc.sum(durations).as_py() or 0
+    sessionizer = Sessionizer(idle_timeout, order="user", infer_missing=False)
+    sessionizer.process(table["user_id"].to_pylist(), table["session_id"].to_pylist(), table["ts"].to_pylist())
+    sessionizer.flush()
+    return sessionizer.stats.sessions, sessionizer.stats.total_duration
+
+
+def run_session_job(csv_path: str, pool, partitions: int, work_dir: str, engine: str = "streaming",
+                    idle_timeout: int = DEFAULT_IDLE_TIMEOUT) -> Dict[str, float]:
+    """
+    Один запуск задачі тривалості сесій: послідовні читання і розподіл на партиції,
+    паралельна сесіонізація партицій у пулі процесів pool, послідовне злиття avg.
+    Повертає час кожного етапу і середню тривалість.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Невідомий рушій: {engine}")
+    timings = {}
+
+    start = time.perf_counter()
+    events = load_events(csv_path)
+    timings["load_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    paths = partition_events(events, partitions, work_dir)
+    timings["partition_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = pool.map(session_partition, [(path, engine, idle_timeout) for path in paths], chunksize=1)
+    timings["parallel_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sessions = sum(count for count, _ in results)
+    total_duration = sum(duration for _, duration in results)
+    for path in paths:
+        os.remove(path)
+    timings["merge_s"] = time.perf_counter() - start
+
+    timings["total_s"] = timings["load_s"] + timings["partition_s"] + timings["parallel_s"] + timings["merge_s"]
+    timings["serial_s"] = timings["total_s"] - timings["parallel_s"]
+    timings["events"] = events.num_rows
+    timings["sessions"] = sessions
+    timings["average_duration"] = total_duration / sessions if sessions else None
+    return timings
+
+
+def _least_squares_through_origin(xs: Sequence[float], ys: Sequence[float]) -> float:
+    denominator = sum(x * x for x in xs)
+    return sum(x * y for x, y in zip(xs, ys)) / denominator if denominator else 0.0
+
+
+def _single_worker_time(workers: Sequence[int], seconds: Sequence[float]) -> float:
+    if 1 not in workers:
+        raise ValueError("Для підбору моделі потрібен вимір з 1 воркером")
+    return seconds[list(workers).index(1)]
+
+
+def fit_amdahl(workers: Sequence[int], seconds: Sequence[float]) -> Dict[str, float]:
+    """
+    Закон Амдала T(n) = T(1)·(s + (1 − s)/n): s — послідовна частка, підібрана МНК по виміряних T(n).
+    Лінеаризація: T(n)/T(1) − 1/n = s·(1 − 1/n).
+    """
+    base = _single_worker_time(workers, seconds)
+    xs = [1 - 1 / n for n in workers]
+    ys = [t / base - 1 / n for n, t in zip(workers, seconds)]
+    serial = min(max(_least_squares_through_origin(xs, ys), 0.0), 1.0)
+    predicted = [base * (serial + (1 - serial) / n) for n in workers]
+    rmse = (sum((p - t) ** 2 for p, t in zip(predicted, seconds)) / len(seconds)) ** 0.5
+    return {
+        "serial_fraction": serial,
+        "parallel_fraction": 1 - serial,
+        "max_speedup": 1 / serial if serial > 0 else None,  # None — без межі
+        "rmse_s": rmse,
+    }
+
+
+def fit_gustafson(workers: Sequence[int], seconds: Sequence[float]) -> Dict[str, float]:
+    """
+    Закон Густафсона для слабкого масштабування (обсяг ∝ n): S(n) = n − α·(n − 1),
+    де виміряне S(n) = n·T(1)/T(n). α — послідовна частка, підібрана МНК.
+    """
+    base = _single_worker_time(workers, seconds)
+    speedups = [n * base / t for n, t in zip(workers, seconds)]
+    alpha = _least_squares_through_origin([n - 1 for n in workers], [n - s for n, s in zip(workers, speedups)])
+    alpha = min(max(alpha, 0.0), 1.0)
+    rmse = (sum((n - alpha * (n - 1) - s) ** 2 for n, s in zip(workers, speedups)) / len(workers)) ** 0.5
+    return {"serial_fraction": alpha, "parallel_fraction": 1 - alpha, "rmse_speedup": rmse}
+
+
+def karp_flatt(speedup: float, workers: int) -> Optional[float]:
+    """Експериментально визначена послідовна частка (метрика Карпа — Флатта) для n > 1."""
+    if workers <= 1 or speedup <= 0:
+        return None
+    return (1 / speedup - 1 / workers) / (1 - 1 / workers)
@@ -0,0 +1,266 @@
+import argparse
+import csv
+import sys
+import time
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Optional, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from mobile_app_data import TIMESTAMP_FORMAT
+
+# Сесія закривається, якщо від її останньої події минуло більше idle timeout
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+
+# Потоковий читач CSV pyarrow тримає наперед кілька десятків блоків, тож пам'ять ∝ block_size
+DEFAULT_BLOCK_SIZE = 2 ** 20
+
+# Закрита сесія: (user_id, session_id, start, end, event_count); тривалість = end - start
+Session = Tuple[str, Optional[str], int, int, int]
+
+INFERRED_PREFIX = "inferred:"
+
+
+class _OpenSession:
+    __slots__ = ("session_id", "start", "end", "count")
+
+    def __init__(self, session_id, ts: int):
+        self.session_id = session_id
+        self.start = ts
+        self.end = ts
+        self.count = 1
+
+
+class SessionStats:
+    """Підсумки потоку: кількість і середня тривалість сесій, як avg у lab_4_oid.ipynb."""
+
+    def __init__(self):
+        self.sessions = 0
+        self.total_duration = 0
+        self.events = 0
+        self.invalid_timestamps = 0
+        self.late_events = 0
+        self.max_open_sessions = 0
+
+    def add(self, session: Session) -> None:
+        self.sessions += 1
+        self.total_duration += session[3] - session[2]
+
+    @property
+    def average_duration(self) -> Optional[float]:
+        return self.total_duration / self.sessions if self.sessions else None
+
+
+class Sessionizer:
+    """
+    Сесіонізація за один прохід. У пам'яті — лише відкриті сесії (min/max/count), упорядковані
+    за часом останньої події, тож закриття за idle timeout — це зняття найстаріших з початку.
+
+    order='time'  — вхід упорядкований за timestamp (журнал подій);
+    order='user'  — події кожного користувача йдуть поспіль і за часом: зміна користувача
+                    закриває всі його сесії.
+    infer_missing — події без session_id ділять на сесії за паузою > idle_timeout;
+                    інакше вони групуються в одну сесію (user_id, null), як у groupBy, і така сесія
+                    не закривається за timeout (пам'ять — по сесії на користувача без session_id).
+
+    Для сесій з session_id результат збігається з groupBy("user_id", "session_id"), якщо паузи
+    всередині сесії не перевищують idle_timeout.
+    """
+
+    def __init__(self, idle_timeout: int = DEFAULT_IDLE_TIMEOUT, order: str = "time", infer_missing: bool = True,
+                 on_session: Optional[Callable[[Session], None]] = None):
+        if order not in ("time", "user"):
+            raise ValueError(f"Невідомий порядок: {order}")
+        self.idle_timeout = idle_timeout
+        self.order = order
+        self.infer_missing = infer_missing
+        self.on_session = on_session
+        self.stats = SessionStats()
+        self._open = OrderedDict()  # (user_id, session_id або None) → _OpenSession
+        self._unsessioned = {}  # user_id → _OpenSession для подій без session_id при infer_missing=False
+        self._watermark = None
+        self._current_user = None
+
+    @property
+    def open_sessions(self) -> int:
+        return len(self._open) + len(self._unsessioned)
+
+    def _close(self, key, state: _OpenSession) -> None:
+        session = (key[0], state.session_id, state.start, state.end, state.count)
+        self.stats.add(session)
+        if self.on_session is not None:
+            self.on_session(session)
+
+    def _evict_idle(self, deadline: int) -> None:
+        """Закриває сесії, остання подія яких раніше за deadline."""
+        open_sessions = self._open
+        while open_sessions:
+            key = next(iter(open_sessions))
+            state = open_sessions[key]
+            if state.end >= deadline:
+                break
+            del open_sessions[key]
+            self._close(key, state)
+
+    def flush(self) -> None:
+        """Закриває всі відкриті сесії (кінець потоку або зміна користувача)."""
+        while self._open:
+            key, state = self._open.popitem(last=False)
+            self._close(key, state)
+        for user_id, state in self._unsessioned.items():
+            self._close((user_id, None), state)
+        self._unsessioned.clear()
+
+    def process(self, user_ids: List[str], session_ids: List[Optional[str]], timestamps: List[Optional[int]]) -> None:
+        """Обробляє блок подій; timestamp None — непарсований час, подія відкидається."""
+        open_sessions = self._open
+        stats = self.stats
+        timeout = self.idle_timeout
+        infer_missing = self.infer_missing
+        by_user = self.order == "user"
+        watermark = self._watermark
+        current_user = self._current_user
+
+        for user_id, session_id, ts in zip(user_ids, session_ids, timestamps):
+            if ts is None:
+                stats.invalid_timestamps += 1
+                continue
+            stats.events += 1
+
+            if by_user and user_id != current_user:
+                self.flush()
+                current_user = user_id
+                watermark = None
+            if watermark is None or ts > watermark:
+                watermark = ts
+                if open_sessions:
+                    self._evict_idle(watermark - timeout)
+            elif ts < watermark - timeout:
+                stats.late_events += 1
+
+            if session_id is None and not infer_missing:
+                state = self._unsessioned.get(user_id)
+                if state is None:
+                    self._unsessioned[user_id] = _OpenSession(None, ts)
+                else:
+                    state.start = min(state.start, ts)
+                    state.end = max(state.end, ts)
+                    state.count += 1
+                continue
+
+            key = (user_id, session_id)
+            state = open_sessions.get(key)
+            if state is None:
+                label = session_id if session_id is not None else f"{INFERRED_PREFIX}{ts}"
+                open_sessions[key] = _OpenSession(label, ts)
+                if len(open_sessions) > stats.max_open_sessions:
+                    stats.max_open_sessions = len(open_sessions)
+                continue
+            if session_id is None and ts - state.end > timeout:
+                # Для подій без session_id пауза > idle_timeout починає нову сесію
+                del open_sessions[key]
+                self._close(key, state)
+                open_sessions[key] = _OpenSession(f"{INFERRED_PREFIX}{ts}", ts)
+                continue
+            if ts < state.start:
+                state.start = ts
+            elif ts > state.end:
+                state.end = ts
+            state.count += 1
+            open_sessions.move_to_end(key)
+
+        self._watermark = watermark
+        self._current_user = current_user
+
+
+def iter_event_blocks(csv_path: str, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[Tuple[list, list, list]]:
+    """
+    Блоки (user_id, session_id, timestamp у секундах) з CSV. Непарсований timestamp стає None
+    (аналог try_to_timestamp), порожній session_id — None. Читається лише блок за раз.
+    """
+    reader = pa_csv.open_csv(
+        csv_path,
+        read_options=pa_csv.ReadOptions(block_size=block_size),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=["user_id", "session_id", "timestamp"],
+            column_types={"user_id": pa.string(), "session_id": pa.string(), "timestamp": pa.string()},
+            strings_can_be_null=True,
+        ),
+    )
+    for batch in reader:
+        seconds = pc.strptime(batch.column("timestamp"), format=TIMESTAMP_FORMAT, unit="s", error_is_null=True)
+        yield (batch.column("user_id").to_pylist(), batch.column("session_id").to_pylist(),
+               seconds.cast(pa.int64()).to_pylist())
+
+
+def sessionize_csv(csv_path: str, idle_timeout: int = DEFAULT_IDLE_TIMEOUT, order: str = "time",
+                   infer_missing: bool = True, on_session: Optional[Callable[[Session], None]] = None,
+                   block_size: int = DEFAULT_BLOCK_SIZE) -> SessionStats:
+    """Потокова сесіонізація CSV mobile_app_interactions; повертає підсумки (середня тривалість тощо)."""
+    sessionizer = Sessionizer(idle_timeout, order, infer_missing, on_session)
+    for user_ids, session_ids, timestamps in iter_event_blocks(csv_path, block_size):
+        sessionizer.process(user_ids, session_ids, timestamps)
+    sessionizer.flush()
+    return sessionizer.stats
+
+
+def session_durations_groupby(csv_path: str) -> pa.Table:
+    """
+    Підхід ноутбука: весь датасет у пам'яті, groupBy(user_id, session_id) з min/max/count.
+    Повертає таблицю user_id, session_id, start, end, event_count, session_duration_seconds.
+    """
+    table = pa_csv.read_csv(csv_path, convert_options=pa_csv.ConvertOptions(
+        include_columns=["user_id", "session_id", "timestamp"],
+        column_types={"user_id": pa.string(), "session_id": pa.string(), "timestamp": pa.string()},
+        strings_can_be_null=True,
+    ))
+    seconds = pc.strptime(table["timestamp"], format=TIMESTAMP_FORMAT, unit="s", error_is_null=True).cast(pa.int64())
+    events = pa.table({"user_id": table["user_id"], "session_id": table["session_id"], "ts": seconds})
+    events = events.filter(pc.is_valid(events["ts"]))
+    sessions = events.group_by(["user_id", "session_id"], use_threads=False) \
+        .aggregate([("ts", "min"), ("ts", "max"), ([], "count_all")]) \
+        .rename_columns(["user_id", "session_id", "start", "end", "event_count"])
+    return sessions.append_column("session_duration_seconds", pc.subtract(sessions["end"], sessions["start"]))
+
+
+def average_duration(sessions: pa.Table) -> Optional[float]:
+    """Друга агрегація ноутбука: avg(session_duration_seconds)."""
+    return pc.mean(sessions["session_duration_seconds"]).as_py()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Потокова сесіонізація mobile_app_interactions за один прохід.")
+    parser.add_argument("csv_path")
+    parser.add_argument("--idle-timeout", type=int, default=DEFAULT_IDLE_TIMEOUT, help="Секунд.")
+    parser.add_argument("--order", choices=["time", "user"], default="time",
+                        help="Порядок входу: за часом або згруповано за користувачем.")
+    parser.add_argument("--no-infer", action="store_true",
+                        help="Не ділити події без session_id за паузами (одна сесія на користувача, як groupBy).")
+    parser.add_argument("--sessions-output", help="CSV із сесіями (за замовчуванням не пишеться).")
+    args = parser.parse_args()
+
+    out = open(args.sessions_output, "w", newline="", encoding="utf-8") if args.sessions_output else None
+    writer = None
+    if out is not None:
+        writer = csv.writer(out)
+        writer.writerow(["user_id", "session_id", "start", "end", "event_count", "session_duration_seconds"])
+
+    start = time.perf_counter()
+    try:
+        stats = sessionize_csv(args.csv_path, args.idle_timeout, args.order, not args.no_infer,
+                               on_session=(lambda s: writer.writerow((*s, s[3] - s[2]))) if writer else None)
+    finally:
+        if out is not None:
+            out.close()
+    elapsed = time.perf_counter() - start
+
+    print(f"Подій: {stats.events:,}, відкинуто (timestamp): {stats.invalid_timestamps:,}, "
+          f"запізнілих: {stats.late_events:,}", file=sys.stderr)
+    print(f"Сесій: {stats.sessions:,}, максимум відкритих: {stats.max_open_sessions:,}, час: {elapsed:.2f} сек.",
+          file=sys.stderr)
+    if stats.late_events:
+        print(f"УВАГА: {stats.late_events:,} подій порушують порядок --order {args.order}; "
+              f"результат може відрізнятися від groupBy.", file=sys.stderr)
+    print(f"Середня тривалість сеансу: {stats.average_duration}")